@@ -1,28 +1,174 @@
-from flask import Flask, render_template
+from flask import Flask, abort, jsonify, render_template, request, send_from_directory
+import glob
 import os
-from export_images import exportar_imagenes  # Importa tu método desde el otro archivo
 
-# Copiar imágenes al iniciar
-ORIGEN = 'resources/results/visualizations'
-DESTINO = 'static/visualizations'
-exportar_imagenes(ORIGEN, DESTINO)
+import matplotlib
+
+# Los trabajos renderizan gráficas en un hilo de JobQueue: un backend con GUI
+# (TkAgg, MacOSX) falla fuera del hilo principal, así que se fuerza Agg antes de importar pyplot
+matplotlib.use("Agg")
+
+from src.util.co_occurrence_store import TERMS_FILE, CoOccurrenceMatrix
+from src.util.feature_store import FeatureStore
+from src.util.job_queue import JobQueue
+
+# Las imágenes se sirven directamente desde el directorio de resultados, sin copiarlas a static
+ORIGEN = os.getenv('VISUALIZATIONS_DIR', 'resources/results/visualizations')
+RESULTADOS = os.path.dirname(ORIGEN)
+
+# Matriz de co-ocurrencia mapeada en memoria: (mtime del archivo, matriz)
+_co_occurrences = None
+# Almacén de características para la búsqueda de similitud: (ruta del archivo, almacén)
+_features = None
 
 app = Flask(__name__)
+# Con USE_X_SENDFILE el servidor web frontal (nginx/Apache) envía los archivos
+app.config['USE_X_SENDFILE'] = os.getenv('USE_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
+
+# Trabajos de re-análisis en segundo plano (un hilo: matplotlib no es seguro entre hilos)
+jobs = JobQueue(max_workers=1)
+
 
 @app.route('/')
 def index():
-    base_path = DESTINO  # usamos la misma ruta
+    base_path = os.path.abspath(ORIGEN)
     categories = {}
+    if not os.path.isdir(base_path):
+        return render_template('index.html', categories=categories)
 
-    for category in os.listdir(base_path):
+    for category in sorted(os.listdir(base_path)):
         category_path = os.path.join(base_path, category)
         if os.path.isdir(category_path):
-            images = [f'{category}/{img}' for img in os.listdir(category_path) if img.endswith('.png')]
+            images = [f'{category}/{img}' for img in sorted(os.listdir(category_path)) if img.endswith('.png')]
             categories[category] = images
         elif category.endswith('.png'):
             categories.setdefault('others', []).append(category)
 
     return render_template('index.html', categories=categories)
 
+
+@app.route('/visualizations/<path:filename>')
+def visualization(filename):
+    """
+    Sirve una imagen del directorio de resultados. send_from_directory evita
+    rutas fuera del directorio, envía el archivo sin cargarlo en memoria
+    (wsgi.file_wrapper/sendfile) y responde a If-None-Match,
+    If-Modified-Since y Range (304 y 206).
+    """
+    if not filename.endswith('.png'):
+        abort(404)
+    return send_from_directory(os.path.abspath(ORIGEN), filename, conditional=True)
+
+
+def load_co_occurrences():
+    """Mapea la matriz de co-ocurrencia en memoria; se vuelve a cargar solo si se guardó una nueva."""
+    global _co_occurrences
+    # El archivo de términos se reemplaza al final de cada guardado
+    mtime = os.stat(os.path.join(RESULTADOS, TERMS_FILE)).st_mtime_ns
+    if _co_occurrences is None or _co_occurrences[0] != mtime:
+        _co_occurrences = (mtime, CoOccurrenceMatrix.load(RESULTADOS))
+    return _co_occurrences[1]
+
+
+@app.route('/api/co-occurrences')
+def co_occurrences():
+    """Pares de términos con más co-ocurrencias. Parámetros: limit y min_weight."""
+    if not CoOccurrenceMatrix.exists(RESULTADOS):
+        return jsonify({'error': 'No hay resultados de co-ocurrencia'}), 404
+
+    limit = request.args.get('limit', 50, type=int)
+    min_weight = request.args.get('min_weight', 1, type=int)
+    pairs = load_co_occurrences().top_pairs(limit, min_weight)
+    return jsonify([{'term1': t1, 'term2': t2, 'count': count} for t1, t2, count in pairs])
+
+
+def load_features():
+    """Carga el almacén de características más reciente; se vuelve a cargar solo si cambió."""
+    global _features
+    features_dir = os.path.join(RESULTADOS, 'features')
+    paths = glob.glob(os.path.join(features_dir, 'features_*.npz')) if os.path.isdir(features_dir) else []
+    if not paths:
+        return None
+    path = max(paths, key=os.path.getmtime)
+    if _features is None or _features[0] != path:
+        _features = (path, FeatureStore.load(path))
+    return _features[1]
+
+
+@app.route('/api/similar')
+def similar():
+    """Abstracts más parecidos a uno dado. Parámetros: key (p. ej. doi:10.1109/...) y limit."""
+    store = load_features()
+    if store is None:
+        return jsonify({'error': 'No hay características calculadas'}), 404
+
+    key = request.args.get('key', '')
+    if key not in store.index:
+        return jsonify({'error': f'Documento desconocido: {key}'}), 404
+    limit = request.args.get('limit', 10, type=int)
+    return jsonify([{'key': other, 'similarity': score} for other, score in store.most_similar(key, limit)])
+
+def publish_results(result=None):
+    """Reemplaza los resultados servidos por los recién generados por un trabajo."""
+    global _co_occurrences, _features
+    _co_occurrences = None
+    _features = None
+
+
+def run_analysis_job():
+    """Recalcula frecuencias y co-ocurrencias (incremental) y regenera las visualizaciones."""
+    # main se importa aquí para no cargarlo (ni su load_dotenv) al importar app
+    import main
+
+    freq_results, co_occur_results = main.run_text_analysis()
+    main.render_visualizations(freq_results, co_occur_results)
+    return {
+        'categories': len(freq_results),
+        'terms_found': sum(1 for terms in freq_results.values() for count in terms.values() if count),
+    }
+
+
+def run_clustering_job():
+    """Repite el clustering jerárquico y guarda los dendrogramas."""
+    import main
+
+    _, visualizations_dir = main.get_output_dirs()
+    output_dir = os.path.join(visualizations_dir, 'clustering')
+    main.fivth_requirement(output_dir)
+    return {'output_dir': output_dir}
+
+
+JOB_TYPES = {
+    'analyze': run_analysis_job,
+    'cluster': run_clustering_job,
+}
+
+
+@app.route('/jobs/<kind>', methods=['POST'])
+def submit_job(kind):
+    """Encola un trabajo de re-análisis y responde de inmediato con su id."""
+    if kind not in JOB_TYPES:
+        return jsonify({'error': f'Tipo de trabajo desconocido: {kind}'}), 404
+
+    job, created = jobs.submit(kind, JOB_TYPES[kind], on_success=publish_results)
+    response = jsonify(job.to_dict())
+    response.status_code = 202 if created else 200
+    response.headers['Location'] = f'/jobs/{job.id}'
+    return response
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Estado de un trabajo: pending, running, done o failed."""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route('/jobs', methods=['GET'])
+def list_jobs():
+    return jsonify([job.to_dict() for job in jobs.list()])
+
 if __name__ == '__main__':
     app.run(debug=True)
@@ -1,16 +1,141 @@
+import hashlib
+import json
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 
-def exportar_imagenes(origen, destino):
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ioctl de Linux para clonar un archivo (reflink) en btrfs/xfs
+FICLONE = 0x40049409
+MANIFEST = '.sync_manifest.json'
+
+
+def _hash_file(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _reflink(origen, destino):
+    with open(origen, 'rb') as src, open(destino, 'wb') as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+
+def _transferir(origen, destino):
+    """
+    Lleva origen a destino con reflink cuando el sistema de archivos lo
+    permite o, si no, con una copia. Nunca con enlace duro: la copia
+    exportada no debe compartir el archivo con el resultado, que puede
+    reescribirse. Se escribe en un temporal y se renombra para que nunca se
+    sirva una imagen a medias.
+
+    Returns:
+        str: Metodo usado ("reflink" o "copy").
+    """
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    temporal = destino + '.tmp'
+    if os.path.exists(temporal):
+        os.remove(temporal)
+
+    try:
+        if fcntl is None:
+            raise OSError("reflink no disponible")
+        _reflink(origen, temporal)
+        metodo = 'reflink'
+    except OSError:
+        shutil.copy2(origen, temporal)
+        metodo = 'copy'
+
+    os.replace(temporal, destino)
+    return metodo
+
+
+def _cargar_manifiesto(destino):
+    try:
+        with open(os.path.join(destino, MANIFEST), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def exportar_imagenes(origen, destino, max_workers=4):
+    """
+    Sincroniza las imagenes PNG de origen en destino de forma incremental.
+
+    Cada imagen se compara con lo registrado en la sincronizacion anterior
+    (tamaño y mtime; el hash del contenido solo se calcula si estos
+    cambiaron). Las imagenes nuevas o modificadas se clonan (reflink cuando
+    el sistema de archivos lo permite) o se copian en paralelo, y las que ya no existen en origen se eliminan de destino. Si
+    nada cambio no se escribe ningun archivo.
+
+    Returns:
+        dict: Cantidad de imagenes actualizadas, sin cambios y eliminadas.
+    """
     os.makedirs(destino, exist_ok=True)
+    manifiesto = _cargar_manifiesto(destino)
+    nuevo_manifiesto = {}
+    pendientes = []
+    sin_cambios = 0
 
     for root, dirs, files in os.walk(origen):
         for file in files:
-            if file.endswith('.png'):
-                ruta_origen = os.path.join(root, file)
-                subcarpeta = os.path.relpath(root, origen)
-                destino_final = os.path.join(destino, subcarpeta)
-
-                os.makedirs(destino_final, exist_ok=True)
-                shutil.copy2(ruta_origen, os.path.join(destino_final, file))
-                print(f"Imagen copiada: {file} -> {destino_final}")
+            if not file.endswith('.png'):
+                continue
+            ruta_origen = os.path.join(root, file)
+            relativa = os.path.relpath(ruta_origen, origen)
+            ruta_destino = os.path.join(destino, relativa)
+            stat = os.stat(ruta_origen)
+            anterior = manifiesto.get(relativa)
+
+            if anterior and os.path.exists(ruta_destino):
+                if (anterior['size'], anterior['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+                    nuevo_manifiesto[relativa] = anterior
+                    sin_cambios += 1
+                    continue
+                # Se reescribio con el mismo contenido (p. ej. se regenero la misma grafica)
+                contenido = _hash_file(ruta_origen)
+                if contenido == anterior['sha1'] and os.path.getsize(ruta_destino) == stat.st_size:
+                    nuevo_manifiesto[relativa] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha1': contenido}
+                    sin_cambios += 1
+                    continue
+
+            pendientes.append((relativa, ruta_origen, ruta_destino, stat))
+
+    def sincronizar(tarea):
+        relativa, ruta_origen, ruta_destino, stat = tarea
+        contenido = _hash_file(ruta_origen)
+        _transferir(ruta_origen, ruta_destino)
+        return relativa, {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha1': contenido}
+
+    if pendientes:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for relativa, entrada in executor.map(sincronizar, pendientes):
+                nuevo_manifiesto[relativa] = entrada
+
+    # Eliminar imagenes que ya no existen en origen
+    eliminadas = 0
+    for root, dirs, files in os.walk(destino, topdown=False):
+        for file in files:
+            ruta = os.path.join(root, file)
+            if file.endswith('.png') and os.path.relpath(ruta, destino) not in nuevo_manifiesto:
+                os.remove(ruta)
+                eliminadas += 1
+        if root != destino and not os.listdir(root):
+            os.rmdir(root)
+
+    if pendientes or eliminadas or nuevo_manifiesto != manifiesto:
+        ruta_manifiesto = os.path.join(destino, MANIFEST)
+        with open(ruta_manifiesto + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(nuevo_manifiesto, f)
+        os.replace(ruta_manifiesto + '.tmp', ruta_manifiesto)
+
+    resumen = {'actualizadas': len(pendientes), 'sin_cambios': sin_cambios, 'eliminadas': eliminadas}
+    if pendientes or eliminadas:
+        print(f"Imágenes sincronizadas: {resumen['actualizadas']} actualizadas, {resumen['eliminadas']} eliminadas, {resumen['sin_cambios']} sin cambios")
+    return resumen
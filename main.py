@@ -1,74 +1,132 @@
-from collections import defaultdict
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+import argparse
+import json
 import os
 
+from dotenv import load_dotenv
 
-import numpy as np
-import matplotlib.pyplot as plt
-
-
-from src.model.text_analyzer import TextAnalyzer
-from src.fifth_requirement import HierarchicalClustering
-from src.util.ris_utils import read_ris_file
-from src.model.web_scraper_sage import WebScraperSage
-from src.model.web_scraper_ieee import WebScraperIeee
-from src.model.web_scraper_science_direct import WebScraperScienceDirect
+from src.util.atomic import atomic_savefig
+from src.util.ris_utils import load_corpus
+from src.util.ris_store import RisStore
+from src.util.crosstab import YearTypeMatrix
+from src.util.name_index import get_name_index
+from src.util.pipeline import Pipeline, Stage
+from src.util.instrumentation import export_prometheus, measure
+from src.util.profiling import profile_stage
+from src.util.workspace import activate_workspace, list_workspaces
 
-from dotenv import load_dotenv
+# Los modulos pesados (matplotlib, sklearn, nltk, selenium, wordcloud) se
+# importan dentro de las funciones que los usan, asi cada etapa solo carga lo
+# que necesita.
 
-from src.util.visualization_utils import create_category_wordclouds, create_co_occurrence_network, create_combined_wordcloud, create_frequency_bar_charts
 load_dotenv()
 
 def top_fifteen_authors(file):
-    elements = read_ris_file(file)
-    authors_count = defaultdict(int)
+    elements = load_corpus(file)
+    first_authors = Counter()
+    all_authors = Counter()
     for e in elements:
-        authors = e.get("authors")
+        authors = e.authors
         if authors:
-            authors_count[authors[0]] += 1
-    sorted_dict = dict(sorted(authors_count.items(), key=lambda item: item[1], reverse=True))
-    return dict(list(sorted_dict.items())[:15])
+            first_authors[authors[0]] += 1
+            all_authors.update(authors)
+    # El indice usa todas las variantes del corpus; el ranking cuenta solo el primer autor
+    return get_name_index("author", all_authors).top(15, first_authors)
 
 def publication_years_per_product_type(file):
-    elements = read_ris_file(file)
-    year_pub = defaultdict(lambda: defaultdict(int))
+    elements = load_corpus(file)
+    years = []
+    types = []
     for e in elements:
-        year = e.get("year") or e.get("publication_year")
-        pub_type = e.get("type_of_reference")
-        if year and pub_type:
-            year_pub[year][pub_type] += 1
-    return year_pub
+        pub_type = e.type_of_reference
+        if not pub_type:
+            continue
+        year = e.year or e.get("publication_year")
+        if year:
+            years.append(year)
+            types.append(pub_type)
+    return YearTypeMatrix.from_pairs(years, types)
 
 def count_products_by_type(file):
-    elements = read_ris_file(file)
+    elements = load_corpus(file)
     type_prod = defaultdict(int)
     for e in elements:
-        pub_type = e.get("type_of_reference")
+        pub_type = e.type_of_reference
         if pub_type:
             type_prod[pub_type] += 1
     return type_prod
 
 def top_fifteen_journals(file):
-    elements = read_ris_file(file)
-    journals = defaultdict(int)
+    elements = load_corpus(file)
+    journals = Counter()
     for e in elements:
-        journal = e.get("journal_name")
-        pub_type = e.get("type_of_reference")
-        if journal and pub_type == "JOUR":
-            journals[journal] += 1
-    sorted_dict = dict(sorted(journals.items(), key=lambda item: item[1], reverse=True))
-    return dict(list(sorted_dict.items())[:15])
+        if e.journal_name and e.type_of_reference == "JOUR":
+            journals[e.journal_name] += 1
+    return get_name_index("venue", journals).top(15)
 
 def top_fifteen_publishers(file):
-    elements = read_ris_file(file)
-    publishers = defaultdict(int)
+    elements = load_corpus(file)
+    publishers = Counter()
     for e in elements:
-        publisher = e.get("publisher")
+        publisher = e.publisher
         if publisher:
             publishers[publisher] += 1
-    sorted_dict = dict(sorted(publishers.items(), key=lambda item: item[1], reverse=True))
-    return dict(list(sorted_dict.items())[:15])
+    return get_name_index("venue", publishers).top(15)
+
+def compute_streaming_statistics(file, capacity):
+    """
+    Recorre el archivo RIS una sola vez con contadores aproximados de memoria
+    acotada (Space-Saving y Count-Min Sketch), incluidos los terminos de los abstracts.
+    """
+    from src.util.streaming_stats import StreamingStatistics
+    from src.util.term_dictionary import TermDictionary
+
+    statistics = StreamingStatistics.from_ris(file, capacity=capacity, term_dictionary=TermDictionary.load())
+    statistics.report()
+    return statistics
+
+def compute_statistics(file):
+    """
+    Calcula las cinco estadisticas del corpus. Si RIS_DB_PATH esta definida se
+    usan consultas indexadas sobre el almacen SQLite (reimportando el RIS solo
+    si cambio); en caso contrario se recorre el archivo RIS.
+    """
+    db_path = os.getenv("RIS_DB_PATH")
+    if db_path:
+        with RisStore(db_path) as store:
+            store.sync_from_ris(file)
+            # Se piden todos los conteos (LIMIT -1) para unir las variantes antes del ranking
+            return (
+                get_name_index("author", store.author_name_counts()).top(15, store.top_first_authors(-1)),
+                YearTypeMatrix.from_nested(store.publication_years_per_product_type()),
+                store.count_products_by_type(),
+                get_name_index("venue", store.top_journals(-1)).top(15),
+                get_name_index("venue", store.top_publishers(-1)).top(15),
+            )
+
+    return (
+        top_fifteen_authors(file),
+        publication_years_per_product_type(file),
+        count_products_by_type(file),
+        top_fifteen_journals(file),
+        top_fifteen_publishers(file),
+    )
+
+def show_or_save(output_path=None):
+    """Muestra la figura actual o, si se indica una ruta, la guarda como imagen."""
+    import matplotlib.pyplot as plt
+
+    if output_path:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        atomic_savefig(output_path, dpi=150, bbox_inches='tight')
+        plt.close()
+    else:
+        plt.show()
+
+def plot_bar_chart_from_dict(data_dict, title='Bar Chart', xlabel='Categories', ylabel='Values', rotation=45, output_path=None):
+    import matplotlib.pyplot as plt
 
-def plot_bar_chart_from_dict(data_dict, title='Bar Chart', xlabel='Categories', ylabel='Values', rotation=45):
     keys = list(data_dict.keys())
     values = list(data_dict.values())
     plt.figure(figsize=(10, 6))
@@ -79,60 +137,186 @@ def plot_bar_chart_from_dict(data_dict, title='Bar Chart', xlabel='Categories',
     plt.xticks(rotation=rotation)
     plt.tight_layout()
     plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.show()
-
-def plot_grouped_bar_chart(nested_dict, title='Grouped Bar Chart', xlabel='Main Category', ylabel='Values'):
-    categories = list(nested_dict.keys())
-    subcategories = sorted({sub for v in nested_dict.values() for sub in v.keys()})
-    x = np.arange(len(categories))
-    bar_width = 0.8 / len(subcategories)
-    plt.figure(figsize=(12, 7))
-    for i, sub in enumerate(subcategories):
-        values = [nested_dict[cat].get(sub, 0) for cat in categories]
-        plt.bar(x + i * bar_width, values, width=bar_width, label=sub)
+    show_or_save(output_path)
+
+def plot_grouped_bar_chart(matrix, title='Grouped Bar Chart', xlabel='Main Category', ylabel='Values', output_path=None):
+    """
+    Grafica barras agrupadas desde una YearTypeMatrix (o un diccionario
+    categoría -> subcategoría -> valor). Todas las barras se dibujan con una
+    sola llamada a bar sobre la matriz de conteos.
+    """
+    import numpy as np
+    import matplotlib.pyplot as plt
+    from matplotlib.patches import Patch
+
+    if isinstance(matrix, dict):
+        matrix = YearTypeMatrix.from_nested(matrix)
+
+    categories = matrix.years
+    subcategories = matrix.types
+    if not categories or not subcategories:
+        print(f"[WARN] Sin datos para el gráfico: {title}")
+        return
+
+    rows, columns = matrix.counts.shape
+    bar_width = 0.8 / columns
+    positions = np.arange(rows)[:, None] + np.arange(columns)[None, :] * bar_width
+    palette = plt.get_cmap('tab20' if columns > 10 else 'tab10')
+    colors = palette(np.arange(columns) % palette.N)
+
+    # El ancho crece con la cantidad de barras, con un tope para décadas de datos y decenas de tipos
+    plt.figure(figsize=(min(max(12, rows * columns * 0.08), 40), 7))
+    plt.bar(positions.ravel(), matrix.counts.ravel(), width=bar_width, color=np.tile(colors, (rows, 1)))
     plt.title(title)
     plt.xlabel(xlabel)
     plt.ylabel(ylabel)
-    plt.xticks(x + bar_width * (len(subcategories)-1) / 2, categories, rotation=90)
-    plt.legend(title='Tipo de producto')
+    plt.xticks(np.arange(rows) + bar_width * (columns - 1) / 2, categories, rotation=90)
+    plt.legend(handles=[Patch(color=colors[j], label=sub) for j, sub in enumerate(subcategories)], title='Tipo de producto')
     plt.grid(axis='y', linestyle='--', alpha=0.7)
     plt.tight_layout()
-    plt.show()
+    show_or_save(output_path)
+
+def fivth_requirement(output_dir=None):
+    from src.fifth_requirement import HierarchicalClustering
 
-def fivth_requirement():
     a = HierarchicalClustering()
-    a.load_data(os.getenv("UNIQUE_FILE_PATH"))
-    a.vectorize_texts()
-    a.compare_methods()
+    a.load_data(os.getenv("UNIQUE_FILE_PATH"), max_documents=int(os.getenv("CLUSTER_MAX_DOCUMENTS", "50")))
+    a.vectorize_texts(os.path.join(get_output_dirs()[0], "features"))
+    a.compare_methods(output_dir, n_clusters=int(os.getenv("CLUSTER_COUNT", "10")))
 
-def run_text_analysis_pipeline():
-    ris_file_path = os.getenv("UNIQUE_FILE_PATH")
-    base_dir = os.path.dirname(ris_file_path)
+def get_output_dirs():
+    """Retorna los directorios de resultados y visualizaciones junto a UNIQUE_FILE_PATH."""
+    base_dir = os.path.dirname(os.getenv("UNIQUE_FILE_PATH"))
     output_dir = os.path.join(base_dir, "results")
-    visualizations_dir = os.path.join(output_dir, "visualizations")
+    return output_dir, os.path.join(output_dir, "visualizations")
+
+# Codigo del que depende la cosecha
+HARVEST_SOURCES = [
+    os.path.join("src", "model", "web_scraper_sage.py"),
+    os.path.join("src", "model", "web_scraper_ieee.py"),
+    os.path.join("src", "model", "web_scraper_science_direct.py"),
+    os.path.join("src", "model", "async_scraper.py"),
+    os.path.join("src", "util", "cdp_client.py"),
+    os.path.join("src", "util", "selenium_utils.py"),
+]
+
+def run_scrapers():
+    from src.model.web_scraper_sage import WebScraperSage
+    from src.model.web_scraper_ieee import WebScraperIeee
+    from src.model.web_scraper_science_direct import WebScraperScienceDirect
+
+    # Con SCRAPER_BACKEND=async, Sage se exporta por el DevTools Protocol con varias pestañas
+    if os.getenv("SCRAPER_BACKEND", "").lower() == "async":
+        from src.model.async_scraper import AsyncWebScraperSage as WebScraperSage
+
+    try:
+        scraper_sage = WebScraperSage()
+        scraper_sage.run()
+
+        scraper_ieee = WebScraperIeee()
+        scraper_ieee.run()
+
+        scraper_science = WebScraperScienceDirect()
+        scraper_science.run()
+
+        print("Web scrapers finalizados con éxito")
+    except Exception as e:
+        # Se propaga para que el pipeline marque la cosecha como fallida y no analice un corpus viejo
+        print(f"Ocurrió un error con los scrapers: {e}")
+        raise
+
+def run_statistics(output_dir=None):
+    print("Iniciando análisis estadístico...")
+
+    unified_file = os.getenv("UNIQUE_FILE_PATH")
+
+    # Con STREAMING_STATS_CAPACITY los rankings son aproximados pero usan memoria acotada
+    capacity = os.getenv("STREAMING_STATS_CAPACITY")
+    streaming = compute_streaming_statistics(unified_file, int(capacity)) if capacity else None
+    a, b, c, d, e = streaming.statistics() if streaming else compute_statistics(unified_file)
+
+    def chart_path(name):
+        return os.path.join(output_dir, f"{name}.png") if output_dir else None
+
+    plot_bar_chart_from_dict(a, title='15 autores con más publicaciones', xlabel='Autores', ylabel='Cantidad', output_path=chart_path('top_authors'))
+    plot_grouped_bar_chart(b, title='Publicaciones por Año y Tipo', xlabel='Año', ylabel='Cantidad', output_path=chart_path('years_per_type'))
+    plot_bar_chart_from_dict(c, title='Productos por tipo', xlabel='Producto', ylabel='Cantidad', output_path=chart_path('products_by_type'))
+    plot_bar_chart_from_dict(d, title='15 journals con más apariciones', xlabel='Journal', ylabel='Cantidad', rotation=90, output_path=chart_path('top_journals'))
+    plot_bar_chart_from_dict(e, title='15 publishers con más artículos', xlabel='Publisher', ylabel='Cantidad', output_path=chart_path('top_publishers'))
+    if streaming:
+        plot_bar_chart_from_dict(streaming.top_terms(15), title='15 términos más frecuentes', xlabel='Término', ylabel='Abstracts', output_path=chart_path('top_terms'))
+
+def run_text_analysis():
+    """Calcula frecuencias y co-ocurrencias y guarda los resultados en results/."""
+    from src.model.text_analyzer import TextAnalyzer
+
+    ris_file_path = os.getenv("UNIQUE_FILE_PATH")
+    output_dir, _ = get_output_dirs()
 
     os.makedirs(output_dir, exist_ok=True)
-    os.makedirs(visualizations_dir, exist_ok=True)
 
     print("Inicializando TextAnalyzer...")
     analyzer = TextAnalyzer(ris_file_path)
 
-    print("Analizando frecuencias...")
-    freq_results = analyzer.analyze_frequency()
-
-    print("Analizando co-ocurrencias...")
-    co_occur_results = analyzer.analyze_co_occurrence()
+    # Solo se procesan los abstracts agregados o eliminados desde la última ejecución
+    print("Analizando frecuencias y co-ocurrencias...")
+    freq_results, co_occur_results = analyzer.analyze_incremental(
+        os.path.join(output_dir, '.text_analysis_state.json')
+    )
 
     print("Guardando resultados...")
-    analyzer.save_results(output_dir)
+    export_text = os.getenv("EXPORT_TEXT_RESULTS", "").lower() in ("1", "true", "yes")
+    analyzer.save_results(output_dir, export_text=export_text)
+
+    return freq_results, co_occur_results
+
+def build_features():
+    """Actualiza el almacen de caracteristicas TF-IDF de los abstracts en results/features/."""
+    from src.util.feature_store import load_features
+
+    features_dir = os.path.join(get_output_dirs()[0], "features")
+    store = load_features(os.getenv("UNIQUE_FILE_PATH"), features_dir)
+    print(f"Características de {len(store)} abstracts guardadas en: {features_dir}")
+
+def run_keyword_analysis():
+    """Calcula la co-ocurrencia y los temas de las palabras clave (KW) y los guarda en results/keywords/."""
+    from src.model.keyword_analyzer import KeywordAnalyzer
+
+    output_dir, _ = get_output_dirs()
+    keywords_dir = os.path.join(output_dir, "keywords")
+
+    print("Analizando palabras clave...")
+    analyzer = KeywordAnalyzer(os.getenv("UNIQUE_FILE_PATH"), n_topics=int(os.getenv("KEYWORD_TOPICS", "10")))
+    topics = analyzer.analyze(keywords_dir)
+
+    for topic in topics:
+        print(f" - Tema {topic['topic']} ({topic['documents']} documentos): {', '.join(topic['keywords'][:5])}")
+    print(f"Resultados guardados en: {keywords_dir}")
+    return topics
+
+def load_frequencies():
+    with open(os.path.join(get_output_dirs()[0], 'frequencies.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def render_wordclouds(freq_results=None):
+    from src.util.visualization_utils import create_category_wordclouds, create_combined_wordcloud
+
+    _, visualizations_dir = get_output_dirs()
+    freq_results = freq_results if freq_results is not None else load_frequencies()
 
-    print("Generando visualizaciones...")
     print(" - Creando nubes de palabras por categoría...")
     create_category_wordclouds(freq_results, os.path.join(visualizations_dir, "wordclouds"))
 
     print(" - Creando nube de palabras combinada...")
     create_combined_wordcloud(freq_results, os.path.join(visualizations_dir, "wordclouds"))
 
+def render_co_occurrence_network(co_occur_results=None):
+    from src.util.co_occurrence_store import CoOccurrenceMatrix
+    from src.util.visualization_utils import create_co_occurrence_network
+
+    output_dir, visualizations_dir = get_output_dirs()
+    co_occur_results = co_occur_results if co_occur_results is not None else CoOccurrenceMatrix.load(output_dir)
+
     print(" - Creando gráfico de red de co-ocurrencias...")
     create_co_occurrence_network(
         co_occur_results,
@@ -141,49 +325,141 @@ def run_text_analysis_pipeline():
         max_nodes=30
     )
 
-    print(" - Creando gráficos de barras de frecuencia...")
-    create_frequency_bar_charts(freq_results, os.path.join(visualizations_dir, "bar_charts"), top_n=15)
-
-    print("¡Proceso completado con éxito!")
-    print(f"Resultados guardados en: {output_dir}")
+def render_bar_charts(freq_results=None):
+    from src.util.visualization_utils import create_frequency_bar_charts
 
-    
-def main():
-    try:
-        scraper_sage = WebScraperSage()
-        scraper_sage.run()
+    _, visualizations_dir = get_output_dirs()
+    freq_results = freq_results if freq_results is not None else load_frequencies()
 
-        scraper_ieee = WebScraperIeee()
-        scraper_ieee.run()
+    print(" - Creando gráficos de barras de frecuencia...")
+    create_frequency_bar_charts(freq_results, os.path.join(visualizations_dir, "bar_charts"), top_n=15)
 
-        scraper_science = WebScraperScienceDirect()
-        scraper_science.run()
+def render_visualizations(freq_results=None, co_occur_results=None):
+    """
+    Genera las visualizaciones del análisis de texto. Si no se pasan los
+    resultados, se leen de los archivos guardados por run_text_analysis.
+    """
+    _, visualizations_dir = get_output_dirs()
+    os.makedirs(visualizations_dir, exist_ok=True)
 
-        print("Web scrapers finalizados con éxito")
-    except Exception as e:
-        print(f"Ocurrió un error con los scrapers: {e}")
+    print("Generando visualizaciones...")
+    render_wordclouds(freq_results)
+    render_co_occurrence_network(co_occur_results)
+    render_bar_charts(freq_results)
 
-    print("Iniciando análisis estadístico...")
+# Etapas del analisis de texto, en el orden en que se ejecutan
+TEXT_ANALYSIS_STAGES = ["analyze", "render_wordclouds", "render_network", "render_bar_charts"]
 
+def run_text_analysis_pipeline():
+    """
+    Ejecuta el analisis de texto y sus visualizaciones como etapas del
+    pipeline. El estado registra cada etapa terminada, asi que si una
+    ejecucion se interrumpe la siguiente retoma desde la etapa pendiente en
+    vez de repetir la tokenizacion y las graficas ya generadas.
+    """
+    force = [name.strip() for name in os.getenv("PIPELINE_FORCE", "").split(",") if name.strip()]
+    status = build_pipeline().run(force=force, only=TEXT_ANALYSIS_STAGES)
+
+    output_dir, _ = get_output_dirs()
+    if any(status[name] in ("failed", "blocked") for name in TEXT_ANALYSIS_STAGES):
+        print("El análisis de texto no terminó; la próxima ejecución retomará desde la etapa pendiente.")
+        return status
+    print("¡Proceso completado con éxito!")
+    print(f"Resultados guardados en: {output_dir}")
+    return status
+
+def build_pipeline(profile_dir=None):
+    """
+    Declara las etapas del proceso con sus entradas y salidas. Las etapas de
+    estadisticas, clustering y analisis de texto son independientes entre si y
+    se ejecutan en paralelo.
+    """
     unified_file = os.getenv("UNIQUE_FILE_PATH")
-
-    a = top_fifteen_authors(unified_file)
-    b = publication_years_per_product_type(unified_file)
-    c = count_products_by_type(unified_file)
-    d = top_fifteen_journals(unified_file)
-    e = top_fifteen_publishers(unified_file)
-
-    plot_bar_chart_from_dict(a, title='15 autores con más publicaciones', xlabel='Autores', ylabel='Cantidad')
-    plot_grouped_bar_chart(b, title='Publicaciones por Año y Tipo', xlabel='Año', ylabel='Cantidad')
-    plot_bar_chart_from_dict(c, title='Productos por tipo', xlabel='Producto', ylabel='Cantidad')
-    plot_bar_chart_from_dict(d, title='15 journals con más apariciones', xlabel='Journal', ylabel='Cantidad', rotation=90)
-    plot_bar_chart_from_dict(e, title='15 publishers con más artículos', xlabel='Publisher', ylabel='Cantidad')
-
-    fivth_requirement()
-
-    print("Ejecutando análisis de texto y visualizaciones adicionales...")
-    run_text_analysis_pipeline()
-
+    duplicate_file = os.getenv("DUPLICATE_FILE_PATH")
+    output_dir, visualizations_dir = get_output_dirs()
+    categories_file = os.path.join("src", "util", "categories.json")
+
+    pipeline = Pipeline(os.path.join(output_dir, ".pipeline_state.json"), profile_dir=profile_dir)
+    pipeline.add_stage(Stage(
+        "harvest", run_scrapers,
+        outputs=[unified_file, duplicate_file],
+        in_process=True,
+        # Solo el codigo de los scrapers: un cambio en main.py no debe repetir la cosecha
+        sources=HARVEST_SOURCES,
+    ))
+    pipeline.add_stage(Stage(
+        "stats", run_statistics,
+        inputs=[unified_file],
+        outputs=[os.path.join(visualizations_dir, "statistics")],
+        depends_on=["harvest"],
+        args=(os.path.join(visualizations_dir, "statistics"),),
+    ))
+    pipeline.add_stage(Stage(
+        "features", build_features,
+        inputs=[unified_file, os.path.join("src", "util", "feature_store.py")],
+        outputs=[os.path.join(output_dir, "features")],
+        depends_on=["harvest"],
+    ))
+    pipeline.add_stage(Stage(
+        "cluster", fivth_requirement,
+        inputs=[unified_file, os.path.join("src", "fifth_requirement.py")],
+        outputs=[os.path.join(visualizations_dir, "clustering")],
+        depends_on=["features"],
+        args=(os.path.join(visualizations_dir, "clustering"),),
+    ))
+    pipeline.add_stage(Stage(
+        "analyze", run_text_analysis,
+        inputs=[unified_file, categories_file, os.path.join("src", "model", "text_analyzer.py"),
+                os.path.join("src", "util", "term_dictionary.py")],
+        outputs=[
+            os.path.join(output_dir, "frequencies.json"),
+            os.path.join(output_dir, "co_occurrence_terms.json"),
+        ],
+        depends_on=["harvest"],
+    ))
+    pipeline.add_stage(Stage(
+        "keywords", run_keyword_analysis,
+        inputs=[unified_file, os.path.join("src", "model", "keyword_analyzer.py")],
+        outputs=[
+            os.path.join(output_dir, "keywords", "topics.json"),
+            os.path.join(output_dir, "keywords", "keyword_co_occurrence_terms.json"),
+        ],
+        depends_on=["harvest"],
+    ))
+    text_results = [
+        os.path.join(output_dir, "frequencies.json"),
+        os.path.join(output_dir, "co_occurrence_terms.json"),
+        os.path.join("src", "util", "visualization_utils.py"),
+    ]
+    # El renderizado se divide en etapas para que una interrupcion no obligue a repetir todo
+    pipeline.add_stage(Stage(
+        "render_wordclouds", render_wordclouds,
+        inputs=text_results,
+        outputs=[os.path.join(visualizations_dir, "wordclouds")],
+        depends_on=["analyze"],
+    ))
+    pipeline.add_stage(Stage(
+        "render_network", render_co_occurrence_network,
+        inputs=text_results,
+        outputs=[os.path.join(visualizations_dir, "co_occurrence_network.png")],
+        depends_on=["analyze"],
+    ))
+    pipeline.add_stage(Stage(
+        "render_bar_charts", render_bar_charts,
+        inputs=text_results,
+        outputs=[os.path.join(visualizations_dir, "bar_charts")],
+        depends_on=["analyze"],
+    ))
+    return pipeline
+
+def export_visualizations():
+    """Exporta una copia sincronizada de las visualizaciones en EXPORT_DIR (por defecto static/visualizations)."""
+    from export_images import exportar_imagenes
+
+    destino = os.getenv("EXPORT_DIR") or os.path.join("static", "visualizations")
+    exportar_imagenes(get_output_dirs()[1], destino)
+
+def serve():
     print("Iniciando servidor Flask...")
 
     # Importa app justo antes de iniciar Flask para evitar recarga doble
@@ -192,5 +468,67 @@ def main():
     # Desactiva el reloader para que no se reinicie el servidor automáticamente
     app.run(debug=True, use_reloader=False)
 
+def run_all(profile_dir=None):
+    # PIPELINE_FORCE permite repetir etapas aunque esten al dia, p. ej. "harvest,stats"
+    force = [name.strip() for name in os.getenv("PIPELINE_FORCE", "").split(",") if name.strip()]
+    build_pipeline(profile_dir).run(force=force)
+    export_prometheus()
+    serve()
+
+def show_workspaces():
+    for config in list_workspaces():
+        print(f"{config['name']}: {config.get('search_term') or '-'}")
+
+def get_commands():
+    """Subcomandos de la linea de comandos: nombre -> (funcion, ayuda)."""
+    return {
+        "harvest": (run_scrapers, "Ejecuta los web scrapers y unifica los archivos RIS"),
+        "stats": (lambda: run_statistics(os.path.join(get_output_dirs()[1], "statistics")), "Genera las gráficas estadísticas del corpus"),
+        "features": (build_features, "Actualiza el almacén de características TF-IDF de los abstracts"),
+        "cluster": (lambda: fivth_requirement(os.path.join(get_output_dirs()[1], "clustering")), "Ejecuta el clustering jerárquico de los abstracts"),
+        "analyze": (run_text_analysis, "Calcula frecuencias y co-ocurrencias de términos"),
+        "keywords": (run_keyword_analysis, "Calcula co-ocurrencias y temas de las palabras clave de autor"),
+        "render": (render_visualizations, "Genera las visualizaciones a partir de los resultados guardados"),
+        "text": (run_text_analysis_pipeline, "Análisis de texto y visualizaciones, retomando desde la última etapa terminada"),
+        "export": (export_visualizations, "Exporta una copia de las visualizaciones en EXPORT_DIR"),
+        "serve": (serve, "Inicia el servidor Flask con el tablero de visualizaciones"),
+        "workspaces": (show_workspaces, "Lista los workspaces y sus términos de búsqueda"),
+        "all": (None, "Ejecuta el pipeline completo (omitiendo etapas al día) e inicia el servidor"),
+    }
+
+def main(argv=None):
+    commands = get_commands()
+
+    parser = argparse.ArgumentParser(description="Proyecto de Análisis de Algoritmos")
+    parser.add_argument("--profile", action="store_true", help="Perfila cada etapa con cProfile y reporta tiempo de pared, CPU y pico de memoria")
+    parser.add_argument("--profile-dir", default=None, help="Directorio de salida del perfil (por defecto results/profile)")
+    parser.add_argument("--workspace", default=None, help="Workspace con nombre: corpus y resultados propios bajo WORKSPACES_DIR, con caché compartida")
+    parser.add_argument("--search-term", default=None, help="Término de búsqueda del workspace (se guarda para las siguientes ejecuciones)")
+    subparsers = parser.add_subparsers(dest="command")
+    for name, (_, help_text) in commands.items():
+        subparsers.add_parser(name, help=help_text)
+    args = parser.parse_args(argv)
+
+    if args.workspace:
+        activate_workspace(args.workspace, args.search_term)
+    elif args.search_term:
+        os.environ["SEARCH_TERM"] = args.search_term
+
+    profile_dir = None
+    if args.profile:
+        profile_dir = args.profile_dir or os.path.join(get_output_dirs()[0], "profile")
+
+    command = args.command or "all"
+    if command == "all":
+        run_all(profile_dir)
+        return
+
+    func = commands[command][0]
+    try:
+        with measure(f"stage:{command}"), profile_stage(command, profile_dir) if profile_dir else nullcontext():
+            func()
+    finally:
+        export_prometheus()
+
 if __name__ == '__main__':
     main()
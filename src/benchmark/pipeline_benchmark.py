@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from src.benchmark.synthetic_corpus import generate_entries, write_corpus
+
+DEFAULT_CORPORA_DIR = os.path.join("resources", "benchmarks", "corpora")
+DEFAULT_BASELINE = os.path.join("resources", "benchmarks", "baseline.json")
+# Abstracts que se agrupan como maximo: el linkage es cuadratico en memoria
+DEFAULT_CLUSTER_MAX_DOCUMENTS = 5000
+
+
+def _time(func, repeat):
+    """Ejecuta func repeat veces y retorna el menor tiempo (s), el mas estable entre corridas."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def check_corpus(corpus_path, size):
+    """
+    Verifica que read_ris_file conserve los abstracts del corpus sintetico,
+    incluidas las lineas de continuacion que parecen etiquetas ("IT-based ...").
+    """
+    from src.util.ris_utils import read_ris_file
+
+    # rispy une las lineas de continuacion con un espacio
+    expected = [entry["abstract"].replace("\n", " ") for entry in generate_entries(size)]
+    parsed = [entry.get("abstract") for entry in read_ris_file(corpus_path)]
+    if len(parsed) != len(expected):
+        raise RuntimeError(f"read_ris_file leyó {len(parsed)} registros de {len(expected)} en {corpus_path}")
+    for index, (abstract, reference) in enumerate(zip(parsed, expected)):
+        if abstract != reference:
+            raise RuntimeError(f"Abstract del registro {index + 1} alterado al leer {corpus_path}: {abstract!r}")
+
+
+def benchmark_scale(size, corpora_dir, repeat, render, cluster_max_documents=DEFAULT_CLUSTER_MAX_DOCUMENTS):
+    """
+    Ejecuta los benchmarks sobre un corpus sintetico de size registros. El
+    clustering agrupa todo el corpus, hasta cluster_max_documents abstracts
+    (None para no limitar).
+
+    Returns:
+        dict: nombre del benchmark -> segundos.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+
+    from src.fifth_requirement import HierarchicalClustering
+    from src.model.text_analyzer import TextAnalyzer
+    from src.util.ris_utils import merge_ris_file, read_ris_file
+    from src.util.visualization_utils import create_category_wordclouds, create_co_occurrence_network, create_frequency_bar_charts
+
+    corpus_path, batches_dir = write_corpus(corpora_dir, size)
+    check_corpus(corpus_path, size)
+    work_dir = tempfile.mkdtemp(prefix="pipeline_benchmark_")
+    results = {}
+
+    try:
+        results["read_ris_file"] = _time(lambda: read_ris_file(corpus_path), repeat)
+
+        def merge():
+            os.environ["UNIQUE_FILE_PATH"] = os.path.join(work_dir, "unique.ris")
+            os.environ["DUPLICATE_FILE_PATH"] = os.path.join(work_dir, "duplicate.ris")
+            for path in (os.environ["UNIQUE_FILE_PATH"], os.environ["DUPLICATE_FILE_PATH"]):
+                if os.path.exists(path):
+                    os.remove(path)
+            merge_ris_file(batches_dir)
+
+        results["merge_ris_file"] = _time(merge, repeat)
+
+        # Cada medicion usa un analizador nuevo: la memoria de terminos por abstract no debe llegar caliente
+        results["TextAnalyzer.analyze_frequency"] = _time(lambda: TextAnalyzer(corpus_path).analyze_frequency(), repeat)
+        results["TextAnalyzer.analyze_co_occurrence"] = _time(lambda: TextAnalyzer(corpus_path).analyze_co_occurrence(), repeat)
+
+        cluster_documents = size if cluster_max_documents is None else min(size, cluster_max_documents)
+
+        def cluster():
+            clustering = HierarchicalClustering()
+            clustering.load_data(corpus_path, max_documents=cluster_documents)
+            clustering.vectorize_texts()
+            clustering.compare_methods(os.path.join(work_dir, "clustering"))
+
+        results["HierarchicalClustering.compare_methods"] = _time(cluster, repeat)
+
+        if render:
+            analyzer = TextAnalyzer(corpus_path)
+            frequencies = analyzer.analyze_frequency()
+            co_occurrences = analyzer.analyze_co_occurrence()
+            visualizations_dir = os.path.join(work_dir, "visualizations")
+            results["create_category_wordclouds"] = _time(
+                lambda: create_category_wordclouds(frequencies, os.path.join(visualizations_dir, "wordclouds")), 1)
+            results["create_co_occurrence_network"] = _time(
+                lambda: create_co_occurrence_network(co_occurrences, os.path.join(visualizations_dir, "network.png"), min_weight=2, max_nodes=30), 1)
+            results["create_frequency_bar_charts"] = _time(
+                lambda: create_frequency_bar_charts(frequencies, os.path.join(visualizations_dir, "bar_charts"), top_n=15), 1)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return results
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """
+    Compara los resultados con la linea base.
+
+    Returns:
+        list: Benchmarks que superan la linea base en mas de tolerance.
+    """
+    regressions = []
+    for name, seconds in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        change = (seconds - reference) / reference if reference else 0.0
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  <-- REGRESION"
+        print(f"{name:<60}{reference:>10.3f}{seconds:>10.3f}{change:>+9.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del pipeline con corpus RIS sinteticos")
+    parser.add_argument("--scales", nargs="+", type=int, default=[1000, 10000],
+                        help="Tamaños de corpus a medir (p. ej. 1000 10000 100000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por benchmark; se reporta el minimo")
+    parser.add_argument("--corpora-dir", default=DEFAULT_CORPORA_DIR, help="Directorio donde se generan los corpus sinteticos")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Archivo JSON con la linea base")
+    parser.add_argument("--save-baseline", action="store_true", help="Guarda los resultados como nueva linea base")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Aumento relativo permitido antes de fallar")
+    parser.add_argument("--no-render", action="store_true", help="Omite los benchmarks de visualizaciones")
+    parser.add_argument("--cluster-max-documents", type=int, default=DEFAULT_CLUSTER_MAX_DOCUMENTS,
+                        help="Abstracts que agrupa el benchmark de clustering como maximo (0 para no limitar)")
+    args = parser.parse_args()
+
+    results = {}
+    for size in args.scales:
+        print(f"[BENCHMARK] Corpus sintetico de {size} registros")
+        for name, seconds in benchmark_scale(
+                size, args.corpora_dir, args.repeat, not args.no_render, args.cluster_max_documents or None).items():
+            results[f"{name}@{size}"] = seconds
+            print(f"  {name:<45}{seconds:>10.3f} s")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Linea base guardada en {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No existe linea base en {args.baseline}; ejecute con --save-baseline para crearla.")
+        return
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    print(f"\n{'Benchmark':<60}{'Base (s)':>10}{'Actual':>10}{'Cambio':>9}")
+    regressions = compare_with_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) con regresion mayor al {args.tolerance:.0%}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+import hashlib
+import mimetypes
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Tipo MIME de los archivos RIS exportados por las bases de datos
+RIS_CONTENT_TYPE = "application/x-research-info-systems"
+
+
+def fixture_path(fixtures_dir, url):
+    """
+    Calcula la ruta del fixture que corresponde a una URL.
+
+    Las paginas se guardan como <fixtures>/<host>/<ruta>. Si la URL tiene
+    query string se agrega un hash corto al nombre, asi las distintas paginas
+    de resultados de una misma ruta no se sobrescriben.
+
+    Args:
+        fixtures_dir (str): Directorio raiz de los fixtures.
+        url (str): URL absoluta de la pagina.
+
+    Returns:
+        str: Ruta del archivo del fixture.
+    """
+    parts = urlsplit(url)
+    path = parts.path.strip("/") or "index"
+    if parts.query:
+        digest = hashlib.sha1(parts.query.encode("utf-8")).hexdigest()[:10]
+        path = f"{path}__{digest}"
+    if not os.path.splitext(path)[1]:
+        path += ".html"
+    return os.path.join(fixtures_dir, parts.hostname or "localhost", *path.split("/"))
+
+
+class _ReplayHandler(SimpleHTTPRequestHandler):
+    """Responde cada peticion con el fixture grabado para su host y ruta."""
+
+    def do_GET(self):
+        host = (self.headers.get("Host") or "localhost").split(":")[0]
+        url = f"http://{host}{self.path}"
+        candidates = [fixture_path(self.server.fixtures_dir, url)]
+        # Si no existe la variante con query string se usa la pagina base
+        base_url = url.split("?", 1)[0]
+        if base_url != url:
+            candidates.append(fixture_path(self.server.fixtures_dir, base_url))
+
+        for candidate in candidates:
+            if os.path.isfile(candidate):
+                self._send_fixture(candidate)
+                return
+
+        self.send_error(404, f"Fixture no grabado: {url}")
+
+    def _send_fixture(self, path):
+        with open(path, "rb") as f:
+            body = f.read()
+
+        self.send_response(200)
+        if path.endswith(".ris"):
+            self.send_header("Content-Type", RIS_CONTENT_TYPE)
+            self.send_header("Content-Disposition", f'attachment; filename="{os.path.basename(path)}"')
+        else:
+            content_type = mimetypes.guess_type(path)[0] or "text/html"
+            self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # Las peticiones POST de los formularios (login, busqueda) se tratan como GET
+    do_POST = do_GET
+
+    def log_message(self, format, *args):
+        # Silencia el log por peticion para no distorsionar las mediciones
+        pass
+
+
+class ReplayServer:
+    """
+    Servidor HTTP local que sirve las paginas grabadas de CRAI, Sage, IEEE y
+    ScienceDirect. El navegador se redirige a este servidor con
+    --host-resolver-rules, por lo que las URLs absolutas de los fixtures se
+    resuelven localmente.
+    """
+
+    def __init__(self, fixtures_dir, port=0):
+        self.fixtures_dir = fixtures_dir
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), _ReplayHandler)
+        self._server.fixtures_dir = self.fixtures_dir
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"[REPLAY] Sirviendo fixtures de {self.fixtures_dir} en el puerto {self.port}")
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def host_resolver_rules(self):
+        """Argumento de Chrome que envia todos los hosts al servidor local."""
+        return f"--host-resolver-rules=MAP * 127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
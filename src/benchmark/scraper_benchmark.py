@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+import shlex
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+from dotenv import load_dotenv
+from selenium.webdriver.support.ui import WebDriverWait
+
+from src.benchmark.replay_server import ReplayServer, fixture_path
+
+SCRAPERS = {
+    "sage": ("src.model.web_scraper_sage", "WebScraperSage"),
+    "sage-async": ("src.model.async_scraper", "AsyncWebScraperSage"),
+    "ieee": ("src.model.web_scraper_ieee", "WebScraperIeee"),
+    "science": ("src.model.web_scraper_science_direct", "WebScraperScienceDirect"),
+}
+
+DEFAULT_FIXTURES_DIR = os.path.join("resources", "fixtures")
+
+
+class WaitProfiler:
+    """
+    Mide el tiempo que los scrapers pasan esperando: llamadas a
+    WebDriverWait.until/until_not y time.sleep explicitos. Los sleeps internos
+    del polling de WebDriverWait se cuentan dentro de la espera y no dos veces.
+
+    Si se indica recorder, despues de cada espera exitosa se graba la pagina
+    actual como fixture.
+    """
+
+    def __init__(self, recorder=None):
+        self.recorder = recorder
+        self.wait_time = 0.0
+        self.wait_calls = 0
+        self.sleep_time = 0.0
+        self.sleep_calls = 0
+        self._local = threading.local()
+        self._originals = {}
+
+    def __enter__(self):
+        self._originals = {
+            "until": WebDriverWait.until,
+            "until_not": WebDriverWait.until_not,
+            "sleep": time.sleep,
+        }
+        WebDriverWait.until = self._wrap_wait(self._originals["until"])
+        WebDriverWait.until_not = self._wrap_wait(self._originals["until_not"])
+        time.sleep = self._sleep
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        WebDriverWait.until = self._originals["until"]
+        WebDriverWait.until_not = self._originals["until_not"]
+        time.sleep = self._originals["sleep"]
+
+    def _wrap_wait(self, original):
+        profiler = self
+
+        def wrapper(wait, *args, **kwargs):
+            profiler._local.in_wait = True
+            start = time.perf_counter()
+            try:
+                result = original(wait, *args, **kwargs)
+            finally:
+                profiler.wait_time += time.perf_counter() - start
+                profiler.wait_calls += 1
+                profiler._local.in_wait = False
+            if profiler.recorder:
+                profiler.recorder.save(wait._driver)
+            return result
+
+        return wrapper
+
+    def _sleep(self, seconds):
+        if getattr(self._local, "in_wait", False) or threading.current_thread() is not threading.main_thread():
+            self._originals["sleep"](seconds)
+            return
+        start = time.perf_counter()
+        self._originals["sleep"](seconds)
+        self.sleep_time += time.perf_counter() - start
+        self.sleep_calls += 1
+
+
+class FixtureRecorder:
+    """Graba el HTML de las paginas visitadas durante una ejecucion real."""
+
+    def __init__(self, fixtures_dir):
+        self.fixtures_dir = fixtures_dir
+
+    def save(self, driver):
+        try:
+            url = driver.current_url
+            html = driver.page_source
+        except Exception:
+            return
+        if not url.startswith("http"):
+            return
+
+        # Los enlaces se pasan a http para que el servidor local pueda servirlos
+        html = html.replace("https://", "http://")
+        path = fixture_path(self.fixtures_dir, url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+
+
+def _replay_url(url):
+    """Convierte la URL de la biblioteca a http para el servidor local."""
+    parts = urlsplit(url)
+    return urlunsplit(("http",) + tuple(parts[1:]))
+
+
+def run_scraper(name, profiler):
+    """
+    Ejecuta un scraper y retorna sus metricas.
+
+    Returns:
+        dict: Tiempo total, tiempo por pagina y tiempo en esperas.
+    """
+    module_name, class_name = SCRAPERS[name]
+    module = __import__(module_name, fromlist=[class_name])
+    scraper_class = getattr(module, class_name)
+
+    wait_before, sleep_before = profiler.wait_time, profiler.sleep_time
+    start = time.perf_counter()
+    scraper = scraper_class()
+    error = None
+    try:
+        scraper.run()
+    except Exception as e:
+        error = str(e)
+        try:
+            scraper.driver.quit()
+        except Exception:
+            pass
+    total = time.perf_counter() - start
+
+    page_times = list(scraper.page_times)
+    return {
+        "scraper": name,
+        "total_time": round(total, 3),
+        "pages": len(page_times),
+        "page_times": [round(t, 3) for t in page_times],
+        "mean_page_time": round(sum(page_times) / len(page_times), 3) if page_times else None,
+        "wait_time": round(profiler.wait_time - wait_before, 3),
+        "sleep_time": round(profiler.sleep_time - sleep_before, 3),
+        "error": error,
+    }
+
+
+def print_report(results):
+    print(f"\n{'Scraper':<10}{'Total (s)':>12}{'Paginas':>10}{'s/pagina':>12}{'Esperas (s)':>14}{'Sleeps (s)':>13}")
+    for r in results:
+        mean = f"{r['mean_page_time']:.3f}" if r["mean_page_time"] is not None else "-"
+        print(f"{r['scraper']:<10}{r['total_time']:>12.3f}{r['pages']:>10}{mean:>12}{r['wait_time']:>14.3f}{r['sleep_time']:>13.3f}")
+        if r["error"]:
+            print(f"  [ERROR] {r['error']}")
+    harvest = sum(r["total_time"] for r in results)
+    print(f"\nTiempo total de la cosecha: {harvest:.3f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline de los web scrapers con paginas grabadas")
+    parser.add_argument("scrapers", nargs="*", choices=list(SCRAPERS), default=list(SCRAPERS))
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES_DIR, help="Directorio de fixtures grabados")
+    parser.add_argument("--record", action="store_true", help="Graba fixtures contra el portal real en lugar de reproducirlos")
+    parser.add_argument("--output", help="Archivo JSON donde guardar las metricas")
+    args = parser.parse_args()
+
+    load_dotenv()
+    work_dir = tempfile.mkdtemp(prefix="scraper_benchmark_")
+
+    server = None
+    if not args.record:
+        server = ReplayServer(args.fixtures).start()
+        os.environ["HEADLESS"] = "1"
+        # La regla contiene espacios: se agrega entre comillas para que llegue como un solo argumento
+        os.environ["BROWSER_ARGS"] = f"{os.getenv('BROWSER_ARGS', '')} {shlex.quote(server.host_resolver_rules())}".strip()
+        os.environ["BIBLIOTECA_CRAI"] = _replay_url(os.getenv("BIBLIOTECA_CRAI", "http://library.uniquindio.edu.co/databases"))
+        os.environ.setdefault("EMAIL", "benchmark@example.com")
+        os.environ.setdefault("PASSWORD", "benchmark")
+        os.environ.setdefault("SEARCH_TERM", "computational thinking")
+
+    # Las descargas y el corpus unificado van a un directorio temporal
+    os.environ["DOWNLOAD_PATH"] = os.path.join(work_dir, "downloads")
+    os.environ["UNIQUE_FILE_PATH"] = os.path.join(work_dir, "unique.ris")
+    os.environ["DUPLICATE_FILE_PATH"] = os.path.join(work_dir, "duplicate.ris")
+
+    recorder = FixtureRecorder(args.fixtures) if args.record else None
+    results = []
+    try:
+        with WaitProfiler(recorder) as profiler:
+            for name in args.scrapers:
+                print(f"[BENCHMARK] Ejecutando scraper: {name}")
+                results.append(run_scraper(name, profiler))
+    finally:
+        if server:
+            server.stop()
+
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
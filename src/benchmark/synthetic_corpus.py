@@ -0,0 +1,128 @@
+import json
+import os
+import random
+
+import rispy
+
+CATEGORIES_FILE = os.path.join(os.path.dirname(__file__), '..', 'util', 'categories.json')
+
+FILLER_WORDS = (
+    "study students teachers learning results research data analysis approach method "
+    "education school primary secondary university course activity program performance "
+    "participants sample framework model effect significant development assessment design "
+    "intervention experimental group control outcomes evidence context practice training "
+    "curriculum knowledge understanding digital technology online classroom instruction"
+).split()
+
+FIRST_NAMES = ["Ana", "John", "Maria", "Wei", "Carlos", "Laura", "Ahmed", "Sofia", "David", "Elena",
+               "Kenji", "Fatima", "Lucas", "Olga", "Peter", "Yousri", "Ali", "Grace", "Ivan", "Nora"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Rodriguez", "Muller", "Rossi", "Kim", "Silva", "Nguyen", "Lopez",
+              "Brown", "Tanaka", "Ivanova", "Hassan", "Martin", "Alqarni", "Novak", "Jensen", "Costa", "Ortiz"]
+JOURNALS = ["Journal of Educational Computing Research", "Computers & Education", "Education and Information Technologies",
+            "IEEE Transactions on Education", "Thinking Skills and Creativity", "Computer Science Education",
+            "International Journal of STEM Education", "Journal of Science Education and Technology"]
+PUBLISHERS = ["SAGE Publications Inc", "Elsevier", "Springer", "IEEE",
+              "Institute of Electrical and Electronics Engineers", "Taylor & Francis", "Wiley"]
+TYPES = ["JOUR"] * 7 + ["CONF"] * 2 + ["CHAP"]
+# Lineas de continuacion que empiezan como una etiqueta RIS ("IT-based"), como en los abstracts reales con saltos de linea
+WRAPPED_LINES = ["IT-based tools were used in the classroom.", "AI-driven feedback improved the results.",
+                 "K12-level students took part in the study."]
+# Cambia cuando cambia el contenido generado, para no reutilizar corpus anteriores
+CORPUS_VERSION = 2
+
+
+def _load_terms():
+    with open(CATEGORIES_FILE, 'r', encoding='utf-8') as f:
+        categories = json.load(f)
+    return [term for terms in categories.values() for term in terms]
+
+
+def _author(rng):
+    last = rng.choice(LAST_NAMES)
+    first = rng.choice(FIRST_NAMES)
+    # Variantes del mismo autor, como aparecen en las exportaciones reales
+    variant = rng.random()
+    if variant < 0.2:
+        return f"{last}, {first[0]}."
+    if variant < 0.3:
+        return f"{last.upper()}, {first}"
+    return f"{last}, {first}"
+
+
+def _abstract(rng, terms):
+    words = rng.choices(FILLER_WORDS, k=rng.randint(80, 200))
+    # Entre 0 y 6 terminos de las categorias insertados en posiciones aleatorias
+    for term in rng.sample(terms, rng.randint(0, 6)):
+        words.insert(rng.randrange(len(words) + 1), term.split(" - ")[0].split(" – ")[0])
+    text = " ".join(words)
+    text = text[0].upper() + text[1:] + "."
+    if rng.random() < 0.1:
+        text += "\n" + rng.choice(WRAPPED_LINES)
+    return text
+
+
+def generate_entries(size, seed=42, doi_less_rate=0.1, duplicate_rate=0.05):
+    """
+    Genera entradas RIS sinteticas con abstracts que contienen terminos de
+    categories.json, palabras clave, registros sin DOI y duplicados.
+
+    Args:
+        size (int): Cantidad de registros.
+        seed (int): Semilla para que el corpus sea reproducible.
+        doi_less_rate (float): Proporcion de registros sin DOI.
+        duplicate_rate (float): Proporcion de registros que repiten uno anterior.
+
+    Returns:
+        list: Entradas con las claves de rispy.
+    """
+    rng = random.Random(seed)
+    terms = _load_terms()
+    entries = []
+
+    for index in range(size):
+        if entries and rng.random() < duplicate_rate:
+            entries.append(dict(rng.choice(entries)))
+            continue
+
+        entry = {
+            "type_of_reference": rng.choice(TYPES),
+            "primary_title": " ".join(rng.choices(FILLER_WORDS, k=rng.randint(6, 14))).capitalize(),
+            "authors": [_author(rng) for _ in range(rng.randint(1, 5))],
+            "year": str(rng.randint(2000, 2025)),
+            "journal_name": rng.choice(JOURNALS),
+            "publisher": rng.choice(PUBLISHERS),
+            "abstract": _abstract(rng, terms),
+            "keywords": rng.sample(terms, rng.randint(3, 6)),
+            "urls": [f"https://example.org/articles/{index}"],
+        }
+        if rng.random() >= doi_less_rate:
+            entry["doi"] = f"10.5555/synthetic.{seed}.{index}"
+        entries.append(entry)
+
+    return entries
+
+
+def write_corpus(directory, size, seed=42, batch_size=100):
+    """
+    Escribe el corpus sintetico como un archivo unico y como lotes de
+    exportacion (para merge_ris_file). Si ya existe, lo reutiliza.
+
+    Returns:
+        tuple: (ruta del archivo unico, directorio de los lotes)
+    """
+    corpus_path = os.path.join(directory, f"corpus_v{CORPUS_VERSION}_{size}.ris")
+    batches_dir = os.path.join(directory, f"batches_v{CORPUS_VERSION}_{size}")
+    if os.path.exists(corpus_path) and os.path.isdir(batches_dir):
+        return corpus_path, batches_dir
+
+    os.makedirs(batches_dir, exist_ok=True)
+    entries = generate_entries(size, seed=seed)
+
+    with open(corpus_path, 'w', encoding='utf-8') as f:
+        rispy.dump(entries, f)
+
+    for number, start in enumerate(range(0, size, batch_size)):
+        with open(os.path.join(batches_dir, f"batch-{number}.ris"), 'w', encoding='utf-8') as f:
+            rispy.dump(entries[start:start + batch_size], f)
+
+    return corpus_path, batches_dir
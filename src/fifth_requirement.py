@@ -1,98 +1,216 @@
+import json
+import os
+
 import matplotlib.pyplot as plt
-import re
+import numpy as np
 
-import rispy
-import nltk
-from nltk.corpus import stopwords
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics import adjusted_rand_score, normalized_mutual_info_score
-from sklearn.cluster import AgglomerativeClustering
-from scipy.cluster.hierarchy import linkage, dendrogram, cophenet
+from scipy import sparse
+from scipy.cluster.hierarchy import linkage, dendrogram, cophenet, fcluster
 from scipy.spatial.distance import pdist
 
-nltk.download('stopwords')
+from src.util.atomic import atomic_savefig
+from src.util.feature_store import FeatureStore
+from src.util.instrumentation import instrumented
+from src.util.ris_utils import iter_abstract_documents, load_corpus
+
+
+def _abstract_count(result, clustering, *args, **kwargs):
+    """Cantidad de abstracts procesados, para las metricas de instrumentacion."""
+    return len(clustering.abstracts)
+
 
 class HierarchicalClustering:
     def __init__(self):
         self.abstracts = []
+        # Todos los abstracts del corpus (clave, abstract) y las claves de los seleccionados
+        self.documents = []
+        self.keys = []
         self.X = None
+        # Almacen de caracteristicas y columnas de hashing de cada columna de X
+        self.store = None
+        self.columns = None
+        # Linkage calculado por metodo, para cortarlo sin volver a ajustar
+        self.linkages = {}
         self.categories = []
         self.true_labels = []
         self.labels=[]
 
-    def load_data(self, ris_path):
-        with open(ris_path, 'r', encoding='utf-8') as f:
-            entries = rispy.load(f)
+    @instrumented(count=_abstract_count)
+    def load_data(self, ris_path, max_documents=50):
+        """Carga los abstracts con palabras clave (a lo sumo max_documents; None para todos)."""
+        entries = load_corpus(ris_path)
 
         abstracts = []
         keywords = []
-
-        for entry in entries:
-            if 'abstract' in entry and 'keywords' in entry:
-                abstracts.append(entry['abstract'])
+        self.documents = []
+        self.keys = []
+
+        for key, abstract, entry in iter_abstract_documents(entries):
+            self.documents.append((key, abstract))
+            # Los abstracts seleccionados se toman tal cual: el almacen de caracteristicas los tokeniza
+            if 'keywords' in entry and (max_documents is None or len(self.keys) < max_documents):
+                self.keys.append(key)
+                abstracts.append(abstract)
                 keywords.append(', '.join(entry['keywords']) if isinstance(entry['keywords'], list) else entry['keywords'])
 
-        self.abstracts = [self.clean_text(abs) for abs in abstracts][:50]
-        self.categories = keywords[:50]
+        self.abstracts = abstracts
+        self.categories = keywords
 
         self.labels = [' '.join(cat.split()[:3]) for cat in self.categories]
         unique_categories = list(set(self.categories))
         self.true_labels = [unique_categories.index(cat) for cat in self.categories]
         print(f"[INFO] {len(self.abstracts)} abstracts y categorías cargadas desde .ris")
 
-
-    def clean_text(self, text):
-        text = text.lower()
-        text = re.sub(r'[^\w\s]', '', text)
-        words = text.split()
-        clean_words = [word for word in words if word not in stopwords.words('english')]
-        return ' '.join(clean_words)
-
-    def vectorize_texts(self):
-        vectorizer = TfidfVectorizer()
-        self.X = vectorizer.fit_transform(self.abstracts).toarray()
+    @instrumented(count=_abstract_count)
+    def vectorize_texts(self, features_dir=None):
+        """
+        Obtiene la matriz TF-IDF de los abstracts seleccionados desde el
+        almacen de caracteristicas compartido. Con features_dir el almacen se
+        guarda ahi y solo se vectorizan los abstracts nuevos o modificados.
+        """
+        if features_dir:
+            store = FeatureStore.update(self.documents, features_dir)
+        else:
+            store = FeatureStore.build(self.documents)
+        X = store.tfidf(self.keys)
+        # Solo se densifican las columnas usadas por estos abstracts; las distancias no cambian
+        self.store = store
+        self.columns = np.flatnonzero(X.getnnz(axis=0))
+        self.X = X[:, self.columns].toarray()
         print("[INFO] Vectorización TF-IDF completada.")
 
+    @instrumented(count=_abstract_count)
     def apply_clustering(self, method):
         if self.X is None:
             raise ValueError("Debes vectorizar los textos antes de aplicar clustering.")
         linkage_matrix = linkage(self.X, method=method)
+        self.linkages[method] = linkage_matrix
         return linkage_matrix
 
-    def compare_methods(self):
+    def cut(self, linkage_matrix, n_clusters=None, distance=None):
+        """
+        Corta un linkage ya calculado en una cantidad de clusters o a una
+        distancia, sin volver a ajustar el clustering.
+
+        Args:
+            linkage_matrix (np.ndarray): Resultado de apply_clustering.
+            n_clusters (int, optional): Cantidad maxima de clusters.
+            distance (float, optional): Distancia de corte.
+
+        Returns:
+            np.ndarray: Cluster (1..k) de cada abstract.
+        """
+        if (n_clusters is None) == (distance is None):
+            raise ValueError("Debes indicar n_clusters o distance.")
+        if n_clusters is not None:
+            return fcluster(linkage_matrix, n_clusters, criterion='maxclust')
+        return fcluster(linkage_matrix, distance, criterion='distance')
+
+    @instrumented(count=_abstract_count)
+    def summarize_clusters(self, labels, top_n=10):
+        """
+        Resume cada cluster con sus terminos de mayor peso TF-IDF en el
+        centroide y su abstract representativo (el mas cercano al centroide).
+        Los centroides se calculan todos a la vez con una matriz de pertenencia.
+
+        Args:
+            labels (np.ndarray): Cluster de cada abstract, p. ej. el resultado de cut.
+            top_n (int): Terminos por cluster.
+
+        Returns:
+            list: Por cluster: id, tamaño, terminos y abstract representativo, del mas grande al mas chico.
+        """
+        clusters, codes = np.unique(labels, return_inverse=True)
+        n_documents = len(codes)
+        membership = sparse.csr_matrix(
+            (np.ones(n_documents), (codes, np.arange(n_documents))), shape=(len(clusters), n_documents),
+        )
+        sizes = np.bincount(codes, minlength=len(clusters))
+        centroids = (membership @ self.X) / sizes[:, None]
+
+        # Las filas de X tienen norma 1, asi que el producto con el centroide ordena por similitud coseno
+        scores = np.einsum('ij,ij->i', self.X, centroids[codes])
+        order = np.lexsort((-scores, codes))
+        representatives = order[np.searchsorted(codes[order], np.arange(len(clusters)))]
+        top_columns = np.argsort(-centroids, axis=1)[:, :top_n]
+
+        abstracts = dict(self.documents)
+        terms = self.store.column_terms(abstracts[key] for key in self.keys)
+        summary = []
+        for i, cluster in enumerate(clusters):
+            key = self.keys[representatives[i]]
+            summary.append({
+                'cluster': int(cluster),
+                'size': int(sizes[i]),
+                'terms': [terms.get(int(self.columns[j]), str(self.columns[j])) for j in top_columns[i] if centroids[i, j] > 0],
+                'representative': {'key': key, 'abstract': abstracts[key]},
+            })
+        summary.sort(key=lambda cluster: -cluster['size'])
+        return summary
+
+    @instrumented(count=_abstract_count)
+    def compare_methods(self, output_dir=None, n_clusters=10):
         methods = ['ward', 'average']
         results = {}
 
         for method in methods:
             print(f"\n[INFO] Aplicando clustering con método: {method}")
             linkage_matrix = self.apply_clustering(method)
-            self.plot_dendrogram(linkage_matrix, method)
+            output_path = os.path.join(output_dir, f"dendrogram_{method}.png") if output_dir else None
+            self.plot_dendrogram(linkage_matrix, method, output_path)
             c = self.evaluate_quality(linkage_matrix)
             print(f"[RESULTADO] Coeficiente cophenético para '{method}': {c:.4f}")
             results[method] = c
 
-            self.evaluate_clusterings_categories(method)
+            self.evaluate_clusterings_categories(linkage_matrix, method)
+
+            summary = self.summarize_clusters(self.cut(linkage_matrix, n_clusters=n_clusters))
+            for cluster in summary[:3]:
+                print(f"[CLUSTER] {cluster['cluster']} ({cluster['size']} abstracts): {', '.join(cluster['terms'][:5])}")
+            if output_dir:
+                summary_path = os.path.join(output_dir, f"clusters_{method}.json")
+                with open(summary_path + '.tmp', 'w', encoding='utf-8') as f:
+                    json.dump(summary, f, ensure_ascii=False, indent=2)
+                os.replace(summary_path + '.tmp', summary_path)
 
         best = max(results, key=results.get)
         print(f"\nEl método con mejor coeficiente cophenético es: '{best}' con {results[best]:.4f}")
 
-    def plot_dendrogram(self, linkage_matrix, title):
+    @instrumented(count=_abstract_count)
+    def plot_dendrogram(self, linkage_matrix, title, output_path=None, p=30, truncate_mode='lastp'):
+        """
+        Dibuja el dendrograma. Con mas de p hojas se trunca (truncate_mode
+        'lastp': los ultimos p clusters formados; 'level': p niveles) y cada
+        hoja muestra la cantidad de abstracts que agrupa.
+        """
         plt.figure(figsize=(10, 7))
-        dendrogram(linkage_matrix, labels=self.labels)
+        if len(linkage_matrix) + 1 > p:
+            dendrogram(linkage_matrix, truncate_mode=truncate_mode, p=p, show_leaf_counts=True, show_contracted=True)
+            plt.xlabel('Clusters (cantidad de abstracts)')
+        else:
+            dendrogram(linkage_matrix, labels=self.labels)
+            plt.xlabel('Abstracts')
         plt.title(f'Dendrograma - Método {title}')
-        plt.xlabel('Abstracts')
         plt.ylabel('Distancia')
         plt.xticks(rotation=90)
         plt.tight_layout()
-        plt.show()
-
+        if output_path:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            atomic_savefig(output_path, dpi=150, bbox_inches='tight')
+            plt.close()
+        else:
+            plt.show()
+
+    @instrumented(count=_abstract_count)
     def evaluate_quality(self, linkage_matrix):
         c, _ = cophenet(linkage_matrix, pdist(self.X))
         return c
 
-    def evaluate_clusterings_categories(self, method):
-        clustering = AgglomerativeClustering(n_clusters=len(set(self.true_labels)), linkage=method)
-        labels_pred = clustering.fit_predict(self.X)
+    @instrumented(count=_abstract_count)
+    def evaluate_clusterings_categories(self, linkage_matrix, method):
+        # Se corta el linkage ya calculado en vez de volver a ajustar el clustering
+        labels_pred = self.cut(linkage_matrix, n_clusters=len(set(self.true_labels)))
 
         ari = adjusted_rand_score(self.true_labels, labels_pred)
         nmi = normalized_mutual_info_score(self.true_labels, labels_pred)
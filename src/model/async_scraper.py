@@ -0,0 +1,147 @@
+import asyncio
+import os
+import time
+from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
+
+from src.util.cdp_client import CDPBrowser
+from src.util.ris_utils import merge_ris_file
+from src.util.utils import validate_path
+
+# Pestañas simultaneas por navegador
+DEFAULT_MAX_TABS = 4
+# Paginas de resultados que se exportan, igual que los scrapers con Selenium
+RESULT_PAGES = 10
+
+
+class AsyncScrapeCoordinator:
+    """
+    Reparte paginas entre pestañas de un mismo navegador. Cada pagina se
+    procesa en su propia pestaña y un semaforo limita cuantas estan abiertas
+    a la vez; las pestañas comparten cookies, asi que basta con iniciar sesion
+    una vez. Un fallo en una pagina no detiene las demas.
+    """
+
+    def __init__(self, browser, max_tabs=DEFAULT_MAX_TABS, page_timeout=120):
+        self.browser = browser
+        self.max_tabs = max_tabs
+        self.page_timeout = page_timeout
+        self.page_times = []
+        self.errors = {}
+
+    async def scrape(self, urls, handler):
+        """
+        Ejecuta handler(tab, index, url) para cada url.
+
+        Returns:
+            list: Resultado de cada pagina en el orden de urls (None si fallo).
+        """
+        semaphore = asyncio.Semaphore(self.max_tabs)
+
+        async def run_page(index, url):
+            async with semaphore:
+                start = time.perf_counter()
+                tab = None
+                try:
+                    tab = await self.browser.new_tab()
+                    result = await asyncio.wait_for(handler(tab, index, url), self.page_timeout)
+                except Exception as e:
+                    self.errors[index] = f"{type(e).__name__}: {e}"
+                    print(f"[ASYNC] Error en la página {index + 1}: {self.errors[index]}")
+                    return None
+                finally:
+                    if tab is not None:
+                        await self._close_tab(tab)
+                self.page_times.append(time.perf_counter() - start)
+                return result
+
+        return await asyncio.gather(*(run_page(index, url) for index, url in enumerate(urls)))
+
+    async def _close_tab(self, tab):
+        # Un error al cerrar la pestaña no debe ocultar el resultado de la pagina
+        try:
+            await tab.close()
+        except Exception as e:
+            print(f"[ASYNC] No se pudo cerrar la pestaña: {e}")
+
+
+def result_page_urls(search_url, pages=RESULT_PAGES, page_size=100, page_param="startPage"):
+    """URLs de las paginas de resultados a partir de la URL de la busqueda."""
+    parsed = urlparse(search_url)
+    query = parse_qs(parsed.query)
+    query["pageSize"] = [str(page_size)]
+    urls = []
+    for page in range(pages):
+        query[page_param] = [str(page)]
+        urls.append(urlunparse(parsed._replace(query=urlencode(query, doseq=True))))
+    return urls
+
+
+class AsyncWebScraperSage:
+    """
+    Version de WebScraperSage que controla el navegador por el DevTools
+    Protocol con asyncio: inicia sesion en una pestaña y luego exporta las
+    paginas de resultados en paralelo, cada una en su pestaña, con a lo sumo
+    SCRAPER_TABS pestañas abiertas. Cada descarga se guarda con un nombre
+    unico, por lo que no hace falta esperar ni renombrar entre paginas.
+    """
+
+    def __init__(self):
+        self.download_path = os.path.join(os.getenv("DOWNLOAD_PATH"), "sage")
+        validate_path(self.download_path)
+        self.search_term = os.getenv("SEARCH_TERM")
+        self.max_tabs = int(os.getenv("SCRAPER_TABS") or DEFAULT_MAX_TABS)
+        # Duracion de cada pagina de resultados, usada por el benchmark
+        self.page_times = []
+
+    def run(self):
+        asyncio.run(self.run_async())
+        merge_ris_file(self.download_path)
+
+    async def run_async(self):
+        async with await CDPBrowser.launch(self.download_path) as browser:
+            tab = await browser.new_tab()
+            search_url = await self.search(tab)
+            await tab.close()
+
+            coordinator = AsyncScrapeCoordinator(browser, self.max_tabs)
+            files = await coordinator.scrape(result_page_urls(search_url), lambda tab, index, url: self.export_page(browser, tab, index, url))
+            self.page_times = coordinator.page_times
+
+        print(f"[ASYNC] {sum(1 for f in files if f)} de {len(files)} páginas exportadas con {self.max_tabs} pestañas")
+        if coordinator.errors:
+            raise RuntimeError(f"Fallaron {len(coordinator.errors)} páginas de resultados de Sage")
+
+    async def search(self, tab):
+        """Inicia sesion desde el portal CRAI, busca el termino y retorna la URL de resultados."""
+        await tab.navigate(os.getenv("BIBLIOTECA_CRAI"))
+        await tab.wait_for_invisible(".onload-background")
+
+        await tab.click('//*[@id="block-stacks-content-listing-results-block"]/div/details[7]/summary')
+        await tab.click('//*[@id="facingenierasagerevistasdescubridor"]/div/div/h3/a/span')
+        await tab.click("#btn-google")
+
+        await tab.type_text("#identifierId", os.getenv("EMAIL"), submit=True)
+        await tab.type_text('[name="Passwd"]', os.getenv("PASSWORD"), submit=True)
+
+        # El banner de cookies puede no aparecer
+        try:
+            await tab.click("#onetrust-reject-all-handler", timeout=5)
+        except asyncio.TimeoutError:
+            print("El banner de cookies no apareció o fue bloqueado por el navegador.")
+
+        await tab.type_text("#AllField35ea26a9-ec16-4bde-9652-17b798d5b6750", self.search_term, submit=True)
+        await tab.wait_for_clickable("#action-bar-select-all")
+        return await tab.current_url()
+
+    async def export_page(self, browser, tab, index, url):
+        """Exporta en RIS todas las citas de una pagina de resultados."""
+        await tab.navigate(url)
+        await tab.click("#action-bar-select-all")
+        await tab.click('//*[@id="pb-page-content"]/div/div/main/div[1]/div/div/div/div[2]/div[4]/div[2]/div/div[2]/a')
+        await tab.wait_for("!document.querySelector('a.download__btn').classList.contains('disabled')")
+
+        path, _ = await browser.download(tab, lambda: tab.click("a.btn.btn-secondary.download__btn"))
+        target = os.path.join(self.download_path, f"sage-{index}.ris")
+        os.replace(path, target)
+        print(f"--> Página {index + 1} exportada: {os.path.basename(target)}")
+        return target
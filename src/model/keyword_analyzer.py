@@ -0,0 +1,220 @@
+import json
+import os
+import pickle
+
+import numpy as np
+from scipy import sparse
+
+from src.util.atomic import atomic_write
+from src.util.co_occurrence_store import save_co_occurrence_arrays
+from src.util.instrumentation import instrumented
+from src.util.ris_utils import document_key, load_corpus
+
+# Version del modelo guardado; cambiarla obliga a reentrenar
+MODEL_VERSION = 1
+# Si la proporcion de palabras clave nuevas (fuera del vocabulario del modelo) supera este valor, se reentrena
+REFIT_THRESHOLD = 0.1
+
+
+def normalize_keyword(keyword):
+    """Normaliza una palabra clave: minusculas, espacios simples y sin puntuacion en los extremos."""
+    return ' '.join(keyword.lower().split()).strip(' .,;:')
+
+
+class KeywordAnalyzer:
+    """
+    Analisis de las palabras clave de autor (campo KW) de todo el corpus:
+    vocabulario internado, matriz dispersa de co-ocurrencia y un modelo de
+    temas (MiniBatchNMF sobre TF-IDF) entrenado por lotes. El modelo se
+    guarda y, en la siguiente ejecucion, solo se actualiza con los documentos
+    nuevos.
+    """
+
+    def __init__(self, ris_file_path, n_topics=10, batch_size=1000, passes=5):
+        """
+        Args:
+            ris_file_path (str): Ruta al archivo RIS unificado.
+            n_topics (int): Cantidad de temas.
+            batch_size (int): Documentos por lote del modelo de temas.
+            passes (int): Pasadas sobre el corpus al entrenar desde cero.
+        """
+        self.ris_file_path = ris_file_path
+        self.n_topics = n_topics
+        self.batch_size = batch_size
+        self.passes = passes
+
+        # Vocabulario internado: palabra clave -> id, e id -> palabra clave
+        self.vocabulary = {}
+        self.keywords = []
+        # Documentos con palabras clave: (clave, ids de sus palabras clave)
+        self.documents = []
+        self._load_keywords()
+
+    def _intern(self, keyword):
+        keyword_id = self.vocabulary.get(keyword)
+        if keyword_id is None:
+            keyword_id = self.vocabulary[keyword] = len(self.keywords)
+            self.keywords.append(keyword)
+        return keyword_id
+
+    def _load_keywords(self):
+        for entry in load_corpus(self.ris_file_path):
+            keywords = entry.get('keywords')
+            if not keywords:
+                continue
+            if isinstance(keywords, str):
+                keywords = keywords.split(';')
+            normalized = (normalize_keyword(keyword) for keyword in keywords)
+            # dict.fromkeys conserva el orden y elimina repetidos dentro del documento
+            ids = list(dict.fromkeys(self._intern(keyword) for keyword in normalized if keyword))
+            if ids:
+                self.documents.append((document_key(entry), ids))
+
+    def document_matrix(self, columns=None):
+        """
+        Matriz dispersa binaria documentos x palabras clave (CSR).
+
+        Args:
+            columns (dict, optional): Palabra clave -> columna. Por defecto el
+                vocabulario completo; las palabras clave fuera de columns se omiten.
+        """
+        if columns is None:
+            columns = self.vocabulary
+            to_column = list(range(len(self.keywords)))
+        else:
+            to_column = [columns.get(keyword, -1) for keyword in self.keywords]
+
+        indptr = [0]
+        indices = []
+        for _, ids in self.documents:
+            indices.extend(to_column[keyword_id] for keyword_id in ids if to_column[keyword_id] >= 0)
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.float32)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(self.documents), len(columns)))
+
+    @instrumented(count=lambda result, self, output_dir: len(self.documents))
+    def save_co_occurrence(self, output_dir):
+        """
+        Calcula la co-ocurrencia de palabras clave como K^T K sobre la matriz
+        dispersa de documentos y guarda su triángulo superior en el formato de
+        co_occurrence_store (prefijo keyword_co_occurrence).
+
+        Returns:
+            CoOccurrenceMatrix-compatible: (filas, columnas, conteos) del triángulo superior.
+        """
+        matrix = self.document_matrix()
+        co_occurrence = sparse.triu(matrix.T @ matrix, k=1).tocoo()
+        order = np.lexsort((co_occurrence.col, co_occurrence.row))
+        rows, cols, counts = co_occurrence.row[order], co_occurrence.col[order], co_occurrence.data[order].astype(np.int32)
+        save_co_occurrence_arrays(self.keywords, rows, cols, counts, output_dir, name='keyword_co_occurrence')
+        return rows, cols, counts
+
+    def _iter_batches(self, matrix):
+        for start in range(0, matrix.shape[0], self.batch_size):
+            yield matrix[start:start + self.batch_size]
+
+    def _fit(self, counts):
+        """Entrena TF-IDF y MiniBatchNMF desde cero recorriendo el corpus por lotes."""
+        from sklearn.decomposition import MiniBatchNMF
+        from sklearn.feature_extraction.text import TfidfTransformer
+
+        tfidf = TfidfTransformer().fit(counts)
+        features = tfidf.transform(counts)
+        n_topics = max(1, min(self.n_topics, features.shape[0], features.shape[1]))
+        model = MiniBatchNMF(n_components=n_topics, init='nndsvda', batch_size=self.batch_size, random_state=42)
+        for _ in range(self.passes):
+            for batch in self._iter_batches(features):
+                model.partial_fit(batch)
+        return tfidf, model
+
+    def _load_model(self, model_path):
+        if not os.path.exists(model_path):
+            return None
+        try:
+            with open(model_path, 'rb') as f:
+                state = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        if state.get('version') != MODEL_VERSION or state.get('n_topics') != self.n_topics:
+            return None
+        return state
+
+    @instrumented(count=lambda result, self, output_dir, top_n=10: len(self.documents))
+    def analyze(self, output_dir, top_n=10):
+        """
+        Guarda la co-ocurrencia de palabras clave y actualiza el modelo de
+        temas. Si existe un modelo guardado y las palabras clave nuevas no
+        superan REFIT_THRESHOLD, solo se procesan los documentos nuevos con
+        partial_fit; si no, se entrena desde cero.
+
+        Args:
+            output_dir (str): Directorio de resultados (p. ej. results/keywords).
+            top_n (int): Palabras clave por tema en topics.json.
+
+        Returns:
+            list: Temas con sus palabras clave principales y cantidad de documentos.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self.save_co_occurrence(output_dir)
+
+        # Sin palabras clave no hay nada que entrenar: se dejan los resultados vacios
+        if not self.documents:
+            print("[KEYWORDS] Ningún registro tiene palabras clave; se omite el modelo de temas")
+            self._save_topics(output_dir, [])
+            return []
+
+        model_path = os.path.join(output_dir, 'keyword_model.pkl')
+        state = self._load_model(model_path)
+        seen = state['documents'] if state else set()
+        new_documents = [i for i, (key, _) in enumerate(self.documents) if key not in seen]
+
+        refit = state is None
+        if state:
+            known = set(state['vocabulary'])
+            occurrences = [self.keywords[keyword_id] for i in new_documents for keyword_id in self.documents[i][1]]
+            unknown = sum(1 for keyword in occurrences if keyword not in known)
+            refit = bool(occurrences) and unknown / len(occurrences) > REFIT_THRESHOLD
+
+        if refit:
+            print(f"[KEYWORDS] Entrenando modelo de temas con {len(self.documents)} documentos y {len(self.keywords)} palabras clave")
+            vocabulary = list(self.keywords)
+            tfidf, model = self._fit(self.document_matrix())
+        else:
+            vocabulary, tfidf, model = state['vocabulary'], state['tfidf'], state['model']
+            print(f"[KEYWORDS] Actualizando modelo de temas con {len(new_documents)} documentos nuevos")
+            if new_documents:
+                counts = self.document_matrix({keyword: j for j, keyword in enumerate(vocabulary)})[new_documents]
+                for batch in self._iter_batches(tfidf.transform(counts)):
+                    model.partial_fit(batch)
+
+        columns = {keyword: j for j, keyword in enumerate(vocabulary)}
+        features = tfidf.transform(self.document_matrix(columns))
+        assignments = np.argmax(model.transform(features), axis=1) if features.shape[0] else np.array([], dtype=int)
+        document_counts = np.bincount(assignments, minlength=model.n_components)
+
+        topics = []
+        for topic_id, weights in enumerate(model.components_):
+            top = np.argsort(weights)[::-1][:top_n]
+            topics.append({
+                'topic': topic_id,
+                'keywords': [vocabulary[j] for j in top if weights[j] > 0],
+                'documents': int(document_counts[topic_id]),
+            })
+
+        with atomic_write(model_path, 'wb') as f:
+            pickle.dump({
+                'version': MODEL_VERSION,
+                'n_topics': self.n_topics,
+                'vocabulary': vocabulary,
+                'tfidf': tfidf,
+                'model': model,
+                'documents': {key for key, _ in self.documents},
+            }, f)
+        self._save_topics(output_dir, topics)
+
+        return topics
+
+    @staticmethod
+    def _save_topics(output_dir, topics):
+        with atomic_write(os.path.join(output_dir, 'topics.json')) as f:
+            json.dump(topics, f, ensure_ascii=False, indent=2)
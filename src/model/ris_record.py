@@ -0,0 +1,89 @@
+import json
+import sys
+import zlib
+from collections.abc import Mapping
+
+# Campos que leen las estadisticas y los analisis; se guardan como atributos y
+# los valores repetidos (tipo, año, revista, editorial, autores, palabras clave) se internan
+INTERNED_FIELDS = ('type_of_reference', 'year', 'journal_name', 'publisher')
+# Listas de rispy, guardadas como tuplas de cadenas internadas
+LIST_FIELDS = ('authors', 'keywords')
+HOT_FIELDS = INTERNED_FIELDS + LIST_FIELDS + ('doi', 'primary_title', 'abstract')
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class RisRecord(Mapping):
+    """
+    Registro RIS compacto. Los campos de HOT_FIELDS se guardan en atributos
+    (slots) y el resto (URLs, notas, etiquetas desconocidas...) en un solo
+    bloque JSON comprimido que se decodifica solo cuando se accede a uno de
+    esos campos. El abstract y las palabras clave son atributos porque cada
+    etapa del analisis los lee en todos los registros.
+
+    Se comporta como el diccionario de rispy (get, [], in, keys), de modo que
+    el codigo existente sigue funcionando; los ciclos de agregacion pueden
+    leer directamente los atributos (record.year, record.authors).
+    """
+
+    __slots__ = HOT_FIELDS + ('_packed',)
+
+    def __init__(self, entry):
+        """
+        Args:
+            entry (dict): Entrada con las claves de rispy.
+        """
+        for field in INTERNED_FIELDS:
+            setattr(self, field, _intern(entry.get(field)))
+        for field in LIST_FIELDS:
+            values = entry.get(field)
+            setattr(self, field, tuple(_intern(value) for value in values) if values else None)
+        self.doi = entry.get('doi')
+        self.primary_title = entry.get('primary_title')
+        self.abstract = entry.get('abstract')
+
+        rest = {key: value for key, value in entry.items() if key not in HOT_FIELDS}
+        self._packed = zlib.compress(json.dumps(rest, ensure_ascii=False).encode('utf-8')) if rest else None
+
+    def _unpack(self):
+        if self._packed is None:
+            return {}
+        return json.loads(zlib.decompress(self._packed).decode('utf-8'))
+
+    def _hot_items(self):
+        for field in HOT_FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                yield field, list(value) if field in LIST_FIELDS else value
+
+    def __getitem__(self, key):
+        if key in HOT_FIELDS:
+            value = getattr(self, key)
+            if value is None:
+                raise KeyError(key)
+            return list(value) if key in LIST_FIELDS else value
+        return self._unpack()[key]
+
+    def __iter__(self):
+        for field, _ in self._hot_items():
+            yield field
+        yield from self._unpack()
+
+    def __len__(self):
+        return sum(1 for _ in self._hot_items()) + len(self._unpack())
+
+    def __contains__(self, key):
+        if key in HOT_FIELDS:
+            return getattr(self, key) is not None
+        return key in self._unpack()
+
+    def to_dict(self):
+        """Retorna la entrada completa como diccionario de rispy."""
+        entry = dict(self._hot_items())
+        entry.update(self._unpack())
+        return entry
+
+    def __repr__(self):
+        return f"RisRecord(doi={self.doi!r}, title={self.primary_title!r})"
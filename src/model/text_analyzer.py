@@ -1,18 +1,22 @@
 import os
-import re
 import json
-import rispy
-import pandas as pd
-import nltk
+import hashlib
+from collections import defaultdict
+
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
-from collections import Counter, defaultdict
 from nltk.stem import PorterStemmer, WordNetLemmatizer
 
-# Descargar recursos de NLTK necesarios
-nltk.download('punkt', quiet=True)
-nltk.download('stopwords', quiet=True)
-nltk.download('wordnet', quiet=True)
+from src.util.atomic import atomic_write
+from src.util.co_occurrence_store import save_co_occurrences
+from src.util.instrumentation import instrumented
+from src.util.nltk_utils import ensure_nltk_resources
+from src.util.ris_utils import abstract_documents, load_corpus
+from src.util.shared_cache import get_shared_cache
+from src.util.term_dictionary import CATEGORIES_FILE, TermDictionary
+
+# Version del formato del estado incremental; cambiarla invalida los estados guardados
+STATE_VERSION = 2
 
 class TextAnalyzer:
     def __init__(self, ris_file_path):
@@ -26,13 +30,16 @@ class TextAnalyzer:
         
         self.ris_file_path = ris_file_path
         self.articles = self._load_articles()
-        self.abstracts = self._extract_abstracts()
+        self.documents = self._extract_documents()
+        self.abstracts = [abstract for _, abstract in self.documents]
         self.stop_words = set(stopwords.words('english'))
         self.lemmatizer = WordNetLemmatizer()
         self.stemmer = PorterStemmer()
         
         # Carga las categorías y variables
         self.categories = self._load_categories()
+        # Diccionario compilado: forma de superficie (nombre, acrónimo, variante) -> término
+        self.term_dictionary = TermDictionary.load(CATEGORIES_FILE, self.categories)
         # Diccionario para mapear sinónimos a términos principales
         self.synonyms_map = self._create_synonyms_map()
         
@@ -40,36 +47,26 @@ class TextAnalyzer:
         self.category_frequencies = {}
         self.word_co_occurrences = defaultdict(lambda: defaultdict(int))
 
+        # Términos presentes por abstract, compartidos entre análisis
+        self._present_terms = {}
+
     def _download_nltk_resources(self):
-        """Descarga los recursos necesarios de NLTK."""
-        resources = {
-            'punkt': 'tokenizers/punkt',
-            'stopwords': 'corpora/stopwords', 
-            'wordnet': 'corpora/wordnet',
-            'punkt_tab': 'tokenizers/punkt_tab/english'
-        }
-        
-        for resource_name, resource_path in resources.items():
-            try:
-                nltk.data.find(resource_path)
-            except LookupError:
-                nltk.download(resource_name, quiet=True)
-                print(f"Descargando recurso NLTK: {resource_name}")
+        """Verifica (una vez por proceso) los recursos necesarios de NLTK."""
+        ensure_nltk_resources('punkt', 'punkt_tab', 'stopwords', 'wordnet')
 
     def _load_articles(self):
         """Carga los artículos desde el archivo RIS."""
-        with open(self.ris_file_path, "r", encoding="utf-8") as bibliography_file:
-            return rispy.load(bibliography_file)
-
-    def _extract_abstracts(self):
-        """Extrae los abstracts de los artículos."""
-        abstracts = []
-        for article in self.articles:
-            # El campo para el abstract puede variar según el formato RIS
-            abstract = article.get('abstract', article.get('AB', ''))
-            if abstract:
-                abstracts.append(abstract)
-        return abstracts
+        return load_corpus(self.ris_file_path)
+
+    def _extract_documents(self):
+        """
+        Extrae los abstracts de los artículos junto con una clave estable por
+        documento (DOI, o un hash del título y el abstract si no tiene DOI).
+
+        Returns:
+            list: Tuplas (clave, abstract).
+        """
+        return abstract_documents(self.articles)
 
     def _load_categories(self):
         """
@@ -78,13 +75,7 @@ class TextAnalyzer:
         Returns:
             dict: Diccionario con las categorías y términos organizados.
         """
-        # Ruta relativa desde text_analyzer.py (src/model/) al JSON (src/util/)
-        categories_file = os.path.join(
-            os.path.dirname(__file__),  # src/model/
-            '..',  # src/
-            'util',  # src/util/
-            'categories.json'  # src/util/categories.json
-        )
+        categories_file = CATEGORIES_FILE
         
         # Verificar si el archivo existe
         if not os.path.exists(categories_file):
@@ -97,43 +88,11 @@ class TextAnalyzer:
     def _create_synonyms_map(self):
         """
         Crea un diccionario que mapea sinónimos a términos principales.
-        Por ejemplo, "Primary school", "Primary education", y "Elementary school" 
-        se mapean todos a "Primary school".
+        Por ejemplo, "primary education" y "elementary school" se mapean a
+        "Primary school - Primary education - Elementary school", y "ctt" a
+        "Classical Test Theory - CTT".
         """
-        synonyms_map = {}
-        
-        for category, terms in self.categories.items():
-            for term in terms:
-                # Si el término contiene guiones, podría tener sinónimos
-                if " - " in term:
-                    # Conservar el primer término como el principal
-                    main_term = term.split(" - ")[0].strip()
-                    # Agregar el término principal al mapa
-                    synonyms_map[main_term.lower()] = main_term
-                    continue
-                
-                # Tratar los casos con guiones como sinónimos
-                if " – " in term:
-                    parts = term.split(" – ")
-                    main_term = parts[0].strip()
-                    for part in parts:
-                        part = part.strip()
-                        synonyms_map[part.lower()] = main_term
-                    continue
-                
-                # Manejar términos separados por guiones
-                if " - " in term:
-                    parts = term.split(" - ")
-                    main_term = parts[0].strip()
-                    for part in parts:
-                        part = part.strip()
-                        synonyms_map[part.lower()] = main_term
-                    continue
-                
-                # Agregar el término normal
-                synonyms_map[term.lower()] = term
-        
-        return synonyms_map
+        return self.term_dictionary.synonyms_map()
 
     def _preprocess_text(self, text):
         """
@@ -151,6 +110,32 @@ class TextAnalyzer:
         
         return tokens
 
+    def _find_present_terms(self, abstract):
+        """
+        Retorna los términos de las categorías presentes en un abstract,
+        reconociendo también sus acrónimos y variantes. El resultado se guarda
+        para que frecuencias y co-ocurrencias recorran cada abstract una sola vez.
+
+        Args:
+            abstract (str): Texto del abstract.
+
+        Returns:
+            list: Términos presentes, en el orden de categories.json.
+        """
+        present_terms = self._present_terms.get(abstract)
+        if present_terms is None:
+            present_terms = self.term_dictionary.find_terms(abstract)
+            self._present_terms[abstract] = present_terms
+        return present_terms
+
+    @staticmethod
+    def _apply_co_occurrences(co_occurrences, present_terms, delta):
+        """Suma delta a la co-ocurrencia de cada par de términos presentes en un documento."""
+        for i, term1 in enumerate(present_terms):
+            for term2 in present_terms[i+1:]:
+                co_occurrences[term1][term2] += delta
+                co_occurrences[term2][term1] += delta
+
     def _count_term_frequency(self, category, terms, preprocessed_abstracts):
         """
         Cuenta la frecuencia de términos específicos en los abstracts.
@@ -164,24 +149,16 @@ class TextAnalyzer:
             dict: Diccionario con las frecuencias de los términos.
         """
         term_freq = {term: 0 for term in terms}
-        
-        # Crear patrones regex para cada término (coincidencia exacta de palabra)
-        term_patterns = {}
-        for term in terms:
-            # Escapar caracteres especiales y crear un patrón que busque la palabra completa
-            escaped_term = re.escape(term.lower())
-            term_patterns[term] = re.compile(r'\b' + escaped_term + r'\b')
-        
+
         # Buscar términos en cada abstract
         for abstract in self.abstracts:
-            abstract_lower = abstract.lower()
-            
-            for term, pattern in term_patterns.items():
-                if pattern.search(abstract_lower):
+            for term in self._find_present_terms(abstract):
+                if term in term_freq:
                     term_freq[term] += 1
         
         return term_freq
 
+    @instrumented(count=lambda result, self: len(self.abstracts))
     def analyze_frequency(self):
         """
         Analiza la frecuencia de términos en los abstracts por categoría.
@@ -200,6 +177,7 @@ class TextAnalyzer:
         
         return self.category_frequencies
 
+    @instrumented(count=lambda result, self: len(self.abstracts))
     def analyze_co_occurrence(self):
         """
         Analiza la co-ocurrencia de términos en los abstracts.
@@ -207,36 +185,137 @@ class TextAnalyzer:
         Returns:
             dict: Matriz de co-ocurrencia entre términos.
         """
-        # Aplanar todas las categorías en una lista única de términos
-        all_terms = []
-        for terms in self.categories.values():
-            all_terms.extend(terms)
-        
-        # Crear patrones regex para cada término
-        term_patterns = {}
-        for term in all_terms:
-            # Escapar caracteres especiales y crear un patrón
-            escaped_term = re.escape(term.lower())
-            term_patterns[term] = re.compile(r'\b' + escaped_term + r'\b')
-        
         # Analizar co-ocurrencia en cada abstract
         for abstract in self.abstracts:
-            abstract_lower = abstract.lower()
-            
             # Encontrar todos los términos presentes en este abstract
-            present_terms = []
-            for term, pattern in term_patterns.items():
-                if pattern.search(abstract_lower):
-                    present_terms.append(term)
+            present_terms = self._find_present_terms(abstract)
             
             # Registrar co-ocurrencias
-            for i, term1 in enumerate(present_terms):
-                for term2 in present_terms[i+1:]:
-                    self.word_co_occurrences[term1][term2] += 1
-                    self.word_co_occurrences[term2][term1] += 1
-        
+            self._apply_co_occurrences(self.word_co_occurrences, present_terms, 1)
+
         return self.word_co_occurrences
 
+    def _categories_fingerprint(self):
+        """Hash de las categorías; si cambian, el estado incremental guardado no sirve."""
+        content = json.dumps(self.categories, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(f"{STATE_VERSION}\n{self.term_dictionary.fingerprint}\n{content}".encode('utf-8')).hexdigest()
+
+    def _load_state(self, state_path):
+        """
+        Carga el estado incremental guardado. Retorna None si no existe, está
+        dañado o fue generado con otras categorías.
+        """
+        if not os.path.exists(state_path):
+            return None
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            print(f"[INCREMENTAL] Estado ilegible, se recalcula todo: {state_path}")
+            return None
+        if state.get('fingerprint') != self._categories_fingerprint():
+            print("[INCREMENTAL] Las categorías cambiaron, se recalcula todo")
+            return None
+        return state
+
+    @instrumented(count=lambda result, self, state_path: self.changed_documents)
+    def analyze_incremental(self, state_path):
+        """
+        Calcula frecuencias y co-ocurrencias procesando solo los documentos
+        agregados, modificados o eliminados desde la última ejecución.
+
+        En state_path se guardan, por documento (clave DOI o hash), el hash del
+        abstract y los términos presentes, junto con los resultados agregados.
+        Al volver a ejecutar se restan los aportes de los documentos que ya no
+        están y se suman los de los nuevos, de modo que el costo depende del
+        tamaño del cambio y no del tamaño del corpus. Si el estado no existe o
+        las categorías cambiaron, se procesan todos los documentos.
+
+        Args:
+            state_path (str): Ruta del archivo JSON con el estado incremental.
+
+        Returns:
+            tuple: (frecuencias por categoría, matriz de co-ocurrencia)
+        """
+        state = self._load_state(state_path)
+        if state is None:
+            state = {
+                'documents': {},
+                'frequencies': {category: {term: 0 for term in terms} for category, terms in self.categories.items()},
+                'co_occurrences': {},
+            }
+
+        previous = state['documents']
+        current = {
+            key: hashlib.sha1(abstract.encode('utf-8')).hexdigest()
+            for key, abstract in self.documents
+        }
+
+        removed = [key for key, digest in previous.items() if current.get(key) != digest['hash']]
+        added = [(key, abstract) for key, abstract in self.documents if previous.get(key, {}).get('hash') != current[key]]
+
+        frequencies = state['frequencies']
+        co_occurrences = defaultdict(lambda: defaultdict(int))
+        for term1, co_occurs in state['co_occurrences'].items():
+            co_occurrences[term1].update(co_occurs)
+
+        # Índice término -> categorías que lo contienen
+        term_categories = defaultdict(list)
+        for category, terms in self.categories.items():
+            for term in terms:
+                term_categories[term].append(category)
+
+        def apply(present_terms, delta):
+            for term in present_terms:
+                for category in term_categories[term]:
+                    frequencies[category][term] += delta
+            self._apply_co_occurrences(co_occurrences, present_terms, delta)
+
+        for key in removed:
+            apply(previous.pop(key)['terms'], -1)
+
+        # Con CACHE_DIR, los términos de un abstract ya analizado en otro workspace se reutilizan
+        shared = get_shared_cache(f"terms:{self.term_dictionary.fingerprint}")
+        cached = shared.get_many(current[key] for key, _ in added) if shared else {}
+        computed = {}
+        reused = 0
+        for key, abstract in added:
+            present_terms = cached.get(current[key])
+            if present_terms is None:
+                present_terms = computed[current[key]] = self._find_present_terms(abstract)
+            else:
+                reused += 1
+            apply(present_terms, 1)
+            previous[key] = {'hash': current[key], 'terms': present_terms}
+        if shared:
+            shared.put_many(computed)
+
+        # Los pares que quedaron en cero no aparecen en un cálculo completo
+        for term1 in list(co_occurrences):
+            row = co_occurrences[term1]
+            for term2 in [term2 for term2, count in row.items() if count == 0]:
+                del row[term2]
+            if not row:
+                del co_occurrences[term1]
+
+        self.changed_documents = len(removed) + len(added)
+        print(f"[INCREMENTAL] {len(added)} documentos nuevos o modificados ({reused} desde la caché compartida), {len(removed)} eliminados o reemplazados, {len(previous)} en total")
+
+        state = {
+            'fingerprint': self._categories_fingerprint(),
+            'documents': previous,
+            'frequencies': frequencies,
+            'co_occurrences': {k: dict(v) for k, v in co_occurrences.items()},
+        }
+        os.makedirs(os.path.dirname(state_path) or '.', exist_ok=True)
+        # Se escribe en un archivo temporal y se renombra para no dejar un estado a medias
+        with atomic_write(state_path) as f:
+            json.dump(state, f, ensure_ascii=False)
+
+        self.category_frequencies = frequencies
+        self.word_co_occurrences = co_occurrences
+        return self.category_frequencies, self.word_co_occurrences
+
     def get_results_dataframe(self):
         """
         Convierte los resultados del análisis de frecuencia a un DataFrame de pandas.
@@ -244,6 +323,8 @@ class TextAnalyzer:
         Returns:
             pandas.DataFrame: DataFrame con los resultados.
         """
+        import pandas as pd
+
         results = []
         
         for category, term_freq in self.category_frequencies.items():
@@ -263,6 +344,8 @@ class TextAnalyzer:
         Returns:
             pandas.DataFrame: DataFrame con la matriz de co-ocurrencia.
         """
+        import pandas as pd
+
         results = []
         
         for term1, co_occurs in self.word_co_occurrences.items():
@@ -275,33 +358,45 @@ class TextAnalyzer:
         
         return pd.DataFrame(results)
 
-    def save_results(self, output_dir):
+    def save_results(self, output_dir, export_text=False):
         """
-        Guarda los resultados del análisis en archivos CSV.
+        Guarda los resultados del análisis. Las frecuencias se guardan en
+        frequencies.json y las co-ocurrencias en el formato compacto de
+        co_occurrence_store (vocabulario + triángulo superior en .npy).
         
         Args:
             output_dir (str): Directorio donde se guardarán los resultados.
+            export_text (bool): Exportar además los CSV y co_occurrences.json.
         """
         # Crear directorio si no existe
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
         
+        # Cada archivo se escribe en un temporal y se renombra: un fallo no deja resultados mezclados
+        # Guardar como JSON para posible uso en visualizaciones
+        with atomic_write(os.path.join(output_dir, 'frequencies.json')) as f:
+            json.dump(self.category_frequencies, f, ensure_ascii=False, indent=2)
+        
+        # Guardar co-ocurrencias en formato compacto
+        save_co_occurrences(self.word_co_occurrences, output_dir)
+
+        if not export_text:
+            return
+
         # Guardar frecuencias por categoría
         freq_df = self.get_results_dataframe()
-        freq_df.to_csv(os.path.join(output_dir, 'term_frequencies.csv'), index=False)
+        with atomic_write(os.path.join(output_dir, 'term_frequencies.csv'), newline='') as f:
+            freq_df.to_csv(f, index=False)
         
         # Guardar co-ocurrencias
         co_occur_df = self.get_co_occurrence_dataframe()
-        co_occur_df.to_csv(os.path.join(output_dir, 'term_co_occurrences.csv'), index=False)
-        
-        # Guardar como JSON para posible uso en visualizaciones
-        with open(os.path.join(output_dir, 'frequencies.json'), 'w', encoding='utf-8') as f:
-            json.dump(self.category_frequencies, f, ensure_ascii=False, indent=2)
+        with atomic_write(os.path.join(output_dir, 'term_co_occurrences.csv'), newline='') as f:
+            co_occur_df.to_csv(f, index=False)
         
         # Convertir defaultdict a dict normal para JSON
         co_occurrences_dict = {
             k: dict(v) for k, v in self.word_co_occurrences.items()
         }
         
-        with open(os.path.join(output_dir, 'co_occurrences.json'), 'w', encoding='utf-8') as f:
-            json.dump(co_occurrences_dict, f, ensure_ascii=False, indent=2)
\ No newline at end of file
+        with atomic_write(os.path.join(output_dir, 'co_occurrences.json')) as f:
+            json.dump(co_occurrences_dict, f, ensure_ascii=False, indent=2)
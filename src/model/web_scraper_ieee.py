@@ -1,4 +1,5 @@
 import os
+import time
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
@@ -13,10 +14,12 @@ from src.util.utils import validate_path
 
 class WebScraperIeee:
     def __init__(self):
-        self.download_path = os.getenv("DOWNLOAD_PATH") + "\\ieee"
+        self.download_path = os.path.join(os.getenv("DOWNLOAD_PATH"), "ieee")
         validate_path(self.download_path)
         self.driver = get_driver(self.download_path)
         self.search_term = os.getenv("SEARCH_TERM")
+        # Duracion de cada pagina de resultados, usada por el benchmark
+        self.page_times = []
 
     def run(self):
         crai = os.getenv("BIBLIOTECA_CRAI")
@@ -63,6 +66,7 @@ class WebScraperIeee:
         hundred_option.click()
 
         for _ in range(10):
+            page_start = time.perf_counter()
             checkbox_select_all = wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="xplMainContent"]/div[2]/div[2]/xpl-results-list/div[2]/label/input')))
             checkbox_select_all.click()
 
@@ -89,6 +93,8 @@ class WebScraperIeee:
             next_page = wait.until(EC.element_to_be_clickable((By.CLASS_NAME, 'next-btn')))
             next_page.click()
 
+            self.page_times.append(time.perf_counter() - page_start)
+
         self.driver.quit()
 
         merge_ris_file(self.download_path)
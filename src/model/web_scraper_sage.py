@@ -9,16 +9,18 @@ from selenium.common.exceptions import TimeoutException
 from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
 
 from src.util.selenium_utils import get_driver_undected
-from src.util.ris_utils import clean_ris_file, merge_ris_file
+from src.util.ris_utils import merge_ris_file
 from src.util.utils import validate_path
 
 
 class WebScraperSage:
     def __init__(self):
-        self.download_path = os.getenv("DOWNLOAD_PATH") + "\\sage"
+        self.download_path = os.path.join(os.getenv("DOWNLOAD_PATH"), "sage")
         validate_path(self.download_path)
         self.driver = get_driver_undected(self.download_path)
         self.search_term = os.getenv("SEARCH_TERM")
+        # Duracion de cada pagina de resultados, usada por el benchmark
+        self.page_times = []
 
     def is_not_disabled(self):
         element = self.driver.find_element(By.CSS_SELECTOR, "a.download__btn")
@@ -76,6 +78,7 @@ class WebScraperSage:
         self.driver.get(nueva_url)
 
         for _ in range(10):
+            page_start = time.perf_counter()
             time.sleep(4)
             interval_articles = wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="pb-page-content"]/div/div/main/div[1]/div/div/div/div[2]/div[3]/div/span[1]/span')))
 
@@ -117,12 +120,11 @@ class WebScraperSage:
                 print("--> Esperando siguiente pagina...")
                 time.sleep(2)
 
-        self.driver.quit()
+            self.page_times.append(time.perf_counter() - page_start)
 
-        files = [file for file in os.listdir(self.download_path) if file.endswith(".ris")]
-        for file in files:
-            clean_ris_file(os.path.join(self.download_path, file))
+        self.driver.quit()
 
+        # La normalizacion de los archivos (NBSP, etiquetas) se hace al leerlos
         merge_ris_file(self.download_path)
 
     def next_page_ready(self, interval_articles):
@@ -14,10 +14,12 @@ from src.util.utils import validate_path
 
 class WebScraperScienceDirect:
     def __init__(self):
-        self.download_path = os.getenv("DOWNLOAD_PATH") + "\\science"
+        self.download_path = os.path.join(os.getenv("DOWNLOAD_PATH"), "science")
         validate_path(self.download_path)
         self.driver = get_driver_undected(self.download_path)
         self.search_term = os.getenv("SEARCH_TERM")
+        # Duracion de cada pagina de resultados, usada por el benchmark
+        self.page_times = []
 
     def run(self):
         crai = os.getenv("BIBLIOTECA_CRAI")
@@ -54,6 +56,7 @@ class WebScraperScienceDirect:
         time.sleep(2)
 
         for _ in range(10):
+            page_start = time.perf_counter()
             print("Seleccionar check")
 
             select_all_check = wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="srp-toolbar"]/div[1]/span/span[1]/span[1]/div/div/label/span[1]')))
@@ -97,5 +100,7 @@ class WebScraperScienceDirect:
                 print("Página siguiente cargada.")
                 time.sleep(5)
 
+            self.page_times.append(time.perf_counter() - page_start)
+
         self.driver.quit()
         merge_ris_file(self.download_path)
@@ -0,0 +1,40 @@
+import os
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_write(path, mode='w', encoding='utf-8', **kwargs):
+    """
+    Abre un archivo temporal junto a path y, si el bloque termina sin
+    errores, lo renombra sobre path. Un fallo a mitad de la escritura deja el
+    archivo anterior intacto y no deja temporales.
+
+    Ejemplo:
+        with atomic_write('results/frequencies.json') as f:
+            json.dump(data, f)
+    """
+    temporary = path + '.tmp'
+    if 'b' in mode:
+        encoding = None
+    try:
+        with open(temporary, mode, encoding=encoding, **kwargs) as f:
+            yield f
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+def atomic_savefig(path, figure=None, **kwargs):
+    """
+    Guarda la figura de matplotlib (por defecto la actual) con atomic_write,
+    para que un fallo al renderizar no deje una imagen a medias.
+    """
+    import matplotlib.pyplot as plt
+
+    figure = figure or plt.gcf()
+    # El formato se toma de la extension final, no de la del temporal
+    file_format = os.path.splitext(path)[1].lstrip('.') or None
+    with atomic_write(path, 'wb') as f:
+        figure.savefig(f, format=file_format, **kwargs)
@@ -0,0 +1,343 @@
+import asyncio
+import itertools
+import json
+import os
+import shutil
+import tempfile
+
+from websockets.asyncio.client import connect
+
+from src.util.utils import extra_browser_arguments
+
+# Tiempo maximo para que el navegador abra el puerto de depuracion
+LAUNCH_TIMEOUT = 30
+# Intervalo entre evaluaciones de una condicion en la pagina
+POLL_INTERVAL = 0.25
+
+# Expresion que resuelve un selector CSS o, si empieza por "/" o "(", un XPath
+_FIND_ELEMENT = """
+(selector => selector.startsWith('/') || selector.startsWith('(')
+    ? document.evaluate(selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+    : document.querySelector(selector))
+"""
+
+# Mismo criterio que EC.element_to_be_clickable: visible y habilitado
+_CLICKABLE = """
+(element => !!element && !element.disabled && element.getClientRects().length > 0
+    && getComputedStyle(element).visibility !== 'hidden')
+"""
+
+
+class CDPError(Exception):
+    """Error retornado por el navegador a un comando del DevTools Protocol."""
+
+
+class CDPConnection:
+    """
+    Conexion websocket al navegador. Un solo socket lleva los comandos de
+    todas las pestañas (sesiones "flatten"); cada respuesta se entrega a quien
+    envio el comando segun su id, y los eventos a quienes los esperan.
+    """
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._listeners = []
+        self._reader = asyncio.create_task(self._read())
+
+    @classmethod
+    async def open(cls, url):
+        # Sin limite de tamaño: page source y resultados de Runtime.evaluate pueden ser grandes
+        return cls(await connect(url, max_size=None))
+
+    async def send(self, method, params=None, session_id=None, timeout=None):
+        message_id = next(self._ids)
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        try:
+            await self.websocket.send(json.dumps(message))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(message_id, None)
+
+    def expect_event(self, method, session_id=None, predicate=None):
+        """
+        Retorna un future con los parametros del siguiente evento method que
+        cumpla predicate. Debe crearse antes del comando que lo provoca.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._listeners.append((method, session_id, predicate, future))
+        return future
+
+    async def _read(self):
+        try:
+            async for raw in self.websocket:
+                message = json.loads(raw)
+                if "id" in message:
+                    future = self._pending.get(message["id"])
+                    if future and not future.done():
+                        if "error" in message:
+                            future.set_exception(CDPError(message["error"].get("message")))
+                        else:
+                            future.set_result(message.get("result", {}))
+                else:
+                    self._dispatch(message)
+        except Exception as e:
+            error = e
+        else:
+            error = None
+        # Al cerrarse el socket nadie va a responder lo pendiente
+        error = CDPError(f"Conexión con el navegador cerrada: {error}" if error else "Conexión con el navegador cerrada")
+        for future in list(self._pending.values()) + [listener[3] for listener in self._listeners]:
+            if not future.done():
+                future.set_exception(error)
+
+    def _dispatch(self, message):
+        method, session_id, params = message.get("method"), message.get("sessionId"), message.get("params", {})
+        remaining = []
+        for listener in self._listeners:
+            expected, expected_session, predicate, future = listener
+            if future.done():
+                continue
+            if expected == method and expected_session in (None, session_id) and (predicate is None or predicate(params)):
+                future.set_result(params)
+            else:
+                remaining.append(listener)
+        self._listeners = remaining
+
+    async def close(self):
+        await self.websocket.close()
+        await self._reader
+
+
+class CDPTab:
+    """Pestaña del navegador controlada a traves de su sesion CDP."""
+
+    def __init__(self, connection, target_id, session_id, timeout=60):
+        self.connection = connection
+        self.target_id = target_id
+        self.session_id = session_id
+        self.timeout = timeout
+
+    async def send(self, method, **params):
+        return await self.connection.send(method, params, self.session_id, self.timeout)
+
+    def expect_event(self, method, predicate=None):
+        return self.connection.expect_event(method, self.session_id, predicate)
+
+    async def navigate(self, url):
+        """Navega a url y espera el evento load de la pagina."""
+        loaded = self.expect_event("Page.loadEventFired")
+        try:
+            result = await self.send("Page.navigate", url=url)
+            if result.get("errorText"):
+                raise CDPError(f"No se pudo cargar {url}: {result['errorText']}")
+            await asyncio.wait_for(loaded, self.timeout)
+        finally:
+            loaded.cancel()
+
+    async def evaluate(self, expression, await_promise=False):
+        """Evalua expression en la pagina y retorna su valor."""
+        result = await self.send(
+            "Runtime.evaluate", expression=expression, returnByValue=True, awaitPromise=await_promise,
+        )
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            raise CDPError(details.get("exception", {}).get("description") or details.get("text"))
+        return result["result"].get("value")
+
+    async def wait_for(self, expression, timeout=None):
+        """
+        Evalua expression hasta que sea verdadera, como WebDriverWait.until.
+        Los errores mientras la pagina navega (contexto destruido) se reintentan.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            try:
+                value = await self.evaluate(expression)
+                if value:
+                    return value
+            except CDPError:
+                pass
+            if loop.time() >= deadline:
+                raise asyncio.TimeoutError(f"Condición no cumplida en {timeout} s: {expression}")
+            await asyncio.sleep(POLL_INTERVAL)
+
+    @staticmethod
+    def _element(selector):
+        return f"{_FIND_ELEMENT}({json.dumps(selector)})"
+
+    async def wait_for_clickable(self, selector, timeout=None):
+        await self.wait_for(f"{_CLICKABLE}({self._element(selector)})", timeout)
+
+    async def wait_for_invisible(self, selector, timeout=None):
+        await self.wait_for(f"!{_CLICKABLE}({self._element(selector)})", timeout)
+
+    async def click(self, selector, timeout=None):
+        """Espera a que el elemento (CSS o XPath) sea clickeable y lo presiona."""
+        await self.wait_for_clickable(selector, timeout)
+        await self.evaluate(f"{self._element(selector)}.click()")
+
+    async def type_text(self, selector, text, submit=False):
+        """Escribe text en el campo y, si submit, presiona Enter."""
+        await self.wait_for_clickable(selector)
+        await self.evaluate(f"{self._element(selector)}.focus()")
+        await self.send("Input.insertText", text=text)
+        if submit:
+            key = {"key": "Enter", "code": "Enter", "windowsVirtualKeyCode": 13}
+            await self.send("Input.dispatchKeyEvent", type="keyDown", text="\r", **key)
+            await self.send("Input.dispatchKeyEvent", type="keyUp", **key)
+
+    async def current_url(self):
+        return await self.evaluate("location.href")
+
+    async def close(self):
+        await self.connection.send("Target.closeTarget", {"targetId": self.target_id})
+
+
+class CDPBrowser:
+    """
+    Navegador basado en Chromium (Brave por defecto, BRAVE_PATH) controlado
+    directamente por el DevTools Protocol, sin WebDriver. Todas las pestañas
+    comparten el contexto del navegador, y por lo tanto la sesion iniciada.
+
+    Ejemplo:
+        async with await CDPBrowser.launch(download_path) as browser:
+            tab = await browser.new_tab()
+            await tab.navigate("https://example.com")
+    """
+
+    def __init__(self, process, connection, user_data_dir, download_path=None, timeout=60):
+        self.process = process
+        self.connection = connection
+        self.user_data_dir = user_data_dir
+        self.download_path = download_path
+        self.timeout = timeout
+
+    @classmethod
+    async def launch(cls, download_path=None, executable=None, timeout=60):
+        executable = executable or os.getenv("BRAVE_PATH")
+        if not executable:
+            raise ValueError("Define BRAVE_PATH con la ruta del navegador")
+
+        user_data_dir = tempfile.mkdtemp(prefix="cdp_browser_")
+        arguments = [
+            executable,
+            "--remote-debugging-port=0",
+            f"--user-data-dir={user_data_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--disable-gpu",
+            "--no-sandbox",
+            "--disable-blink-features=AutomationControlled",
+            *extra_browser_arguments(),
+            "about:blank",
+        ]
+        process = await asyncio.create_subprocess_exec(
+            *arguments, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            url = await asyncio.wait_for(cls._websocket_url(process, user_data_dir), LAUNCH_TIMEOUT)
+            connection = await CDPConnection.open(url)
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            shutil.rmtree(user_data_dir, ignore_errors=True)
+            raise
+
+        browser = cls(process, connection, user_data_dir, download_path, timeout)
+        if download_path:
+            os.makedirs(download_path, exist_ok=True)
+            # Con allowAndName cada descarga se guarda con su guid: descargas simultaneas no se sobrescriben
+            await connection.send("Browser.setDownloadBehavior", {
+                "behavior": "allowAndName", "downloadPath": os.path.abspath(download_path), "eventsEnabled": True,
+            })
+        return browser
+
+    @staticmethod
+    async def _websocket_url(process, user_data_dir):
+        # Con el puerto 0 el navegador elige uno libre y lo escribe en DevToolsActivePort
+        path = os.path.join(user_data_dir, "DevToolsActivePort")
+        while True:
+            if process.returncode is not None:
+                raise CDPError(f"El navegador terminó al iniciar (código {process.returncode})")
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    lines = f.read().split()
+                if len(lines) >= 2:
+                    return f"ws://127.0.0.1:{lines[0]}{lines[1]}"
+            except OSError:
+                pass
+            await asyncio.sleep(0.1)
+
+    async def new_tab(self, url="about:blank"):
+        target = await self.connection.send("Target.createTarget", {"url": url})
+        target_id = target["targetId"]
+        attached = await self.connection.send("Target.attachToTarget", {"targetId": target_id, "flatten": True})
+        tab = CDPTab(self.connection, target_id, attached["sessionId"], self.timeout)
+        await tab.send("Page.enable")
+        await tab.send("Runtime.enable")
+        return tab
+
+    async def download(self, tab, trigger):
+        """
+        Ejecuta trigger (corrutina que inicia una descarga en tab) y espera a
+        que la descarga termine.
+
+        Returns:
+            tuple: (ruta del archivo descargado, nombre sugerido por el servidor).
+        """
+        begin = {}
+
+        def started_in_tab(params):
+            # El frame principal de una pestaña tiene el mismo id que su target
+            if not begin and params.get("frameId") == tab.target_id:
+                begin.update(params)
+                return True
+            return False
+
+        # Ambos eventos se esperan desde antes de la descarga: pueden llegar en el mismo lote
+        started = self.connection.expect_event("Browser.downloadWillBegin", predicate=started_in_tab)
+        finished = self.connection.expect_event(
+            "Browser.downloadProgress",
+            predicate=lambda p: p.get("guid") == begin.get("guid") and p.get("state") in ("completed", "canceled"),
+        )
+        try:
+            await trigger()
+            await asyncio.wait_for(started, self.timeout)
+            progress = await asyncio.wait_for(finished, self.timeout)
+        finally:
+            started.cancel()
+            finished.cancel()
+        if progress["state"] != "completed":
+            raise CDPError(f"Descarga cancelada: {begin.get('suggestedFilename')}")
+        return os.path.join(self.download_path, begin["guid"]), begin.get("suggestedFilename")
+
+    async def close(self):
+        try:
+            await self.connection.send("Browser.close", timeout=10)
+        except (CDPError, asyncio.TimeoutError):
+            pass
+        try:
+            await asyncio.wait_for(self.process.wait(), 10)
+        except asyncio.TimeoutError:
+            self.process.kill()
+            await self.process.wait()
+        try:
+            await self.connection.close()
+        except Exception:
+            pass
+        shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -0,0 +1,211 @@
+import glob
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from src.util.atomic import atomic_write
+
+TERMS_FILE = 'co_occurrence_terms.json'
+ROWS_FILE = 'co_occurrence_rows.npy'
+COLS_FILE = 'co_occurrence_cols.npy'
+COUNTS_FILE = 'co_occurrence_counts.npy'
+ARRAYS = ('rows', 'cols', 'counts')
+# Lecturas que se reintentan si un guardado simultaneo borra los arreglos a mitad de la carga
+LOAD_ATTEMPTS = 3
+
+
+def _file_names(name):
+    """Nombres de los archivos de una matriz; name distingue matrices en un mismo directorio."""
+    if name == 'co_occurrence':
+        return TERMS_FILE, ROWS_FILE, COLS_FILE, COUNTS_FILE
+    return (f'{name}_terms.json', f'{name}_rows.npy', f'{name}_cols.npy', f'{name}_counts.npy')
+
+
+def _generation_file(file_name, generation):
+    """Nombre del arreglo de una generacion: co_occurrence_rows.npy -> co_occurrence_rows.<generacion>.npy"""
+    stem, extension = os.path.splitext(file_name)
+    return f'{stem}.{generation}{extension}'
+
+
+def _save_array(path, array):
+    with atomic_write(path, 'wb') as f:
+        np.save(f, array)
+
+
+def save_co_occurrences(co_occurrences, output_dir, name='co_occurrence'):
+    """
+    Guarda la matriz de co-ocurrencia en formato compacto: el triángulo
+    superior disperso como tres arreglos .npy (fila, columna, conteo) y el
+    vocabulario de términos en JSON, que indica qué arreglos le corresponden.
+    Cada par se guarda una sola vez.
+
+    Args:
+        co_occurrences (dict): Diccionario anidado simétrico término -> término -> conteo.
+        output_dir (str): Directorio de resultados.
+        name (str): Prefijo de los archivos.
+
+    Returns:
+        str: Ruta del archivo de conteos.
+    """
+    terms = sorted(set(co_occurrences) | {term2 for row in co_occurrences.values() for term2 in row})
+    index = {term: i for i, term in enumerate(terms)}
+
+    pairs = []
+    for term1, row in co_occurrences.items():
+        i = index[term1]
+        for term2, count in row.items():
+            j = index[term2]
+            if i <= j and count:
+                pairs.append((i, j, count))
+    pairs.sort()
+
+    pairs = np.array(pairs, dtype=np.int32).reshape(-1, 3)
+    return save_co_occurrence_arrays(terms, pairs[:, 0], pairs[:, 1], pairs[:, 2], output_dir, name)
+
+
+def save_co_occurrence_arrays(terms, rows, cols, counts, output_dir, name='co_occurrence'):
+    """
+    Guarda una matriz de co-ocurrencia ya expresada como triángulo superior
+    disperso (p. ej. el resultado de scipy.sparse.triu en formato COO).
+
+    Returns:
+        str: Ruta del archivo de conteos.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    terms_file, *array_files = _file_names(name)
+
+    # Los arreglos se escriben con el nombre de su generacion; el archivo de terminos,
+    # que los referencia, se reemplaza al final y es el punto de entrada de los lectores,
+    # asi que siempre ven un vocabulario con los arreglos que le corresponden.
+    # La generacion es el hash del contenido: guardar la misma matriz produce los mismos archivos
+    arrays = [np.ascontiguousarray(values, dtype=np.int32) for values in (rows, cols, counts)]
+    digest = hashlib.sha1()
+    for array in arrays:
+        digest.update(array.tobytes())
+    generation = digest.hexdigest()[:12]
+    manifest = {'terms': terms, 'pairs': len(arrays[0])}
+    for key, file_name, array in zip(ARRAYS, array_files, arrays):
+        manifest[key] = _generation_file(file_name, generation)
+        path = os.path.join(output_dir, manifest[key])
+        if not os.path.exists(path):
+            _save_array(path, array)
+
+    terms_path = os.path.join(output_dir, terms_file)
+    previous = _read_manifest(terms_path)
+    with atomic_write(terms_path) as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+    # Se conserva tambien la generacion anterior: un lector puede haber leido su archivo de terminos
+    keep = {manifest[key] for key in ARRAYS}
+    if isinstance(previous, dict):
+        keep.update(previous.get(key) for key in ARRAYS)
+    _remove_stale_arrays(output_dir, array_files, keep)
+    return os.path.join(output_dir, manifest['counts'])
+
+
+def _read_manifest(terms_path):
+    try:
+        with open(terms_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _remove_stale_arrays(output_dir, array_files, keep):
+    """Borra los arreglos de generaciones que no estan en keep (y los del formato sin generacion)."""
+    for file_name in array_files:
+        candidates = [os.path.join(output_dir, file_name)] + glob.glob(os.path.join(output_dir, _generation_file(file_name, '*')))
+        for path in candidates:
+            if os.path.basename(path) in keep or not os.path.exists(path):
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                # Un lector puede tenerlo abierto (en Windows); se borra en el siguiente guardado
+                pass
+
+
+class CoOccurrenceMatrix:
+    """
+    Matriz de co-ocurrencia dispersa (triángulo superior) cargada desde los
+    arreglos .npy que referencia el archivo de términos. Con mmap=True los arreglos se mapean en memoria en modo de
+    solo lectura y no se copian al cargarlos.
+    """
+
+    def __init__(self, terms, rows, cols, counts):
+        self.terms = terms
+        self.rows = rows
+        self.cols = cols
+        self.counts = counts
+
+    @staticmethod
+    def exists(output_dir, name='co_occurrence'):
+        """Indica si output_dir contiene una matriz guardada con save_co_occurrences."""
+        return os.path.exists(os.path.join(output_dir, _file_names(name)[0]))
+
+    @classmethod
+    def load(cls, output_dir, mmap=True, name='co_occurrence'):
+        """
+        Carga la matriz guardada en output_dir.
+
+        Args:
+            output_dir (str): Directorio de resultados.
+            mmap (bool): Mapear los arreglos en memoria en vez de leerlos.
+            name (str): Prefijo de los archivos.
+        """
+        for attempt in range(LOAD_ATTEMPTS):
+            try:
+                return cls._load(output_dir, mmap, name)
+            except FileNotFoundError:
+                # Guardados simultaneos borraron los arreglos leidos; se vuelve a leer el archivo de terminos
+                if attempt == LOAD_ATTEMPTS - 1:
+                    raise
+
+    @classmethod
+    def _load(cls, output_dir, mmap, name):
+        mmap_mode = 'r' if mmap else None
+        terms_file, *array_files = _file_names(name)
+        terms_path = os.path.join(output_dir, terms_file)
+        with open(terms_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if isinstance(manifest, list):
+            # Formato anterior: solo el vocabulario, con arreglos de nombre fijo
+            manifest = dict(zip(ARRAYS, array_files), terms=manifest, pairs=None)
+
+        arrays = [np.load(os.path.join(output_dir, manifest[key]), mmap_mode=mmap_mode) for key in ARRAYS]
+        lengths = {len(array) for array in arrays}
+        if len(lengths) != 1 or (manifest['pairs'] is not None and lengths != {manifest['pairs']}):
+            raise ValueError(f"Matriz de co-ocurrencia inconsistente en {terms_path}")
+        return cls(manifest['terms'], *arrays)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def top_pairs(self, n=None, min_weight=1):
+        """
+        Retorna los pares con más co-ocurrencias.
+
+        Args:
+            n (int, optional): Cantidad máxima de pares. None para todos.
+            min_weight (int): Conteo mínimo de un par.
+
+        Returns:
+            list: Tuplas (término1, término2, conteo) de mayor a menor conteo.
+        """
+        selected = np.flatnonzero(self.counts >= min_weight)
+        # Orden estable para que los empates respeten el orden de los términos
+        order = selected[np.argsort(-self.counts[selected], kind='stable')]
+        if n is not None:
+            order = order[:n]
+        return [(self.terms[self.rows[k]], self.terms[self.cols[k]], int(self.counts[k])) for k in order]
+
+    def to_dict(self):
+        """Retorna el diccionario anidado simétrico que guardaba co_occurrences.json."""
+        result = {}
+        for i, j, count in zip(self.rows.tolist(), self.cols.tolist(), self.counts.tolist()):
+            term1, term2 = self.terms[i], self.terms[j]
+            result.setdefault(term1, {})[term2] = count
+            result.setdefault(term2, {})[term1] = count
+        return result
@@ -0,0 +1,124 @@
+import re
+
+import numpy as np
+
+YEAR_PATTERN = re.compile(r'\d{4}')
+
+
+def _year_value(label):
+    """Año numerico de una etiqueta ("2021", "2021///"), o None si no tiene."""
+    match = YEAR_PATTERN.search(str(label))
+    return int(match.group()) if match else None
+
+
+def _year_sort_key(label):
+    value = _year_value(label)
+    return (value is None, value or 0, str(label))
+
+
+class YearTypeMatrix:
+    """
+    Tabla cruzada año x tipo de producto como matriz de enteros. Las filas
+    son los años ordenados cronologicamente y las columnas los tipos en
+    orden alfabetico; counts[i, j] es la cantidad de productos del tipo j
+    publicados en el año i.
+    """
+
+    def __init__(self, years, types, counts):
+        self.years = list(years)
+        self.types = list(types)
+        self.counts = np.asarray(counts, dtype=np.int64).reshape(len(self.years), len(self.types))
+
+    @classmethod
+    def from_pairs(cls, years, types):
+        """
+        Construye la matriz a partir de dos secuencias paralelas de años y
+        tipos. Los valores se codifican como enteros y se cuentan con una sola
+        llamada a np.bincount.
+        """
+        years = np.asarray(years, dtype=object).astype(str)
+        types = np.asarray(types, dtype=object).astype(str)
+        if years.size == 0:
+            return cls([], [], np.zeros((0, 0), dtype=np.int64))
+
+        year_labels, year_codes = np.unique(years, return_inverse=True)
+        type_labels, type_codes = np.unique(types, return_inverse=True)
+
+        counts = np.bincount(
+            year_codes * len(type_labels) + type_codes,
+            minlength=len(year_labels) * len(type_labels),
+        ).reshape(len(year_labels), len(type_labels))
+
+        # np.unique ordena como texto; los años se reordenan por su valor numerico
+        order = sorted(range(len(year_labels)), key=lambda i: _year_sort_key(year_labels[i]))
+        return cls(year_labels[order].tolist(), type_labels.tolist(), counts[order])
+
+    @classmethod
+    def from_nested(cls, nested_dict):
+        """Construye la matriz desde un diccionario año -> tipo -> cantidad."""
+        years = sorted(nested_dict, key=_year_sort_key)
+        types = sorted({pub_type for row in nested_dict.values() for pub_type in row})
+        column = {pub_type: j for j, pub_type in enumerate(types)}
+        counts = np.zeros((len(years), len(types)), dtype=np.int64)
+        for i, year in enumerate(years):
+            for pub_type, total in nested_dict[year].items():
+                counts[i, column[pub_type]] = total
+        return cls(years, types, counts)
+
+    def __len__(self):
+        return len(self.years)
+
+    def to_nested(self):
+        """Retorna el diccionario año -> tipo -> cantidad (solo valores distintos de cero)."""
+        return {
+            year: {pub_type: int(total) for pub_type, total in zip(self.types, row) if total}
+            for year, row in zip(self.years, self.counts)
+        }
+
+    def totals_by_type(self):
+        """Cantidad total de productos por tipo."""
+        return dict(zip(self.types, self.counts.sum(axis=0).tolist()))
+
+    def totals_by_year(self):
+        """Cantidad total de productos por año."""
+        return dict(zip(self.years, self.counts.sum(axis=1).tolist()))
+
+    def window(self, start=None, end=None):
+        """
+        Retorna la sub-matriz de los años entre start y end (inclusive). Los
+        años sin valor numerico quedan fuera.
+        """
+        values = np.array([_year_value(year) for year in self.years], dtype=float)
+        mask = ~np.isnan(values)
+        if start is not None:
+            mask &= values >= start
+        if end is not None:
+            mask &= values <= end
+        return YearTypeMatrix([year for year, keep in zip(self.years, mask) if keep], self.types, self.counts[mask])
+
+    def fill_years(self):
+        """
+        Retorna la matriz con una fila por cada año del rango (con ceros en los
+        años sin publicaciones) y etiquetas numericas. Las filas con el mismo
+        año numerico se suman.
+        """
+        values = [_year_value(year) for year in self.years]
+        known = [i for i, value in enumerate(values) if value is not None]
+        if not known:
+            return YearTypeMatrix([], self.types, np.zeros((0, len(self.types)), dtype=np.int64))
+
+        first = min(values[i] for i in known)
+        last = max(values[i] for i in known)
+        counts = np.zeros((last - first + 1, len(self.types)), dtype=np.int64)
+        np.add.at(counts, [values[i] - first for i in known], self.counts[known])
+        return YearTypeMatrix([str(year) for year in range(first, last + 1)], self.types, counts)
+
+    def rolling(self, window):
+        """
+        Conteo móvil: cada fila suma los últimos window años (incluido el
+        actual) sobre el rango continuo de años.
+        """
+        filled = self.fill_years()
+        cumulative = np.cumsum(np.vstack([np.zeros((1, len(self.types)), dtype=np.int64), filled.counts]), axis=0)
+        counts = cumulative[1:] - cumulative[np.maximum(np.arange(1, len(cumulative)) - window, 0)]
+        return YearTypeMatrix(filled.years, self.types, counts)
@@ -0,0 +1,293 @@
+import glob
+import hashlib
+import os
+
+import numpy as np
+from scipy import sparse
+
+from src.util.instrumentation import instrumented
+from src.util.ris_utils import abstract_documents, load_corpus
+from src.util.shared_cache import get_shared_cache
+
+# Version del formato guardado; cambiarla obliga a recalcular las caracteristicas
+FEATURES_VERSION = 1
+# Dimension fija del espacio de hashing
+N_FEATURES = 2 ** 18
+# Documentos por bloque al vectorizar
+CHUNK_SIZE = 1000
+
+
+def _text_hash(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def corpus_hash(documents):
+    """Hash del corpus: claves y contenido de los documentos, en orden."""
+    digest = hashlib.sha1()
+    for key, text in documents:
+        digest.update(f"{key}\0{_text_hash(text)}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _stop_words():
+    from nltk.corpus import stopwords
+
+    from src.util.nltk_utils import ensure_nltk_resources
+
+    ensure_nltk_resources('stopwords')
+    return sorted(set(stopwords.words('english')))
+
+
+def _document_frequency(counts):
+    """Cantidad de documentos en los que aparece cada columna."""
+    return np.bincount(counts.indices, minlength=counts.shape[1]).astype(np.int64)
+
+
+class FeatureStore:
+    """
+    Matriz de caracteristicas TF-IDF de los abstracts, compartida por el
+    clustering y la busqueda de similitud.
+
+    Los textos se vectorizan con un HashingVectorizer de dimension fija (no
+    hay vocabulario que ajustar), por bloques de CHUNK_SIZE documentos, y la
+    frecuencia de documentos para el IDF se acumula bloque a bloque. Se
+    guardan las frecuencias de terminos crudas y la frecuencia de documentos,
+    asi que al llegar registros nuevos solo se vectorizan esos y se agregan
+    como filas; el IDF se recalcula desde los conteos.
+    """
+
+    def __init__(self, keys, hashes, counts, df, n_features=N_FEATURES):
+        self.keys = list(keys)
+        self.hashes = list(hashes)
+        self.counts = counts.tocsr()
+        self.df = df
+        self.n_features = n_features
+        self.index = {key: i for i, key in enumerate(self.keys)}
+        self._tfidf = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def corpus_hash(self):
+        digest = hashlib.sha1()
+        for key, text_hash in zip(self.keys, self.hashes):
+            digest.update(f"{key}\0{text_hash}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    @staticmethod
+    def vectorizer(n_features=N_FEATURES):
+        """Vectorizador sin estado usado para todos los textos del almacen."""
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        return HashingVectorizer(
+            n_features=n_features, stop_words=_stop_words(), alternate_sign=False, norm=None, dtype=np.float32,
+        )
+
+    @classmethod
+    @instrumented(count=lambda result, cls, documents, *args, **kwargs: len(documents))
+    def build(cls, documents, base=None, n_features=N_FEATURES, chunk_size=CHUNK_SIZE):
+        """
+        Construye el almacen para documentos (clave, texto). Si se da base, se
+        reutilizan sus filas para los documentos sin cambios y solo se
+        vectorizan los nuevos o modificados.
+        """
+        if base is not None and base.n_features != n_features:
+            base = None
+
+        hashes = [_text_hash(text) for _, text in documents]
+        reused = {}
+        if base is not None:
+            for i, (key, _) in enumerate(documents):
+                row = base.index.get(key)
+                if row is not None and base.hashes[row] == hashes[i]:
+                    reused[i] = row
+
+        pending = [i for i in range(len(documents)) if i not in reused]
+        blocks = []
+        df = np.zeros(n_features, dtype=np.int64)
+        if base is not None:
+            # Se parte de la frecuencia de documentos guardada y se restan las filas descartadas
+            df += base.df
+            dropped = np.setdiff1d(np.arange(len(base)), np.fromiter(reused.values(), dtype=np.int64))
+            if len(dropped):
+                df -= _document_frequency(base.counts[dropped])
+
+        # Con CACHE_DIR, las filas de abstracts ya vectorizados en otro workspace se reutilizan
+        shared = get_shared_cache(f"features:{FEATURES_VERSION}:{n_features}")
+        cached = shared.get_many(hashes[i] for i in pending) if shared and pending else {}
+        from_cache = [i for i in pending if hashes[i] in cached]
+        vectorized = [i for i in pending if hashes[i] not in cached]
+        if from_cache:
+            rows_data = [cached[hashes[i]] for i in from_cache]
+            block = sparse.csr_matrix(
+                (
+                    np.array([value for _, data in rows_data for value in data], dtype=np.float32),
+                    np.array([column for indices, _ in rows_data for column in indices], dtype=np.int32),
+                    np.cumsum([0] + [len(indices) for indices, _ in rows_data]),
+                ),
+                shape=(len(from_cache), n_features),
+            )
+            df += _document_frequency(block)
+            blocks.append(block)
+        # Las filas nuevas quedan en el orden de los bloques: primero las de la cache
+        pending = from_cache + vectorized
+
+        if vectorized:
+            vectorizer = cls.vectorizer(n_features)
+            for start in range(0, len(vectorized), chunk_size):
+                chunk = vectorized[start:start + chunk_size]
+                block = vectorizer.transform([documents[i][1] for i in chunk]).tocsr()
+                df += _document_frequency(block)
+                blocks.append(block)
+                if shared:
+                    shared.put_many(
+                        (hashes[i], [block.indices[begin:end].tolist(), block.data[begin:end].tolist()])
+                        for i, begin, end in zip(chunk, block.indptr[:-1], block.indptr[1:])
+                    )
+
+        # Filas en el orden de documents: primero las de base, luego las nuevas
+        rows = np.empty(len(documents), dtype=np.int64)
+        offset = len(base) if base is not None else 0
+        for i, row in reused.items():
+            rows[i] = row
+        rows[pending] = offset + np.arange(len(pending))
+        stacked = [base.counts] if base is not None else []
+        stacked += blocks or [sparse.csr_matrix((0, n_features), dtype=np.float32)]
+        counts = sparse.vstack(stacked, format='csr')[rows]
+
+        if base is not None or from_cache:
+            print(f"[FEATURES] {len(reused)} documentos reutilizados, {len(from_cache)} desde la caché compartida, {len(vectorized)} vectorizados")
+        return cls([key for key, _ in documents], hashes, counts, df, n_features)
+
+    def column_terms(self, texts):
+        """
+        Recupera los terminos de las columnas usadas por texts. El hashing no
+        guarda vocabulario, asi que cada palabra de los textos se vuelve a
+        pasar por el vectorizador para saber a que columna corresponde.
+
+        Returns:
+            dict: Columna -> termino (en una colision se conserva el primero en orden alfabetico).
+        """
+        vectorizer = self.vectorizer(self.n_features)
+        analyzer = vectorizer.build_analyzer()
+        words = sorted({word for text in texts for word in analyzer(text)})
+        if not words:
+            return {}
+        hashed = vectorizer.transform(words).tocsr()
+        terms = {}
+        for word, start, end in zip(words, hashed.indptr[:-1], hashed.indptr[1:]):
+            for column in hashed.indices[start:end]:
+                terms.setdefault(int(column), word)
+        return terms
+
+    @property
+    def idf(self):
+        """IDF suavizado (igual que TfidfTransformer): log((1 + n) / (1 + df)) + 1."""
+        return (np.log((1 + len(self)) / (1 + self.df)) + 1).astype(np.float32)
+
+    def tfidf(self, rows=None):
+        """
+        Matriz TF-IDF dispersa (CSR) normalizada con L2.
+
+        Args:
+            rows (list, optional): Filas o claves de documentos a retornar. Por defecto, todas.
+        """
+        from sklearn.preprocessing import normalize
+
+        if rows is None:
+            if self._tfidf is None:
+                self._tfidf = normalize(self.counts @ sparse.diags(self.idf))
+            return self._tfidf
+        rows = [self.index[row] if isinstance(row, str) else row for row in rows]
+        return normalize(self.counts[rows] @ sparse.diags(self.idf))
+
+    def most_similar(self, key, n=10):
+        """
+        Documentos mas parecidos (similitud coseno) al documento key.
+
+        Returns:
+            list: Tuplas (clave, similitud) de mayor a menor similitud.
+        """
+        matrix = self.tfidf()
+        row = self.index[key]
+        scores = (matrix @ matrix[row].T).toarray().ravel()
+        scores[row] = -1
+        n = min(n, len(self) - 1)
+        if n <= 0:
+            return []
+        top = np.argpartition(-scores, n - 1)[:n]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(self.keys[i], float(scores[i])) for i in top]
+
+    def save(self, output_dir):
+        """Guarda el almacen como features_<hash>.npz y elimina las versiones anteriores."""
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"features_{self.corpus_hash[:16]}.npz")
+        # Se escribe en un archivo temporal y se renombra para no dejar un archivo a medias
+        with open(path + '.tmp', 'wb') as f:
+            np.savez(
+                f,
+                version=FEATURES_VERSION,
+                n_features=self.n_features,
+                keys=np.array(self.keys, dtype=str),
+                hashes=np.array(self.hashes, dtype=str),
+                data=self.counts.data,
+                indices=self.counts.indices,
+                indptr=self.counts.indptr,
+                df=self.df,
+            )
+        os.replace(path + '.tmp', path)
+        for old in glob.glob(os.path.join(output_dir, 'features_*.npz')):
+            if old != path:
+                os.remove(old)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            if int(data['version']) != FEATURES_VERSION:
+                raise ValueError(f"Versión de características no compatible: {path}")
+            n_features = int(data['n_features'])
+            keys, hashes = data['keys'].tolist(), data['hashes'].tolist()
+            counts = sparse.csr_matrix(
+                (data['data'], data['indices'], data['indptr']), shape=(len(keys), n_features),
+            )
+            return cls(keys, hashes, counts, data['df'], n_features)
+
+    @classmethod
+    def latest(cls, output_dir):
+        """Carga el almacen guardado en output_dir, o None si no hay uno valido."""
+        paths = sorted(glob.glob(os.path.join(output_dir, 'features_*.npz')), key=os.path.getmtime)
+        for path in reversed(paths):
+            try:
+                return cls.load(path)
+            except (OSError, ValueError, KeyError):
+                continue
+        return None
+
+    @classmethod
+    def update(cls, documents, output_dir, n_features=N_FEATURES):
+        """
+        Retorna el almacen para documents. Si el guardado corresponde al mismo
+        corpus se carga tal cual; si no, se actualiza con los documentos nuevos
+        o modificados y se guarda.
+        """
+        current = corpus_hash(documents)
+        path = os.path.join(output_dir, f"features_{current[:16]}.npz")
+        if os.path.exists(path):
+            try:
+                store = cls.load(path)
+                if store.corpus_hash == current and store.n_features == n_features:
+                    return store
+            except (OSError, ValueError, KeyError):
+                pass
+
+        store = cls.build(documents, base=cls.latest(output_dir), n_features=n_features)
+        store.save(output_dir)
+        return store
+
+
+def load_features(ris_path, output_dir):
+    """Almacen de caracteristicas de los abstracts del archivo RIS, actualizado si hace falta."""
+    return FeatureStore.update(abstract_documents(load_corpus(ris_path)), output_dir)
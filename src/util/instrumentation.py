@@ -0,0 +1,222 @@
+import functools
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from src.util.profiling import peak_rss_mb
+
+# Tamaño maximo de metrics.jsonl antes de rotarlo a metrics.jsonl.1 (METRICS_MAX_BYTES)
+DEFAULT_METRICS_MAX_BYTES = 10 * 1024 * 1024
+
+
+def _empty_totals():
+    return {"count": 0, "seconds": 0.0, "items": 0, "rss_growth_mb": 0.0, "process_peak_rss_mb": 0.0}
+
+
+# Agregados por operacion en este proceso: nombre -> contadores
+_totals = defaultdict(_empty_totals)
+
+
+def get_metrics_dir():
+    """Directorio de exportacion de metricas (METRICS_DIR). None si la exportacion esta desactivada."""
+    return os.getenv("METRICS_DIR") or None
+
+
+class Measurement:
+    """Medicion en curso; el codigo medido puede fijar items con la cantidad procesada."""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = None
+        self.seconds = None
+        self.rss_growth_mb = None
+
+
+def _metrics_max_bytes():
+    return int(os.getenv("METRICS_MAX_BYTES") or DEFAULT_METRICS_MAX_BYTES)
+
+
+def _append_line(path, line):
+    """Agrega una linea a path y lo rota a path.1 si supera METRICS_MAX_BYTES."""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(line) + "\n")
+        size = f.tell()
+    if size > _metrics_max_bytes():
+        try:
+            # Otro proceso puede haberlo rotado al mismo tiempo
+            os.replace(path, path + ".1")
+        except OSError:
+            pass
+
+
+def record(name, seconds, items=None, rss_growth_mb=None):
+    """
+    Registra una medicion en los agregados del proceso y, si METRICS_DIR esta
+    definida, la agrega como linea JSON a <METRICS_DIR>/metrics.jsonl.
+
+    Args:
+        rss_growth_mb (float, optional): Cuanto subio el pico de memoria
+            residente del proceso durante la operacion; es la memoria que la
+            operacion agrego por encima de lo que el proceso ya habia usado.
+    """
+    process_peak = peak_rss_mb()
+    totals = _totals[name]
+    totals["count"] += 1
+    totals["seconds"] += seconds
+    totals["items"] += items or 0
+    if rss_growth_mb is not None:
+        totals["rss_growth_mb"] = max(totals["rss_growth_mb"], rss_growth_mb)
+    if process_peak is not None:
+        totals["process_peak_rss_mb"] = max(totals["process_peak_rss_mb"], process_peak)
+
+    metrics_dir = get_metrics_dir()
+    if metrics_dir:
+        os.makedirs(metrics_dir, exist_ok=True)
+        line = {
+            "timestamp": round(time.time(), 3),
+            "operation": name,
+            "seconds": round(seconds, 6),
+            "items": items,
+            "rss_growth_mb": round(rss_growth_mb, 1) if rss_growth_mb is not None else None,
+            "process_peak_rss_mb": round(process_peak, 1) if process_peak is not None else None,
+            "pid": os.getpid(),
+        }
+        _append_line(os.path.join(metrics_dir, "metrics.jsonl"), line)
+
+
+@contextmanager
+def measure(name, items=None):
+    """
+    Mide la duracion de un bloque.
+
+    Ejemplo:
+        with measure("merge_ris_file") as m:
+            ...
+            m.items = len(articulos)
+    """
+    measurement = Measurement(name)
+    measurement.items = items
+    peak_before = peak_rss_mb()
+    start = time.perf_counter()
+    try:
+        yield measurement
+    finally:
+        measurement.seconds = time.perf_counter() - start
+        peak_after = peak_rss_mb()
+        if peak_before is not None and peak_after is not None:
+            measurement.rss_growth_mb = peak_after - peak_before
+        record(name, measurement.seconds, measurement.items, measurement.rss_growth_mb)
+
+
+def _default_count(result, *args, **kwargs):
+    if isinstance(result, (str, bytes)):
+        return None
+    try:
+        return len(result)
+    except TypeError:
+        return None
+
+
+def instrumented(name=None, count=_default_count):
+    """
+    Decorador que mide cada llamada a la funcion. Por defecto la cantidad de
+    elementos procesados es len() del valor retornado.
+
+    Args:
+        name (str, optional): Nombre de la operacion. Por defecto, el nombre calificado de la funcion.
+        count (callable, optional): Funcion que recibe el resultado y los argumentos de la
+            llamada y retorna la cantidad de elementos. None para no contar.
+    """
+    def decorator(func):
+        operation = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with measure(operation) as m:
+                result = func(*args, **kwargs)
+                if count:
+                    m.items = count(result, *args, **kwargs)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def get_totals():
+    """Retorna una copia de los agregados del proceso actual."""
+    return {name: dict(values) for name, values in _totals.items()}
+
+
+def _prometheus_label(value):
+    return re.sub(r'(["\\\\])', r'\\\1', value).replace("\n", "\\n")
+
+
+def export_prometheus(metrics_dir=None):
+    """
+    Agrega las lineas de metrics.jsonl y de su ultima rotacion (de todos los procesos) y escribe
+    <metrics_dir>/metrics.prom en formato de texto de Prometheus, para que un
+    scraper local lo lea (p. ej. el textfile collector de node_exporter).
+
+    Returns:
+        str: Ruta del archivo generado, o None si no hay metricas.
+    """
+    metrics_dir = metrics_dir or get_metrics_dir()
+    if not metrics_dir:
+        return None
+    jsonl_path = os.path.join(metrics_dir, "metrics.jsonl")
+    # Las mediciones de la ultima rotacion tambien cuentan
+    paths = [path for path in (jsonl_path + ".1", jsonl_path) if os.path.exists(path)]
+    if not paths:
+        return None
+
+    totals = defaultdict(_empty_totals)
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                values = totals[entry["operation"]]
+                values["count"] += 1
+                values["seconds"] += entry["seconds"]
+                values["items"] += entry["items"] or 0
+                values["rss_growth_mb"] = max(values["rss_growth_mb"], entry.get("rss_growth_mb") or 0)
+                values["process_peak_rss_mb"] = max(values["process_peak_rss_mb"], entry.get("process_peak_rss_mb") or 0)
+
+    lines = [
+        "# HELP proyecto_operation_duration_seconds Tiempo de ejecucion por operacion.",
+        "# TYPE proyecto_operation_duration_seconds summary",
+    ]
+    for operation, values in sorted(totals.items()):
+        label = f'operation="{_prometheus_label(operation)}"'
+        lines.append(f"proyecto_operation_duration_seconds_sum{{{label}}} {values['seconds']:.6f}")
+        lines.append(f"proyecto_operation_duration_seconds_count{{{label}}} {values['count']}")
+    lines += [
+        "# HELP proyecto_operation_items_total Elementos procesados por operacion.",
+        "# TYPE proyecto_operation_items_total counter",
+    ]
+    for operation, values in sorted(totals.items()):
+        lines.append(f'proyecto_operation_items_total{{operation="{_prometheus_label(operation)}"}} {values["items"]}')
+    lines += [
+        "# HELP proyecto_operation_rss_growth_bytes Maximo aumento del pico de memoria residente del proceso durante la operacion.",
+        "# TYPE proyecto_operation_rss_growth_bytes gauge",
+    ]
+    for operation, values in sorted(totals.items()):
+        lines.append(f'proyecto_operation_rss_growth_bytes{{operation="{_prometheus_label(operation)}"}} {int(values["rss_growth_mb"] * 1024 * 1024)}')
+    lines += [
+        "# HELP proyecto_process_peak_rss_bytes Pico de memoria residente del proceso (toda su vida) al terminar la operacion.",
+        "# TYPE proyecto_process_peak_rss_bytes gauge",
+    ]
+    for operation, values in sorted(totals.items()):
+        lines.append(f'proyecto_process_peak_rss_bytes{{operation="{_prometheus_label(operation)}"}} {int(values["process_peak_rss_mb"] * 1024 * 1024)}')
+
+    # Se escribe en un archivo temporal y se renombra para que el scraper nunca lea un archivo a medias
+    prom_path = os.path.join(metrics_dir, "metrics.prom")
+    with open(prom_path + ".tmp", "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(prom_path + ".tmp", prom_path)
+    return prom_path
@@ -0,0 +1,118 @@
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from src.util.instrumentation import measure
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Job:
+    """Trabajo en segundo plano; su estado se consulta por id."""
+
+    def __init__(self, kind):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = PENDING
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+
+    @property
+    def active(self):
+        return self.status in (PENDING, RUNNING)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """
+    Cola de trabajos en segundo plano dentro del proceso. Los trabajos se
+    ejecutan en un ThreadPoolExecutor (por defecto un solo hilo, porque
+    matplotlib no es seguro entre hilos) y comparten la cache del corpus del
+    proceso. Si ya hay un trabajo del mismo tipo pendiente o en ejecucion, se
+    retorna ese mismo trabajo en vez de encolar otro.
+    """
+
+    def __init__(self, max_workers=1, max_history=100):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._max_history = max_history
+
+    def submit(self, kind, func, *args, on_success=None, **kwargs):
+        """
+        Encola func(*args, **kwargs).
+
+        Args:
+            kind (str): Tipo de trabajo, p. ej. "analyze".
+            func (callable): Funcion a ejecutar; su resultado debe ser serializable a JSON.
+            on_success (callable, optional): Se llama con el resultado al terminar bien,
+                p. ej. para reemplazar los resultados que sirve la aplicacion.
+
+        Returns:
+            tuple: (trabajo, True si se creo uno nuevo)
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.kind == kind and job.active:
+                    return job, False
+            job = Job(kind)
+            self._jobs[job.id] = job
+            self._prune()
+
+        self._executor.submit(self._run, job, func, args, kwargs, on_success)
+        return job, True
+
+    def _run(self, job, func, args, kwargs, on_success):
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            with measure(f"job:{job.kind}"):
+                result = func(*args, **kwargs)
+                if on_success:
+                    on_success(result)
+            job.result = result
+            job.status = DONE
+        except Exception:
+            job.error = traceback.format_exc()
+            job.status = FAILED
+            print(f"[JOB] {job.kind} {job.id} falló:\n{job.error}")
+        finally:
+            job.finished_at = time.time()
+
+    def _prune(self):
+        # Se descartan los trabajos terminados mas antiguos
+        finished = [job for job in self._jobs.values() if not job.active]
+        for job in sorted(finished, key=lambda job: job.created_at)[:max(0, len(self._jobs) - self._max_history)]:
+            del self._jobs[job.id]
+
+    def get(self, job_id):
+        """Retorna el trabajo con ese id, o None."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self):
+        """Retorna los trabajos conocidos, del mas reciente al mas antiguo."""
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
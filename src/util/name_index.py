@@ -0,0 +1,305 @@
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+
+from src.util.shared_cache import get_shared_cache
+
+# Palabras que no distinguen revistas ni editoriales
+VENUE_STOPWORDS = {"the", "of", "and", "for", "on", "in", "a", "an", "de", "la", "el", "y"}
+# Sufijos legales que no cambian la editorial ("SAGE Publications Inc")
+VENUE_SUFFIXES = {"inc", "incorporated", "ltd", "limited", "llc", "co", "corp", "gmbh", "ag", "sa", "plc", "bv", "nv"}
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Version de las reglas de agrupacion; cambiarla invalida los bloques guardados en la cache compartida
+NAME_INDEX_VERSION = 2
+
+# Similitud minima entre dos nombres de pila completos en la misma posicion ("jon" y "john")
+AUTHOR_SIMILARITY = 0.85
+
+
+def _ascii_lower(text):
+    """Quita tildes y pasa a minusculas: "García" -> "garcia"."""
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def split_author(name):
+    """
+    Separa un nombre de autor en (apellido, nombres) normalizados.
+    Acepta "Apellido, Nombre" y "Nombre Apellido".
+    """
+    name = _ascii_lower(name)
+    if "," in name:
+        last, first = name.split(",", 1)
+    else:
+        parts = name.split()
+        last, first = (parts[-1], " ".join(parts[:-1])) if parts else ("", "")
+    last = " ".join(WORD_PATTERN.findall(last))
+    first = WORD_PATTERN.findall(first)
+    return last, first
+
+
+def author_key(name):
+    """
+    Clave canonica de bloqueo de un autor: apellido e iniciales de todos los
+    nombres de pila, incluidas las partes de un nombre compuesto
+    ("Smith, J." -> "smith j", "Liu, Jia-zheng" -> "liu jz").
+    """
+    last, first = split_author(name)
+    return f"{last} {''.join(part[0] for part in first)}".strip()
+
+
+def _given_names_compatible(first_a, first_b):
+    """
+    Dos secuencias de nombres de pila corresponden a la misma persona si
+    tienen las mismas partes y cada par coincide: iguales (o parecidos) si
+    ambos estan completos, misma inicial si alguno es una inicial.
+    """
+    if len(first_a) != len(first_b):
+        return False
+    for part_a, part_b in zip(first_a, first_b):
+        if part_a[0] != part_b[0]:
+            return False
+        if len(part_a) > 1 and len(part_b) > 1 and SequenceMatcher(None, part_a, part_b).ratio() < AUTHOR_SIMILARITY:
+            return False
+    return True
+
+
+def venue_key(name):
+    """
+    Clave canonica de una revista o editorial: sin tildes, puntuacion,
+    palabras vacias ni sufijos legales; "&" equivale a "and".
+    """
+    # Los puntos se eliminan para que "B.V." quede como "bv"
+    words = WORD_PATTERN.findall(_ascii_lower(name).replace(".", "").replace("&", " and "))
+    words = [word for word in words if word not in VENUE_STOPWORDS]
+    while len(words) > 1 and words[-1] in VENUE_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def _acronym(key):
+    """Acronimo de una clave de varias palabras ("institute electrical electronics engineers" -> "ieee")."""
+    words = key.split()
+    return "".join(word[0] for word in words) if len(words) > 1 else None
+
+
+def _venue_keys_compatible(key_a, key_b):
+    """
+    Dos claves de revista son la misma si tienen las mismas palabras, salvo
+    abreviaturas: cada palabra es igual o prefijo de la otra ("int j stem
+    educ" y "international journal stem education").
+    """
+    words_a, words_b = key_a.split(), key_b.split()
+    return len(words_a) == len(words_b) and all(
+        word_a.startswith(word_b) or word_b.startswith(word_a) for word_a, word_b in zip(words_a, words_b)
+    )
+
+
+def _complete_linkage_groups(units, compatible):
+    """
+    Agrupa units de forma voraz: cada unidad entra al unico grupo con cuyos
+    miembros es compatible. Si es compatible con mas de un grupo es ambigua
+    ("Smith, J." con "Smith, John" y "Smith, James") y queda sola; asi una
+    forma abreviada nunca une a dos personas o revistas distintas.
+
+    Args:
+        units (list): Unidades ordenadas de la mas completa a la menos completa.
+        compatible (callable): compatible(a, b) -> bool.
+
+    Returns:
+        list: Grupos (listas de unidades).
+    """
+    groups = []
+    for unit in units:
+        matches = [group for group in groups if all(compatible(unit, member) for member in group)]
+        if len(matches) == 1:
+            matches[0].append(unit)
+        else:
+            groups.append([unit])
+    return groups
+
+
+class _UnionFind:
+    def __init__(self, items):
+        self.parent = {item: item for item in items}
+
+    def find(self, item):
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+
+
+def _author_block_groups(block):
+    """
+    Agrupa las variantes de un bloque de autores (mismo apellido e iniciales).
+
+    Returns:
+        list: Grupos de nombres que corresponden al mismo autor.
+    """
+    # Las variantes con los mismos nombres de pila normalizados ("Smith, J." y "J. Smith") son una unidad
+    units = defaultdict(list)
+    for name in block:
+        units[tuple(split_author(name)[1])].append(name)
+
+    # Primero los nombres mas completos, para que las iniciales se comparen contra ellos
+    ordered = sorted(units, key=lambda first: (-sum(len(part) > 1 for part in first), -sum(map(len, first))))
+    groups = []
+    for group in _complete_linkage_groups(ordered, _given_names_compatible):
+        variants = [name for first in group for name in units[first]]
+        if len(variants) > 1:
+            groups.append(variants)
+    return groups
+
+
+class NameIndex:
+    """
+    Indice de normalizacion de nombres. Agrupa las variantes de un mismo
+    autor ("Smith, J." y "Smith, John") o de una misma revista o editorial
+    ("IEEE" e "Institute of Electrical and Electronics Engineers") y las
+    cuenta juntas bajo la variante mas frecuente.
+
+    Los nombres se agrupan por una clave canonica (apellido e iniciales, o
+    cantidad de palabras e iniciales de la revista) y solo se comparan entre
+    si los nombres de un mismo bloque, asi que el costo no es cuadratico en
+    el tamaño del corpus. Ante una abreviatura ambigua no se une nada.
+    """
+
+    def __init__(self, kind, counts):
+        """
+        Args:
+            kind (str): "author" o "venue".
+            counts (dict): Nombre original -> cantidad de apariciones.
+        """
+        if kind not in ("author", "venue"):
+            raise ValueError(f"Tipo de indice desconocido: {kind}")
+        self.kind = kind
+        self.counts = Counter(counts)
+        self.canonical = self._build()
+
+    @classmethod
+    def from_names(cls, kind, names):
+        """Construye el indice desde una secuencia de nombres (con repeticiones)."""
+        return cls(kind, Counter(name for name in names if name))
+
+    def _build(self):
+        names = list(self.counts)
+        groups = _UnionFind(names)
+        if self.kind == "author":
+            self._link_authors(names, groups)
+        else:
+            self._link_venues(names, groups)
+
+        members = defaultdict(list)
+        for name in names:
+            members[groups.find(name)].append(name)
+
+        canonical = {}
+        # Posicion de la primera aparicion de cada grupo, para desempatar los rankings
+        self.first_seen = {}
+        position = {name: i for i, name in enumerate(names)}
+        for variants in members.values():
+            # La variante mas frecuente representa al grupo; en empate, la primera vista
+            display = max(variants, key=lambda name: self.counts[name])
+            self.first_seen[display] = min(position[name] for name in variants)
+            for name in variants:
+                canonical[name] = display
+        return canonical
+
+    def _link_authors(self, names, groups):
+        blocks = defaultdict(list)
+        for name in names:
+            blocks[author_key(name)].append(name)
+
+        # Con CACHE_DIR, los bloques ya resueltos en otro workspace (mismos nombres) se reutilizan
+        pending = {"\x1f".join(sorted(block)): block for block in blocks.values() if len(block) > 1}
+        shared = get_shared_cache(f"author_blocks:{NAME_INDEX_VERSION}")
+        resolved = shared.get_many(pending) if shared else {}
+        computed = {key: _author_block_groups(block) for key, block in pending.items() if key not in resolved}
+        if shared:
+            shared.put_many(computed)
+        resolved.update(computed)
+
+        for block_groups in resolved.values():
+            for variants in block_groups:
+                for name in variants[1:]:
+                    groups.union(variants[0], name)
+
+    def _link_venues(self, names, groups):
+        by_key = defaultdict(list)
+        for name in names:
+            by_key[venue_key(name)].append(name)
+
+        for variants in by_key.values():
+            for name in variants[1:]:
+                groups.union(variants[0], name)
+
+        keys = [key for key in by_key if key]
+        # Acronimos: "ieee" se une con la clave cuyo acronimo es "ieee", si es la unica con ese acronimo
+        expansions = defaultdict(list)
+        for key in keys:
+            acronym = _acronym(key)
+            if acronym and acronym in by_key:
+                expansions[acronym].append(key)
+        for acronym, expanded in expansions.items():
+            if len(expanded) == 1:
+                groups.union(by_key[acronym][0], by_key[expanded[0]][0])
+
+        # Abreviaturas solo entre claves con la misma cantidad de palabras y las mismas iniciales
+        blocks = defaultdict(list)
+        for key in keys:
+            blocks[(len(key.split()), _acronym(key) or key[0])].append(key)
+        for block in blocks.values():
+            if len(block) < 2:
+                continue
+            block.sort(key=len, reverse=True)
+            for group in _complete_linkage_groups(block, _venue_keys_compatible):
+                for key in group[1:]:
+                    groups.union(by_key[group[0]][0], by_key[key][0])
+
+    def resolve(self, name):
+        """Retorna el nombre canonico de una variante (o el mismo nombre si no esta indexado)."""
+        return self.canonical.get(name, name)
+
+    def top(self, n=15, counts=None):
+        """
+        Ranking de los nombres canonicos mas frecuentes.
+
+        Args:
+            n (int): Cantidad de nombres del ranking.
+            counts (dict, optional): Nombre -> cantidad a contar. Por defecto, los
+                conteos usados para construir el indice.
+
+        Returns:
+            dict: Nombre canonico -> cantidad, de mayor a menor; los empates
+                quedan en el orden de aparicion en el corpus.
+        """
+        totals = Counter()
+        for name, count in (self.counts if counts is None else counts).items():
+            totals[self.resolve(name)] += count
+        unseen = len(self.first_seen)
+        ranking = sorted(totals.items(), key=lambda item: (-item[1], self.first_seen.get(item[0], unseen)))
+        return dict(ranking[:n])
+
+
+# Indices ya construidos en este proceso: (tipo, nombres y cantidades) -> indice
+_index_cache = {}
+
+
+def get_name_index(kind, counts):
+    """
+    Retorna el indice de los nombres dados, construyendolo una sola vez por
+    proceso para el mismo conjunto de nombres y cantidades.
+    """
+    key = (kind, frozenset(Counter(counts).items()))
+    index = _index_cache.get(key)
+    if index is None:
+        index = _index_cache[key] = NameIndex(kind, counts)
+    return index
@@ -0,0 +1,48 @@
+import os
+
+# Ruta dentro de nltk_data de cada recurso usado por el proyecto
+NLTK_RESOURCES = {
+    'punkt': 'tokenizers/punkt',
+    'punkt_tab': 'tokenizers/punkt_tab/english',
+    'stopwords': 'corpora/stopwords',
+    'wordnet': 'corpora/wordnet',
+}
+
+# Recursos ya verificados en este proceso
+_checked = set()
+
+
+def ensure_nltk_resources(*names):
+    """
+    Verifica una sola vez por proceso que los recursos de NLTK esten
+    disponibles y descarga los que falten. Si NLTK_OFFLINE esta definida no se
+    intenta ninguna descarga; un recurso que no se pueda obtener solo genera un
+    aviso y el error real aparece al usarlo.
+
+    Args:
+        names (str): Nombres de los recursos, p. ej. 'stopwords'.
+    """
+    pending = [name for name in names if name not in _checked]
+    if not pending:
+        return
+
+    import nltk
+
+    offline = os.getenv("NLTK_OFFLINE", "").lower() in ("1", "true", "yes")
+    for name in pending:
+        _checked.add(name)
+        try:
+            nltk.data.find(NLTK_RESOURCES[name])
+            continue
+        except LookupError:
+            pass
+
+        if offline:
+            print(f"[NLTK] Recurso no disponible y modo offline activo: {name}")
+            continue
+
+        print(f"Descargando recurso NLTK: {name}")
+        try:
+            nltk.download(name, quiet=True, raise_on_error=True)
+        except Exception as e:
+            print(f"[NLTK] No se pudo descargar {name}: {e}")
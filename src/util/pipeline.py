@@ -0,0 +1,205 @@
+import hashlib
+import inspect
+import json
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import nullcontext
+
+from src.util.atomic import atomic_write
+from src.util.instrumentation import measure
+from src.util.profiling import profile_stage
+
+
+def path_fingerprint(path):
+    """
+    Calcula la huella de un archivo o directorio a partir de la ruta, el
+    tamaño y la fecha de modificacion de cada archivo. Retorna None si la
+    ruta no existe.
+    """
+    if not os.path.exists(path):
+        return None
+
+    digest = hashlib.sha1()
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for file in sorted(files):
+                file_path = os.path.join(root, file)
+                stat = os.stat(file_path)
+                digest.update(f"{os.path.relpath(file_path, path)}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    else:
+        stat = os.stat(path)
+        digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _run_stage(name, func, args, kwargs, profile_dir=None):
+    """Ejecuta la funcion de una etapa y retorna el traceback si falla."""
+    try:
+        with measure(f"stage:{name}"), profile_stage(name, profile_dir) if profile_dir else nullcontext():
+            func(*args, **kwargs)
+        return None
+    except Exception:
+        return traceback.format_exc()
+
+
+class Stage:
+    """
+    Etapa del pipeline.
+
+    Args:
+        name (str): Nombre unico de la etapa.
+        func (callable): Funcion a nivel de modulo que ejecuta la etapa.
+        inputs (list): Archivos o directorios que lee la etapa.
+        outputs (list): Archivos o directorios que genera la etapa.
+        depends_on (list): Nombres de las etapas que deben terminar antes.
+        args, kwargs: Argumentos para func.
+        in_process (bool): Ejecuta la etapa en el proceso principal (p. ej. el
+            navegador de los scrapers) en lugar de un proceso del pool.
+        sources (list, optional): Archivos de codigo de la etapa. Por defecto,
+            el archivo donde esta definida func.
+    """
+
+    def __init__(self, name, func, inputs=(), outputs=(), depends_on=(), args=(), kwargs=None, in_process=False, sources=None):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.depends_on = list(depends_on)
+        self.args = tuple(args)
+        self.kwargs = kwargs or {}
+        self.in_process = in_process
+        self.sources = list(sources) if sources is not None else [inspect.getsourcefile(func)]
+
+    def input_fingerprints(self):
+        # El codigo de la etapa cuenta como entrada: si cambia la etapa se repite
+        paths = self.inputs + self.sources
+        return {path: path_fingerprint(path) for path in paths}
+
+    def output_fingerprints(self):
+        return {path: path_fingerprint(path) for path in self.outputs}
+
+
+class Pipeline:
+    """
+    Ejecuta un grafo de etapas con dependencias. Cada etapa se omite si sus
+    salidas existen y ni sus entradas ni sus salidas cambiaron desde la
+    ultima ejecucion exitosa. Las etapas independientes corren en paralelo
+    en procesos separados.
+    """
+
+    def __init__(self, state_path, max_workers=None, profile_dir=None):
+        self.state_path = state_path
+        self.max_workers = max_workers
+        self.profile_dir = profile_dir
+        self.stages = {}
+        self.state = self._load_state()
+        self._pending_inputs = {}
+
+    def add_stage(self, stage):
+        if stage.name in self.stages:
+            raise ValueError(f"La etapa '{stage.name}' ya existe en el pipeline.")
+        self.stages[stage.name] = stage
+        return stage
+
+    def _load_state(self):
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+
+    def _save_state(self):
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # El estado es el manifiesto de la ejecucion: se reemplaza completo para no corromperlo
+        with atomic_write(self.state_path) as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+
+    def is_fresh(self, stage):
+        """Indica si las salidas de la etapa estan al dia con sus entradas."""
+        recorded = self.state.get(stage.name)
+        if not recorded:
+            return False
+        outputs = stage.output_fingerprints()
+        if any(fingerprint is None for fingerprint in outputs.values()):
+            return False
+        return recorded.get("inputs") == stage.input_fingerprints() and recorded.get("outputs") == outputs
+
+    def _validate(self):
+        for stage in self.stages.values():
+            for dependency in stage.depends_on:
+                if dependency not in self.stages:
+                    raise ValueError(f"La etapa '{stage.name}' depende de '{dependency}', que no existe.")
+
+    def _record(self, stage, inputs):
+        self.state[stage.name] = {"inputs": inputs, "outputs": stage.output_fingerprints(), "finished_at": time.time()}
+        self._save_state()
+
+    def run(self, force=(), only=None):
+        """
+        Ejecuta el pipeline. Cada etapa terminada queda registrada en el
+        estado en cuanto termina, asi que si la ejecucion se interrumpe la
+        siguiente retoma desde las etapas pendientes.
+
+        Args:
+            force (list): Nombres de etapas que se ejecutan aunque esten al dia.
+            only (list, optional): Ejecuta solo estas etapas; las demas se
+                consideran terminadas (p. ej. para no repetir la cosecha).
+
+        Returns:
+            dict: Estado final de cada etapa ("ok", "skipped", "failed", "blocked" o "excluded").
+        """
+        self._validate()
+        force = set(force)
+        status = {name: "excluded" for name in self.stages if only is not None and name not in only}
+        running = {}
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            while len(status) < len(self.stages):
+                ready = [
+                    stage for stage in self.stages.values()
+                    if stage.name not in status
+                    and stage.name not in running.values()
+                    and all(dependency in status for dependency in stage.depends_on)
+                ]
+
+                for stage in ready:
+                    if any(status[dependency] in ("failed", "blocked") for dependency in stage.depends_on):
+                        status[stage.name] = "blocked"
+                        print(f"[PIPELINE] {stage.name}: bloqueada por una dependencia fallida")
+                    elif stage.name not in force and self.is_fresh(stage):
+                        status[stage.name] = "skipped"
+                        print(f"[PIPELINE] {stage.name}: al dia, se omite")
+                    elif stage.in_process:
+                        print(f"[PIPELINE] {stage.name}: ejecutando")
+                        inputs = stage.input_fingerprints()
+                        status[stage.name] = self._finish(stage, inputs, _run_stage(stage.name, stage.func, stage.args, stage.kwargs, self.profile_dir))
+                    else:
+                        print(f"[PIPELINE] {stage.name}: ejecutando")
+                        future = executor.submit(_run_stage, stage.name, stage.func, stage.args, stage.kwargs, self.profile_dir)
+                        running[future] = stage.name
+                        self._pending_inputs[stage.name] = stage.input_fingerprints()
+
+                if ready:
+                    # Una etapa omitida o terminada puede habilitar otras
+                    continue
+                if not running:
+                    raise ValueError("El pipeline tiene dependencias circulares.")
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = self.stages[running.pop(future)]
+                    status[stage.name] = self._finish(stage, self._pending_inputs.pop(stage.name), future.result())
+
+        return status
+
+    def _finish(self, stage, inputs, error):
+        if error:
+            print(f"[PIPELINE] {stage.name}: fallo\n{error}")
+            return "failed"
+        self._record(stage, inputs)
+        print(f"[PIPELINE] {stage.name}: completada")
+        return "ok"
@@ -0,0 +1,80 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """
+    Retorna el pico de memoria residente del proceso en MB (el maximo de toda
+    su vida, no de una operacion), o None si no se puede medir.
+    """
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss esta en bytes en macOS y en KB en Linux
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    except Exception:
+        return None
+
+
+@contextmanager
+def profile_stage(name, profile_dir=None, top=20):
+    """
+    Mide el tiempo de pared, el tiempo de CPU y el aumento del pico de
+    memoria del proceso durante una etapa. Si se indica profile_dir, ademas ejecuta la etapa bajo cProfile,
+    guarda <profile_dir>/<name>.prof, imprime las funciones mas costosas y
+    agrega las metricas a <profile_dir>/timings.jsonl.
+
+    Args:
+        name (str): Nombre de la etapa.
+        profile_dir (str, optional): Directorio para los resultados del perfil.
+        top (int): Numero de funciones a mostrar del perfil.
+    """
+    profiler = None
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+        profiler = cProfile.Profile()
+
+    peak_before = peak_rss_mb()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+        peak = peak_rss_mb()
+        # La etapa solo es responsable de lo que subio el pico del proceso mientras corria
+        growth = peak - peak_before if peak is not None and peak_before is not None else None
+        timings = {
+            "stage": name,
+            "wall_seconds": round(time.perf_counter() - wall_start, 4),
+            "cpu_seconds": round(time.process_time() - cpu_start, 4),
+            "rss_growth_mb": round(growth, 1) if growth is not None else None,
+            "process_peak_rss_mb": round(peak, 1) if peak is not None else None,
+            "pid": os.getpid(),
+        }
+        print(f"[PROFILE] {name}: wall={timings['wall_seconds']}s cpu={timings['cpu_seconds']}s "
+              f"rss_growth={timings['rss_growth_mb']}MB process_peak_rss={timings['process_peak_rss_mb']}MB")
+
+        if profiler:
+            profiler.dump_stats(os.path.join(profile_dir, f"{name}.prof"))
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(top)
+            print(stream.getvalue())
+            with open(os.path.join(profile_dir, "timings.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps(timings) + "\n")
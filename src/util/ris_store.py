@@ -0,0 +1,283 @@
+import json
+import os
+import sqlite3
+from collections import defaultdict
+
+import rispy
+
+from src.util.ris_utils import read_ris_file
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    -- '' y no NULL cuando falta el dato: en SQLite dos NULL nunca chocan en UNIQUE
+    journal TEXT NOT NULL DEFAULT '',
+    publisher TEXT NOT NULL DEFAULT '',
+    UNIQUE (journal, publisher)
+);
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    doi TEXT,
+    title TEXT,
+    year TEXT,
+    type_of_reference TEXT,
+    abstract TEXT,
+    source_id INTEGER REFERENCES sources(id),
+    raw TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS authors (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS article_authors (
+    article_id INTEGER NOT NULL REFERENCES articles(id),
+    author_id INTEGER NOT NULL REFERENCES authors(id),
+    position INTEGER NOT NULL,
+    PRIMARY KEY (article_id, position)
+);
+CREATE TABLE IF NOT EXISTS keywords (
+    id INTEGER PRIMARY KEY,
+    keyword TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS article_keywords (
+    article_id INTEGER NOT NULL REFERENCES articles(id),
+    keyword_id INTEGER NOT NULL REFERENCES keywords(id),
+    PRIMARY KEY (article_id, keyword_id)
+);
+CREATE INDEX IF NOT EXISTS idx_articles_doi ON articles(doi);
+CREATE INDEX IF NOT EXISTS idx_articles_year ON articles(year);
+CREATE INDEX IF NOT EXISTS idx_articles_type ON articles(type_of_reference);
+CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source_id);
+CREATE INDEX IF NOT EXISTS idx_sources_journal ON sources(journal);
+CREATE INDEX IF NOT EXISTS idx_sources_publisher ON sources(publisher);
+CREATE INDEX IF NOT EXISTS idx_article_authors_first ON article_authors(position, author_id);
+"""
+
+
+def _as_list(value):
+    if not value:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+class RisStore:
+    """
+    Almacen SQLite de los articulos bibliograficos. Es una alternativa a
+    recorrer unique.ris completo para cada estadistica: los articulos, autores,
+    palabras clave y fuentes quedan en tablas normalizadas e indexadas. El
+    registro RIS original se conserva para poder exportarlo de nuevo.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(db_path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _get_meta(self, key):
+        row = self.connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _get_or_create(self, table, column, value, cache):
+        if value in cache:
+            return cache[value]
+        self.connection.execute(f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)", (value,))
+        row_id = self.connection.execute(f"SELECT id FROM {table} WHERE {column} = ?", (value,)).fetchone()[0]
+        cache[value] = row_id
+        return row_id
+
+    def _get_source(self, journal, publisher, cache):
+        # Un dato faltante se guarda como '' para que la restriccion UNIQUE deduplique la fuente
+        key = (journal or '', publisher or '')
+        if key in cache:
+            return cache[key]
+        self.connection.execute("INSERT OR IGNORE INTO sources (journal, publisher) VALUES (?, ?)", key)
+        row = self.connection.execute(
+            "SELECT id FROM sources WHERE journal = ? AND publisher = ?", key
+        ).fetchone()
+        cache[key] = row[0]
+        return row[0]
+
+    def import_entries(self, entries, replace=True):
+        """
+        Importa una lista de entradas RIS (diccionarios de rispy).
+
+        Args:
+            entries (list): Entradas a importar.
+            replace (bool): Si es True, borra el contenido previo del almacen.
+        """
+        authors_cache, keywords_cache, sources_cache = {}, {}, {}
+        with self.connection:
+            if replace:
+                for table in ("article_authors", "article_keywords", "articles", "authors", "keywords", "sources"):
+                    self.connection.execute(f"DELETE FROM {table}")
+
+            for entry in entries:
+                journal = entry.get("journal_name")
+                publisher = entry.get("publisher")
+                source_id = self._get_source(journal, publisher, sources_cache) if journal or publisher else None
+
+                cursor = self.connection.execute(
+                    "INSERT INTO articles (doi, title, year, type_of_reference, abstract, source_id, raw) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        entry.get("doi"),
+                        entry.get("primary_title") or entry.get("title"),
+                        entry.get("year") or entry.get("publication_year"),
+                        entry.get("type_of_reference"),
+                        entry.get("abstract"),
+                        source_id,
+                        json.dumps(entry, ensure_ascii=False),
+                    ),
+                )
+                article_id = cursor.lastrowid
+
+                for position, author in enumerate(_as_list(entry.get("authors"))):
+                    author_id = self._get_or_create("authors", "name", author, authors_cache)
+                    self.connection.execute(
+                        "INSERT INTO article_authors (article_id, author_id, position) VALUES (?, ?, ?)",
+                        (article_id, author_id, position),
+                    )
+
+                for keyword in _as_list(entry.get("keywords")):
+                    keyword_id = self._get_or_create("keywords", "keyword", keyword, keywords_cache)
+                    self.connection.execute(
+                        "INSERT OR IGNORE INTO article_keywords (article_id, keyword_id) VALUES (?, ?)",
+                        (article_id, keyword_id),
+                    )
+
+    def import_ris(self, ris_path, replace=True):
+        """Importa un archivo RIS y registra su huella para sync_from_ris."""
+        self.import_entries(read_ris_file(ris_path), replace=replace)
+        with self.connection:
+            self._set_meta("source_fingerprint", self._fingerprint(ris_path))
+
+    def sync_from_ris(self, ris_path):
+        """
+        Reimporta el archivo RIS solo si cambio desde la ultima importacion.
+
+        Returns:
+            bool: True si se reimporto el archivo.
+        """
+        if self._get_meta("source_fingerprint") == self._fingerprint(ris_path):
+            return False
+        self.import_ris(ris_path)
+        return True
+
+    @staticmethod
+    def _fingerprint(path):
+        stat = os.stat(path)
+        return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def iter_entries(self):
+        """Itera las entradas RIS originales en el orden de importacion."""
+        for (raw,) in self.connection.execute("SELECT raw FROM articles ORDER BY id"):
+            yield json.loads(raw)
+
+    def export_ris(self, ris_path):
+        """Exporta el almacen completo a un archivo RIS."""
+        with open(ris_path, 'w', encoding="utf-8") as ris_file:
+            rispy.dump(list(self.iter_entries()), ris_file)
+
+    def top_first_authors(self, limit=15):
+        rows = self.connection.execute(
+            """
+            SELECT au.name, COUNT(*) AS total
+            FROM article_authors aa
+            JOIN authors au ON au.id = aa.author_id
+            WHERE aa.position = 0
+            GROUP BY aa.author_id
+            ORDER BY total DESC, MIN(aa.article_id)
+            LIMIT ?
+            """,
+            (limit,),
+        )
+        return dict(rows.fetchall())
+
+    def author_name_counts(self):
+        """Cantidad de articulos por nombre de autor, en cualquier posicion."""
+        rows = self.connection.execute(
+            """
+            SELECT au.name, COUNT(*)
+            FROM article_authors aa
+            JOIN authors au ON au.id = aa.author_id
+            GROUP BY aa.author_id
+            ORDER BY MIN(aa.article_id)
+            """
+        )
+        return dict(rows.fetchall())
+
+    def publication_years_per_product_type(self):
+        rows = self.connection.execute(
+            """
+            SELECT year, type_of_reference, COUNT(*)
+            FROM articles
+            WHERE year IS NOT NULL AND year != '' AND type_of_reference IS NOT NULL
+            GROUP BY year, type_of_reference
+            ORDER BY MIN(id)
+            """
+        )
+        year_pub = defaultdict(lambda: defaultdict(int))
+        for year, pub_type, total in rows:
+            year_pub[year][pub_type] = total
+        return year_pub
+
+    def count_products_by_type(self):
+        rows = self.connection.execute(
+            """
+            SELECT type_of_reference, COUNT(*)
+            FROM articles
+            WHERE type_of_reference IS NOT NULL
+            GROUP BY type_of_reference
+            ORDER BY MIN(id)
+            """
+        )
+        return defaultdict(int, rows.fetchall())
+
+    def top_journals(self, limit=15, type_of_reference="JOUR"):
+        rows = self.connection.execute(
+            """
+            SELECT s.journal, COUNT(*) AS total
+            FROM articles a
+            JOIN sources s ON s.id = a.source_id
+            WHERE a.type_of_reference = ? AND s.journal IS NOT NULL AND s.journal != ''
+            GROUP BY s.journal
+            ORDER BY total DESC, MIN(a.id)
+            LIMIT ?
+            """,
+            (type_of_reference, limit),
+        )
+        return dict(rows.fetchall())
+
+    def top_publishers(self, limit=15):
+        rows = self.connection.execute(
+            """
+            SELECT s.publisher, COUNT(*) AS total
+            FROM articles a
+            JOIN sources s ON s.id = a.source_id
+            WHERE s.publisher IS NOT NULL AND s.publisher != ''
+            GROUP BY s.publisher
+            ORDER BY total DESC, MIN(a.id)
+            LIMIT ?
+            """,
+            (limit,),
+        )
+        return dict(rows.fetchall())
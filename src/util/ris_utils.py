@@ -1,6 +1,18 @@
+import hashlib
 import os
+import re
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
 import rispy
 
+from src.model.ris_record import RisRecord
+from src.util.instrumentation import instrumented, measure
+
+# Linea con etiqueta RIS con espacios irregulares, p. ej. "TY - JOUR" o " AU   -  Smith".
+# Exige espacio antes y despues del guion: "IT-based tools..." es continuacion del campo anterior
+TAG_LINE_PATTERN = re.compile(r'^\s*([A-Z][A-Z0-9])\s+-(?:\s+|$)(.*)$')
+
 
 def __ris_to_dict(filepath):
     dict = {}
@@ -15,60 +27,225 @@ def __ris_to_dict(filepath):
     return dict
 
 
+def _decode_line(raw):
+    """Decodifica una linea en UTF-8 y, si falla, en Windows-1252."""
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw.decode("cp1252", errors="replace")
+
+
+def normalize_ris_line(line):
+    """
+    Normaliza una linea RIS: espacios no separables y espacios alrededor de
+    la etiqueta ("TY - JOUR" -> "TY  - JOUR").
+    """
+    line = line.replace('\xa0', ' ')
+    match = TAG_LINE_PATTERN.match(line)
+    if match:
+        tag, content = match.groups()
+        return f"{tag}  - {content}"
+    return line
+
+
+def iter_normalized_lines(filepath):
+    """
+    Lee un archivo RIS linea por linea normalizandolo al vuelo: codificacion,
+    BOM, saltos de linea (CRLF y CR), espacios no separables y espacios de
+    las etiquetas. No carga el archivo completo ni lo reescribe.
+    """
+    with open(filepath, "rb") as bibliography_file:
+        for number, raw in enumerate(bibliography_file):
+            line = _decode_line(raw)
+            if number == 0:
+                line = line.lstrip('\ufeff')
+            for part in line.rstrip('\r\n').split('\r'):
+                yield normalize_ris_line(part)
+
+
+@instrumented("read_ris_file")
 def read_ris_file(filepath):
-    with open(filepath, "r", encoding="utf-8") as bibliography_file:
-        entries = rispy.load(bibliography_file)
-        return entries
+    return rispy.RisParser().parse_lines(iter_normalized_lines(filepath))
+
+
+def iter_ris_entries(filepath):
+    """
+    Recorre las entradas de un archivo RIS una a una sin cargar el archivo
+    completo: las lineas se agrupan hasta cada "ER  -" y solo ese registro se
+    entrega al parser de rispy. La memoria usada no depende del tamaño del archivo.
+    """
+    parser = rispy.RisParser()
+    record = []
+    for line in iter_normalized_lines(filepath):
+        record.append(line)
+        if line.startswith('ER  -'):
+            yield from parser.parse_lines(record)
+            record = []
+    if any(line.strip() for line in record):
+        yield from parser.parse_lines(record)
+
+
+def entry_abstract(entry):
+    """Abstract de una entrada; segun el formato RIS esta en 'abstract' o en 'AB'."""
+    abstract = entry.get('abstract')
+    if abstract is None:
+        abstract = entry.get('AB')
+    return abstract or ''
+
+
+def document_key(entry, abstract=None):
+    """
+    Clave estable de un documento: el DOI normalizado o, si no tiene, un hash
+    del titulo y el abstract.
+    """
+    doi = (entry.get('doi') or '').strip().lower()
+    if doi:
+        return f"doi:{doi}"
+    if abstract is None:
+        abstract = entry_abstract(entry)
+    title = entry.get('primary_title') or entry.get('title') or ''
+    digest = hashlib.sha1(f"{title}\n{abstract}".encode('utf-8')).hexdigest()
+    return f"sha1:{digest}"
+
+
+def iter_abstract_documents(entries):
+    """
+    Recorre las entradas con abstract junto con su clave de documento. Las
+    claves repetidas reciben un sufijo "#n" para que cada aparicion cuente.
+
+    Yields:
+        tuple: (clave, abstract, entrada).
+    """
+    seen = Counter()
+    for entry in entries:
+        abstract = entry_abstract(entry)
+        if not abstract:
+            continue
+        key = document_key(entry, abstract)
+        seen[key] += 1
+        if seen[key] > 1:
+            key = f"{key}#{seen[key]}"
+        yield key, abstract, entry
+
+
+def abstract_documents(entries):
+    """Retorna los abstracts de las entradas como tuplas (clave, abstract)."""
+    return [(key, abstract) for key, abstract, _ in iter_abstract_documents(entries)]
+
+
+# Corpus ya cargados en este proceso: ruta -> ((tamaño, mtime), entradas)
+_corpus_cache = {}
+
+
+def load_corpus(filepath):
+    """
+    Lee un archivo RIS y lo conserva en memoria mientras no cambie, para que
+    las estadisticas y los analisis de un mismo proceso compartan una sola
+    lectura del corpus. Las entradas se retornan como RisRecord (compactos y
+    de solo lectura), que se usan igual que los diccionarios de rispy.
+    """
+    stat = os.stat(filepath)
+    key = os.path.abspath(filepath)
+    signature = (stat.st_size, stat.st_mtime_ns)
+
+    cached = _corpus_cache.get(key)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    entries = [RisRecord(entry) for entry in read_ris_file(filepath)]
+    _corpus_cache[key] = (signature, entries)
+    return entries
 
 
 def clean_ris_file(path):
-    with open(path, "r", encoding="utf-8") as f:
-        content = f.read()
-
-    # Reemplazar espacios no separables por espacios normales
-    content = content.replace('\xa0', ' ')
-
-    # Guardar el archivo limpio
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(content)
-
-
-def merge_ris_file(path_folder):
+    """Reescribe el archivo RIS con las lineas normalizadas."""
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        for line in iter_normalized_lines(path):
+            f.write(line + "\n")
+
+    os.replace(temp_path, path)
+
+
+def iter_parsed_files(filepaths, max_workers=None, max_pending=None):
+    """
+    Parsea archivos RIS en procesos paralelos y los entrega en el mismo orden
+    de filepaths. La cola de trabajos pendientes esta acotada a max_pending
+    para no acumular en memoria mas archivos de los que el consumidor procesa.
+
+    Args:
+        filepaths (list): Rutas de los archivos RIS.
+        max_workers (int, optional): Numero de procesos. Por defecto, los nucleos disponibles.
+        max_pending (int, optional): Maximo de archivos en vuelo. Por defecto, 2 por proceso.
+
+    Yields:
+        tuple: (ruta, lista de articulos) de cada archivo.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(filepaths) <= 1:
+        for filepath in filepaths:
+            yield filepath, read_ris_file(filepath)
+        return
+
+    max_pending = max_pending or max_workers * 2
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        remaining = iter(filepaths)
+
+        for filepath in remaining:
+            pending.append((filepath, executor.submit(read_ris_file, filepath)))
+            if len(pending) >= max_pending:
+                break
+
+        while pending:
+            filepath, future = pending.popleft()
+            articles = future.result()
+            # Se encola el siguiente archivo antes de entregar el resultado
+            next_filepath = next(remaining, None)
+            if next_filepath is not None:
+                pending.append((next_filepath, executor.submit(read_ris_file, next_filepath)))
+            yield filepath, articles
+
+
+def merge_ris_file(path_folder, max_workers=None):
     unique_file_path = os.getenv("UNIQUE_FILE_PATH")
     duplicate_file_path = os.getenv("DUPLICATE_FILE_PATH")
 
     uniques = __ris_to_dict(unique_file_path)
     duplicates = __ris_to_dict(duplicate_file_path)
 
-    files = [file for file in os.listdir(path_folder) if file.endswith(".ris")]
-    for file in files:
-        articles = read_ris_file(os.path.join(path_folder, file))
-
-        for article in articles:
-            identifier = article.get("doi", None) or article.get("UR", None)
-
-            if identifier:
-                if identifier in uniques:
-                    if identifier not in duplicates:
-                        duplicates[identifier] = article
+    files = [os.path.join(path_folder, file) for file in os.listdir(path_folder) if file.endswith(".ris")]
+
+    with measure("merge_ris_file") as m:
+        m.items = 0
+        # Los procesos solo parsean; la deduplicacion y la escritura ocurren aqui
+        for filepath, articles in iter_parsed_files(files, max_workers=max_workers):
+            m.items += len(articles)
+            for article in articles:
+                identifier = article.get("doi", None) or article.get("UR", None)
+
+                if identifier:
+                    if identifier in uniques:
+                        if identifier not in duplicates:
+                            duplicates[identifier] = article
+                    else:
+                        uniques[identifier] = article
                 else:
-                    uniques[identifier] = article
-            else:
-                uniques[f"no_identifier_{len(uniques)}"] = article
-
-        if uniques:
-            with open(unique_file_path, 'w', encoding="utf-8") as unique_file:
-                rispy.dump(list(uniques.values()), unique_file)
-            print("Se agregaron los elementos unicos")
-        else:
-            print("No se encontraron elementos repetidos")
-
-        if duplicates:
-            with open(duplicate_file_path, 'w', encoding="utf-8") as duplicate_file:
-                rispy.dump(list(duplicates.values()), duplicate_file)
-            print("Se agregaron los elementos reptidos")
-        else:
-            print("No se encontraron elementos repetidos")
-
-        # Se elimina el archivo despues de unificarlo
-        # os.remove(os.path.join(path_folder, file))
+                    uniques[f"no_identifier_{len(uniques)}"] = article
+
+            # Se elimina el archivo despues de unificarlo
+            # os.remove(filepath)
+
+    if uniques:
+        with open(unique_file_path, 'w', encoding="utf-8") as unique_file:
+            rispy.dump(list(uniques.values()), unique_file)
+        print("Se agregaron los elementos unicos")
+    else:
+        print("No se encontraron elementos repetidos")
+
+    if duplicates:
+        with open(duplicate_file_path, 'w', encoding="utf-8") as duplicate_file:
+            rispy.dump(list(duplicates.values()), duplicate_file)
+        print("Se agregaron los elementos reptidos")
+    else:
+        print("No se encontraron elementos repetidos")
@@ -4,6 +4,14 @@ import undetected_chromedriver as uc
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 
+from src.util.utils import extra_browser_arguments
+
+
+def apply_extra_arguments(options):
+    """Agrega los argumentos opcionales del navegador definidos en el entorno"""
+    for argument in extra_browser_arguments():
+        options.add_argument(argument)
+
 
 def get_driver(download_path):
     """Retorna el driver del navegador brave"""
@@ -20,6 +28,7 @@ def get_driver(download_path):
         "download.directory_upgrade": True,
         "safebrowsing.enabled": True,
     })
+    apply_extra_arguments(options)
     driver = webdriver.Chrome(options=options)
     return driver
 
@@ -34,6 +43,7 @@ def get_driver_undected(download_path):
     options.add_argument('--no-sandbox')  # Opcional, para entornos limitados
 
     options.binary_location = BRAVE_PATH
+    apply_extra_arguments(options)
 
     driver = uc.Chrome(options=options)
     driver.maximize_window()
@@ -0,0 +1,79 @@
+import json
+import os
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+"""
+
+# SQLite limita la cantidad de parametros por consulta
+BATCH_SIZE = 500
+
+
+def cache_dir():
+    """Directorio de la cache compartida (CACHE_DIR), o None si no esta configurada."""
+    return os.getenv("CACHE_DIR") or None
+
+
+class SharedCache:
+    """
+    Cache clave -> valor JSON compartida entre workspaces y procesos, en una
+    base SQLite dentro de CACHE_DIR. Cada uso tiene su propio espacio de
+    nombres; las claves son hashes de contenido (p. ej. del abstract), asi que
+    un documento presente en dos corpus se procesa una sola vez.
+    """
+
+    def __init__(self, namespace, directory):
+        self.namespace = namespace
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "shared_cache.sqlite")
+
+    def _connect(self):
+        # Una conexion por operacion: la cache se usa desde varios procesos del pipeline
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+        return connection
+
+    def get_many(self, keys):
+        """Retorna los valores guardados de keys como diccionario clave -> valor."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        if not keys:
+            return found
+        connection = self._connect()
+        try:
+            for start in range(0, len(keys), BATCH_SIZE):
+                batch = keys[start:start + BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = connection.execute(
+                    f"SELECT key, value FROM cache WHERE namespace = ? AND key IN ({placeholders})",
+                    [self.namespace, *batch],
+                )
+                found.update((key, json.loads(value)) for key, value in rows)
+        finally:
+            connection.close()
+        return found
+
+    def put_many(self, items):
+        """Guarda los pares (clave, valor) de items."""
+        rows = [(self.namespace, key, json.dumps(value, ensure_ascii=False)) for key, value in dict(items).items()]
+        if not rows:
+            return
+        connection = self._connect()
+        try:
+            with connection:
+                connection.executemany("INSERT OR REPLACE INTO cache (namespace, key, value) VALUES (?, ?, ?)", rows)
+        finally:
+            connection.close()
+
+
+def get_shared_cache(namespace):
+    """Retorna la cache compartida de namespace, o None si CACHE_DIR no esta definida."""
+    directory = cache_dir()
+    return SharedCache(namespace, directory) if directory else None
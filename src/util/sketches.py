@@ -0,0 +1,133 @@
+import hashlib
+import heapq
+import math
+from itertools import count as sequence
+
+import numpy as np
+
+
+class CountMinSketch:
+    """
+    Count-Min Sketch: estima la frecuencia de cualquier elemento con memoria
+    fija (depth x width contadores). La estimacion nunca es menor que la
+    frecuencia real y, con probabilidad 1 - delta, la supera en a lo sumo
+    epsilon * total.
+    """
+
+    def __init__(self, width, depth):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+        self._rows = np.arange(depth)
+        self._multipliers = self._rows.astype(np.uint64)
+
+    @classmethod
+    def from_error(cls, epsilon=1e-4, delta=0.01):
+        """Dimensiona el sketch para un error epsilon * total con probabilidad 1 - delta."""
+        return cls(math.ceil(math.e / epsilon), math.ceil(math.log(1 / delta)))
+
+    def _columns(self, item):
+        # Las depth funciones hash se derivan de dos (Kirsch-Mitzenmacher): h1 + i * h2
+        h1, h2 = np.frombuffer(hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest(), dtype=np.uint64)
+        return (h1 + self._multipliers * (h2 | np.uint64(1))) % np.uint64(self.width)
+
+    def add(self, item, count=1):
+        self.table[self._rows, self._columns(item)] += count
+        self.total += count
+
+    def estimate(self, item):
+        return int(self.table[self._rows, self._columns(item)].min())
+
+    @property
+    def error_bound(self):
+        """Sobreestimacion maxima esperada (con probabilidad 1 - delta)."""
+        return math.e / self.width * self.total
+
+
+class SpaceSaving:
+    """
+    Algoritmo Space-Saving para los elementos mas frecuentes de un flujo con a
+    lo sumo capacity contadores. Cuando no hay lugar, el elemento nuevo
+    reemplaza al de menor conteo y hereda ese conteo como error. Todo elemento
+    con frecuencia mayor que total / capacity esta garantizado en el resumen,
+    y cada conteo sobreestima la frecuencia real en a lo sumo su error.
+
+    Con sketch (un CountMinSketch) los conteos reportados se acotan ademas
+    con la estimacion del sketch, que tambien es una cota superior.
+    """
+
+    def __init__(self, capacity=1000, sketch=None):
+        self.capacity = capacity
+        self.sketch = sketch
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+        # Monticulo de (conteo, orden, elemento) con entradas obsoletas que se descartan al sacar
+        self._heap = []
+        self._order = sequence()
+
+    def add(self, item, count=1):
+        self.total += count
+        if self.sketch is not None:
+            self.sketch.add(item, count)
+
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+        else:
+            minimum, evicted = self._pop_min()
+            del self.counts[evicted]
+            del self.errors[evicted]
+            self.counts[item] = minimum + count
+            self.errors[item] = minimum
+        heapq.heappush(self._heap, (self.counts[item], next(self._order), item))
+
+        # Se reconstruye el monticulo cuando acumula demasiadas entradas obsoletas
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(value, next(self._order), key) for key, value in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def update(self, items):
+        for item in items:
+            self.add(item)
+
+    def _pop_min(self):
+        while True:
+            value, _, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == value:
+                return value, item
+
+    @property
+    def error_bound(self):
+        """Sobreestimacion maxima de cualquier conteo del resumen."""
+        return self.total / self.capacity if len(self.counts) >= self.capacity else 0
+
+    def estimate(self, item):
+        """Cota superior de la frecuencia de item (0 si no esta en el resumen ni en el sketch)."""
+        estimate = self.counts.get(item)
+        if self.sketch is not None:
+            sketch_estimate = self.sketch.estimate(item)
+            estimate = sketch_estimate if estimate is None else min(estimate, sketch_estimate)
+        return estimate or 0
+
+    def top(self, n=15):
+        """
+        Elementos mas frecuentes del resumen.
+
+        Returns:
+            list: Tuplas (elemento, conteo estimado, error maximo) de mayor a menor conteo.
+        """
+        ranking = []
+        for item, value in self.counts.items():
+            estimate = self.estimate(item)
+            # El conteo real es al menos value - error, y a lo sumo la estimacion
+            ranking.append((item, estimate, estimate - (value - self.errors[item])))
+        ranking.sort(key=lambda entry: -entry[1])
+        return ranking[:n]
+
+    def to_counter(self):
+        """Conteos estimados de todos los elementos del resumen."""
+        return {item: self.estimate(item) for item in self.counts}
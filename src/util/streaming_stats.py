@@ -0,0 +1,121 @@
+from collections import Counter
+
+from src.util.crosstab import YearTypeMatrix
+from src.util.instrumentation import instrumented
+from src.util.name_index import get_name_index
+from src.util.ris_utils import entry_abstract, iter_ris_entries
+from src.util.sketches import CountMinSketch, SpaceSaving
+
+# Contadores por ranking; con mas capacidad el error maximo (total / capacidad) es menor
+DEFAULT_CAPACITY = 1000
+
+
+class StreamingStatistics:
+    """
+    Estadisticas del corpus en una sola pasada y con memoria acotada, para
+    cosechas demasiado grandes para cargarlas completas. Autores, revistas,
+    editoriales y terminos se cuentan con Space-Saving (acotado con un
+    Count-Min Sketch); los tipos de producto y los pares año x tipo tienen
+    pocos valores distintos y se cuentan de forma exacta.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, epsilon=1e-4, delta=0.01, term_dictionary=None):
+        """
+        Args:
+            capacity (int): Contadores de cada ranking.
+            epsilon (float): Error relativo del Count-Min Sketch.
+            delta (float): Probabilidad de superar ese error.
+            term_dictionary (TermDictionary, optional): Diccionario para contar
+                los terminos de los abstracts. Sin el no se cuentan terminos.
+        """
+        def summary():
+            return SpaceSaving(capacity, CountMinSketch.from_error(epsilon, delta))
+
+        self.first_authors = summary()
+        self.authors = summary()
+        self.journals = summary()
+        self.publishers = summary()
+        self.terms = summary()
+        self.term_dictionary = term_dictionary
+        self.types = Counter()
+        self._year_type_counts = Counter()
+        self.records = 0
+
+    @classmethod
+    @instrumented(count=lambda result, cls, filepath, **kwargs: result.records)
+    def from_ris(cls, filepath, **kwargs):
+        """Recorre el archivo RIS una sola vez, entrada por entrada."""
+        statistics = cls(**kwargs)
+        for entry in iter_ris_entries(filepath):
+            statistics.add(entry)
+        return statistics
+
+    def add(self, entry):
+        """Agrega una entrada (diccionario de rispy o RisRecord)."""
+        self.records += 1
+        authors = entry.get('authors')
+        if authors:
+            self.first_authors.add(authors[0])
+            self.authors.update(authors)
+
+        pub_type = entry.get('type_of_reference')
+        if pub_type:
+            self.types[pub_type] += 1
+            year = entry.get('year') or entry.get('publication_year')
+            if year:
+                self._year_type_counts[(year, pub_type)] += 1
+
+        journal = entry.get('journal_name')
+        if journal and pub_type == 'JOUR':
+            self.journals.add(journal)
+        publisher = entry.get('publisher')
+        if publisher:
+            self.publishers.add(publisher)
+
+        if self.term_dictionary is not None:
+            abstract = entry_abstract(entry)
+            if abstract:
+                self.terms.update(self.term_dictionary.find_terms(abstract))
+
+    def year_type_matrix(self):
+        nested = {}
+        for (year, pub_type), value in self._year_type_counts.items():
+            nested.setdefault(str(year), {})[pub_type] = value
+        return YearTypeMatrix.from_nested(nested)
+
+    def top_authors(self, n=15):
+        # Igual que el ranking exacto: se cuenta el primer autor, el indice usa todas las variantes.
+        # Los primeros autores que salieron del resumen de todos los autores se agregan al indice
+        first_authors = self.first_authors.to_counter()
+        names = self.authors.to_counter()
+        for name, count in first_authors.items():
+            names.setdefault(name, count)
+        return get_name_index("author", names).top(n, first_authors)
+
+    def top_journals(self, n=15):
+        return get_name_index("venue", self.journals.to_counter()).top(n)
+
+    def top_publishers(self, n=15):
+        return get_name_index("venue", self.publishers.to_counter()).top(n)
+
+    def top_terms(self, n=15):
+        return {term: count for term, count, _ in self.terms.top(n)}
+
+    def statistics(self, n=15):
+        """Las cinco estadisticas en el mismo formato que main.compute_statistics."""
+        return (
+            self.top_authors(n),
+            self.year_type_matrix(),
+            dict(self.types),
+            self.top_journals(n),
+            self.top_publishers(n),
+        )
+
+    def report(self):
+        """Imprime el error maximo de cada ranking aproximado."""
+        print(f"[STREAMING] {self.records} registros en una pasada")
+        for name, summary in (("autores", self.first_authors), ("revistas", self.journals),
+                              ("editoriales", self.publishers), ("términos", self.terms)):
+            if summary.total:
+                print(f" - {name}: {len(summary.counts)} contadores, error máximo {summary.error_bound:.1f} "
+                      f"(Count-Min ±{summary.sketch.error_bound:.1f}) sobre {summary.total} apariciones")
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import re
+
+from src.util.atomic import atomic_write
+from src.util.shared_cache import cache_dir
+
+CATEGORIES_FILE = os.path.join(os.path.dirname(__file__), 'categories.json')
+
+# Version del formato compilado; cambiarla invalida los diccionarios en cache
+DICTIONARY_VERSION = 1
+
+# Separadores de sinonimos: guion o raya con espacio antes ("A - B", "A – B", "A -B")
+SYNONYM_SEPARATOR = re.compile(r'\s+[-–]\s*')
+# Acronimos entre parentesis: "Item Response Theory (IRT)"
+PARENTHESIS = re.compile(r'\(([^)]*)\)')
+# Palabras y signos sueltos; "Code.org" -> ["code", ".", "org"]
+TOKEN_PATTERN = re.compile(r'\w+|[^\w\s]')
+
+
+def dictionary_cache_dir():
+    """
+    Directorio donde se guarda el diccionario compilado: CACHE_DIR o, si no
+    esta definida, el directorio de resultados junto a UNIQUE_FILE_PATH.
+    None si no hay ninguno.
+    """
+    directory = cache_dir()
+    if directory:
+        return directory
+    unique_file = os.getenv("UNIQUE_FILE_PATH")
+    return os.path.join(os.path.dirname(unique_file), "results") if unique_file else None
+
+
+def tokenize(text):
+    """Divide un texto en palabras y signos de puntuacion, sin cambiar mayusculas."""
+    return TOKEN_PATTERN.findall(text)
+
+
+def _is_acronym(form):
+    """Un acronimo es una sola palabra con al menos dos mayusculas (CTT, cCTt, CTA-CES)."""
+    return ' ' not in form and sum(c.isupper() for c in form) >= 2
+
+
+def surface_forms(term):
+    """
+    Retorna las formas en que puede aparecer un termino de categories.json.
+
+    "Classical Test Theory - CTT" -> nombre completo y acronimo.
+    "Item Response Theory (IRT) - IRT" -> nombre sin parentesis y acronimo.
+    "Early childhood education – Kindergarten -Preschool" -> las tres variantes.
+    "Py– Learn" (raya pegada a la palabra) -> "Py-Learn", "Py Learn" y "PyLearn".
+
+    Returns:
+        list: Tuplas (forma, es_acronimo). La primera es la forma principal.
+    """
+    forms = []
+    acronyms = [acronym.strip() for acronym in PARENTHESIS.findall(term)]
+    term = PARENTHESIS.sub(' ', term)
+
+    for index, part in enumerate(SYNONYM_SEPARATOR.split(term.strip())):
+        part = ' '.join(part.split())
+        if not part:
+            continue
+        if '–' in part:
+            # Raya sin espacio a la izquierda: une las dos mitades de una misma palabra
+            left, right = [piece.strip() for piece in part.split('–', 1)]
+            variants = [f"{left}-{right}", f"{left} {right}", f"{left}{right}"]
+        else:
+            variants = [part]
+        # La forma principal conserva la busqueda sin distinguir mayusculas; los
+        # sinonimos con forma de acronimo se buscan respetando mayusculas
+        for variant in variants:
+            forms.append((variant, index > 0 and _is_acronym(variant)))
+
+    forms.extend((acronym, _is_acronym(acronym)) for acronym in acronyms if acronym)
+
+    unique = []
+    for form in forms:
+        if form not in unique:
+            unique.append(form)
+    return unique
+
+
+class TermDictionary:
+    """
+    Diccionario compilado de categories.json: cada forma de superficie (nombre
+    completo, acronimo, variantes separadas por guiones) apunta al termino
+    original, que se usa como identificador canonico. Las formas se guardan en
+    dos tries de tokens (con y sin distincion de mayusculas) para encontrar
+    todos los terminos de un texto en una sola pasada.
+    """
+
+    def __init__(self, terms, forms):
+        """
+        Args:
+            terms (list): Terminos canonicos en el orden de categories.json.
+            forms (list): Tuplas (forma, es_acronimo, termino canonico).
+        """
+        self.terms = terms
+        self.forms = forms
+        self._order = {term: index for index, term in enumerate(terms)}
+        self._trie = {}
+        self._acronym_trie = {}
+        for form, is_acronym, term in forms:
+            if is_acronym:
+                node = self._acronym_trie
+                tokens = tokenize(form)
+            else:
+                node = self._trie
+                tokens = tokenize(form.lower())
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node.setdefault(None, []).append(term)
+
+    @classmethod
+    def build(cls, categories):
+        """Compila el diccionario a partir del contenido de categories.json."""
+        terms = []
+        forms = []
+        for category_terms in categories.values():
+            for term in category_terms:
+                if term in terms:
+                    continue
+                terms.append(term)
+                forms.extend((form, is_acronym, term) for form, is_acronym in surface_forms(term))
+        return cls(terms, forms)
+
+    @classmethod
+    def load(cls, categories_file=CATEGORIES_FILE, categories=None, directory=None):
+        """
+        Retorna el diccionario compilado de categories_file. El resultado se
+        guarda en el directorio de cache (por defecto dictionary_cache_dir()),
+        identificado por el hash del contenido del archivo, y se reutiliza
+        mientras el archivo no cambie.
+
+        Args:
+            categories_file (str): Ruta a categories.json.
+            categories (dict, optional): Contenido ya cargado del archivo.
+            directory (str, optional): Directorio de la cache.
+        """
+        with open(categories_file, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha1(content + str(DICTIONARY_VERSION).encode()).hexdigest()[:16]
+        directory = directory or dictionary_cache_dir()
+        cache_path = os.path.join(directory, f"categories.{digest}.json") if directory else None
+
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+                return cls(cached['terms'], [tuple(form) for form in cached['forms']])
+            except (OSError, ValueError, KeyError):
+                pass
+
+        dictionary = cls.build(categories if categories is not None else json.loads(content.decode('utf-8')))
+        if cache_path:
+            try:
+                os.makedirs(directory, exist_ok=True)
+                with atomic_write(cache_path) as f:
+                    json.dump({'terms': dictionary.terms, 'forms': dictionary.forms}, f, ensure_ascii=False)
+            except OSError:
+                # Sin permisos de escritura el diccionario igual se puede usar
+                pass
+        return dictionary
+
+    @property
+    def fingerprint(self):
+        """Hash de las formas compiladas, para invalidar resultados guardados."""
+        content = json.dumps([DICTIONARY_VERSION, self.forms], ensure_ascii=False)
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    def synonyms_map(self):
+        """Retorna un diccionario forma en minusculas -> termino canonico."""
+        return {form.lower(): term for form, _, term in self.forms}
+
+    @staticmethod
+    def _walk(trie, tokens, found):
+        for start in range(len(tokens)):
+            node = trie
+            for token in tokens[start:]:
+                node = node.get(token)
+                if node is None:
+                    break
+                if None in node:
+                    found.update(node[None])
+
+    def find_terms(self, text):
+        """
+        Encuentra los terminos canonicos presentes en un texto.
+
+        Args:
+            text (str): Texto a analizar.
+
+        Returns:
+            list: Terminos presentes, sin repetir, en el orden de categories.json.
+        """
+        tokens = tokenize(text)
+        found = set()
+        self._walk(self._trie, [token.lower() for token in tokens], found)
+        self._walk(self._acronym_trie, tokens, found)
+        return sorted(found, key=self._order.__getitem__)
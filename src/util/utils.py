@@ -1,4 +1,5 @@
 import os
+import shlex
 
 
 def validate_path(path):
@@ -6,3 +7,15 @@ def validate_path(path):
     if not os.path.exists(path):
         os.makedirs(path)
         print(f'La ruta {path} ha sido creada.')
+
+
+def extra_browser_arguments():
+    """Argumentos opcionales del navegador definidos en el entorno."""
+    arguments = []
+    # HEADLESS permite ejecutar el navegador sin ventana (benchmarks, servidores)
+    if os.getenv("HEADLESS", "").lower() in ("1", "true", "yes"):
+        arguments.append("--headless=new")
+    # BROWSER_ARGS permite pasar argumentos adicionales separados por espacios, con
+    # comillas para los que contienen espacios (p. ej. --host-resolver-rules="MAP * ...")
+    arguments.extend(shlex.split(os.getenv("BROWSER_ARGS", "")))
+    return arguments
@@ -1,12 +1,12 @@
 import os
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
-import networkx as nx
-from wordcloud import WordCloud
 from matplotlib.colors import LinearSegmentedColormap
-import matplotlib.colors as mcolors
 
+from src.util.atomic import atomic_savefig
+from src.util.instrumentation import instrumented
+
+@instrumented(count=lambda result, frequencies, *args, **kwargs: len(frequencies))
 def create_wordcloud(frequencies, output_path, title="Nube de Palabras", max_words=100):
     """
     Crea una nube de palabras a partir de un diccionario de frecuencias.
@@ -17,6 +17,8 @@ def create_wordcloud(frequencies, output_path, title="Nube de Palabras", max_wor
         title (str): Título para la nube de palabras.
         max_words (int): Número máximo de palabras a mostrar.
     """
+    from wordcloud import WordCloud
+
     # Crear carpeta si no existe
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
@@ -48,11 +50,12 @@ def create_wordcloud(frequencies, output_path, title="Nube de Palabras", max_wor
     plt.tight_layout(pad=0)
     
     # Guardar la imagen
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    atomic_savefig(output_path, dpi=300, bbox_inches='tight')
     plt.close()
     
     return output_path
 
+@instrumented()
 def create_category_wordclouds(category_frequencies, output_dir):
     """
     Crea nubes de palabras para cada categoría.
@@ -84,6 +87,7 @@ def create_category_wordclouds(category_frequencies, output_dir):
     
     return output_files
 
+@instrumented(count=None)
 def create_combined_wordcloud(category_frequencies, output_dir):
     """
     Crea una nube de palabras combinada de todas las categorías.
@@ -117,33 +121,41 @@ def create_combined_wordcloud(category_frequencies, output_dir):
     
     return output_path
 
+@instrumented(count=lambda result, co_occurrences, *args, **kwargs: len(co_occurrences))
 def create_co_occurrence_network(co_occurrences, output_path, min_weight=1, max_nodes=50):
     """
     Crea un gráfico de red para visualizar co-ocurrencias entre términos.
     
     Args:
-        co_occurrences (dict): Diccionario anidado con co-ocurrencias entre términos.
+        co_occurrences (dict | CoOccurrenceMatrix): Diccionario anidado con co-ocurrencias
+            entre términos, o la matriz compacta cargada con CoOccurrenceMatrix.load.
         output_path (str): Ruta donde se guardará la imagen.
         min_weight (int): Peso mínimo de co-ocurrencia para incluir en el gráfico.
         max_nodes (int): Número máximo de nodos a mostrar.
     """
+    import networkx as nx
+
     # Crear grafo no dirigido
     G = nx.Graph()
     
     # Agregar aristas con pesos
     edges = []
     
-    for term1, co_terms in co_occurrences.items():
-        for term2, weight in co_terms.items():
-            if weight >= min_weight:
-                edges.append((term1, term2, weight))
-    
-    # Ordenar bordes por peso (de mayor a menor)
-    edges.sort(key=lambda x: x[2], reverse=True)
-    
-    # Limitar el número de nodos a mostrar
-    if len(edges) > max_nodes*2:
-        edges = edges[:max_nodes*2]
+    if hasattr(co_occurrences, 'top_pairs'):
+        # Matriz compacta: cada par aparece una sola vez, ya ordenado por peso
+        edges = co_occurrences.top_pairs(max_nodes, min_weight)
+    else:
+        for term1, co_terms in co_occurrences.items():
+            for term2, weight in co_terms.items():
+                if weight >= min_weight:
+                    edges.append((term1, term2, weight))
+        
+        # Ordenar bordes por peso (de mayor a menor)
+        edges.sort(key=lambda x: x[2], reverse=True)
+        
+        # Limitar el número de nodos a mostrar (cada par aparece en ambos sentidos)
+        if len(edges) > max_nodes*2:
+            edges = edges[:max_nodes*2]
     
     # Crear conjunto de nodos y añadir aristas al grafo
     nodes = set()
@@ -211,11 +223,12 @@ def create_co_occurrence_network(co_occurrences, output_path, min_weight=1, max_
     plt.axis('off')
     
     # Guardar imagen
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    atomic_savefig(output_path, dpi=300, bbox_inches='tight')
     plt.close()
     
     return output_path
 
+@instrumented()
 def create_frequency_bar_charts(category_frequencies, output_dir, top_n=10):
     """
     Crea gráficos de barras para mostrar la frecuencia de términos por categoría.
@@ -229,6 +242,7 @@ def create_frequency_bar_charts(category_frequencies, output_dir, top_n=10):
         list: Lista de rutas a los archivos generados.
     """
     output_files = []
+    os.makedirs(output_dir, exist_ok=True)
     
     # Colores para los gráficos
     colors = plt.cm.viridis(np.linspace(0, 1, len(category_frequencies)))
@@ -264,7 +278,7 @@ def create_frequency_bar_charts(category_frequencies, output_dir, top_n=10):
             # Guardar imagen
             filename = f"barchart_{category.replace(' ', '_').lower()}.png"
             output_path = os.path.join(output_dir, filename)
-            plt.savefig(output_path, dpi=300, bbox_inches='tight')
+            atomic_savefig(output_path, dpi=300, bbox_inches='tight')
             plt.close()
             
             output_files.append(output_path)
@@ -0,0 +1,82 @@
+import json
+import os
+import re
+import time
+
+from src.util.atomic import atomic_write
+
+WORKSPACE_FILE = "workspace.json"
+NAME_PATTERN = re.compile(r"^[\w.-]+$")
+
+
+def workspaces_dir():
+    """Directorio que contiene los workspaces (WORKSPACES_DIR, por defecto "workspaces")."""
+    return os.getenv("WORKSPACES_DIR") or "workspaces"
+
+
+def workspace_dir(name):
+    if not NAME_PATTERN.match(name):
+        raise ValueError(f"Nombre de workspace inválido: {name!r} (usa letras, números, '.', '-' o '_')")
+    return os.path.join(workspaces_dir(), name)
+
+
+def load_workspace(name):
+    """Retorna la configuracion guardada del workspace, o None si no existe."""
+    try:
+        with open(os.path.join(workspace_dir(name), WORKSPACE_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def activate_workspace(name, search_term=None):
+    """
+    Activa un workspace con nombre: un corpus, sus resultados y sus
+    visualizaciones propios bajo WORKSPACES_DIR/<nombre>. Define las
+    variables de entorno que usa el resto del proyecto (UNIQUE_FILE_PATH,
+    DUPLICATE_FILE_PATH, DOWNLOAD_PATH, SEARCH_TERM, VISUALIZATIONS_DIR y,
+    si hay un almacen SQLite, RIS_DB_PATH), asi que los procesos del pipeline
+    las heredan. CACHE_DIR, si no esta definida, apunta a una cache comun a
+    todos los workspaces.
+
+    Args:
+        name (str): Nombre del workspace; se crea si no existe.
+        search_term (str, optional): Termino de busqueda del workspace. Se
+            guarda en workspace.json y se reutiliza en las siguientes ejecuciones.
+
+    Returns:
+        dict: Configuracion del workspace.
+    """
+    directory = workspace_dir(name)
+    os.makedirs(directory, exist_ok=True)
+
+    config = load_workspace(name) or {"name": name, "created_at": time.time()}
+    if search_term:
+        config["search_term"] = search_term
+    config.setdefault("search_term", os.getenv("SEARCH_TERM"))
+    with atomic_write(os.path.join(directory, WORKSPACE_FILE)) as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+
+    os.environ["UNIQUE_FILE_PATH"] = os.path.join(directory, "unique.ris")
+    os.environ["DUPLICATE_FILE_PATH"] = os.path.join(directory, "duplicate.ris")
+    os.environ["DOWNLOAD_PATH"] = os.path.join(directory, "downloads")
+    os.environ["VISUALIZATIONS_DIR"] = os.path.join(directory, "results", "visualizations")
+    if config.get("search_term"):
+        os.environ["SEARCH_TERM"] = config["search_term"]
+    if os.getenv("RIS_DB_PATH"):
+        os.environ["RIS_DB_PATH"] = os.path.join(directory, "corpus.sqlite")
+    os.environ.setdefault("CACHE_DIR", os.path.join(workspaces_dir(), ".cache"))
+
+    print(f"[WORKSPACE] {name} ({config.get('search_term') or 'sin término de búsqueda'}) en {directory}")
+    return config
+
+
+def list_workspaces():
+    """Retorna la configuracion de cada workspace existente, ordenados por nombre."""
+    root = workspaces_dir()
+    if not os.path.isdir(root):
+        return []
+    return [
+        config for config in (load_workspace(name) for name in sorted(os.listdir(root)) if not name.startswith("."))
+        if config
+    ]